@@ -0,0 +1,166 @@
+"""Headless batch generation of Kohya configs from a base config and a tweak table.
+
+Each row of a CSV or JSONL table is a set of tweaks applied on top of the base
+configuration through TamingDragonsModel; every row produces one saved config.
+
+    python batch_cli.py base.json tweaks.csv --out-dir configs/nightly --workers 8
+
+A ``filename`` column/field, if present, names the output file, relative to the output
+directory (rows whose name resolves outside it fail); otherwise the name comes from
+suggest_filename(). When several rows give the same name, every row after the first gets
+its row number appended, so no output overwrites another. Empty CSV cells leave the base
+value unchanged.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Tuple, List, Iterator, Optional
+
+from model import TamingDragonsModel
+
+FILENAME_FIELD = 'filename'
+
+def read_rows(table_path: str) -> List[Dict[str, Any]]:
+    """Reads tweak rows from a .csv (header row = keys) or .jsonl (one object per line) file."""
+    path = Path(table_path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            return [dict(row) for row in csv.DictReader(f)]
+
+        rows = []
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"{path.name}:{line_no}: expected a JSON object per line")
+            rows.append(row)
+        return rows
+
+_worker_model: Optional[TamingDragonsModel] = None
+
+def _init_worker(base_path: str):
+    global _worker_model
+    _worker_model = TamingDragonsModel()
+    _worker_model.lineage_path = None # Workers would all append to one log at once
+    status, _ = _worker_model.set_base_config(base_path)
+    if not _worker_model.base_config:
+        raise RuntimeError(status)
+
+def _with_json_suffix(filename: str) -> str:
+    return filename if filename.lower().endswith('.json') else filename + '.json'
+
+def _output_path(out_dir: str, filename: str) -> Optional[Path]:
+    """The file filename names inside out_dir, or None if it resolves anywhere else."""
+    root = Path(out_dir).resolve()
+    path = (root / _with_json_suffix(filename)).resolve()
+    return path if path != root and path.is_relative_to(root) else None
+
+def _filename_key(filename: str) -> str:
+    return os.path.normcase(os.path.normpath(filename))
+
+def number_duplicate_filenames(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Appends the row number to every repeat of an explicit filename after its first use."""
+    seen = set()
+    result = []
+    for index, row in enumerate(rows):
+        filename = str(row.get(FILENAME_FIELD, "") or "").strip()
+        if filename:
+            filename = _with_json_suffix(filename)
+            if _filename_key(filename) in seen:
+                filename = f"{filename[:-len('.json')]}_{index:04d}.json"
+                row = {**row, FILENAME_FIELD: filename}
+            seen.add(_filename_key(filename))
+        result.append(row)
+    return result
+
+def _process_chunk(out_dir: str, chunk: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, bool, str]]:
+    """Applies and saves each (row index, row). Returns (index, ok, message) per row."""
+    model = _worker_model
+    results = []
+    for index, row in chunk:
+        row = dict(row)
+        filename = str(row.pop(FILENAME_FIELD, "") or "").strip()
+        save_dir = out_dir
+        if filename:
+            path = _output_path(out_dir, filename)
+            if path is None:
+                results.append((index, False, f"❌ Filename must name a file inside the output directory: {filename}"))
+                continue
+            save_dir, filename = str(path.parent), path.name
+
+        model.reset_working_config()
+        status = model.apply_tweaks(row)
+        if status.startswith("❌"):
+            results.append((index, False, status))
+            continue
+
+        if not filename:
+            filename = model.suggest_filename()
+            filename = f"{filename[:-len('.json')]}_{index:04d}.json"
+        status = model.save_working_config(filename, save_dir)
+        results.append((index, status.startswith("✅"), status))
+    return results
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    for start in range(0, len(rows), size):
+        yield list(enumerate(rows[start:start + size], start))
+
+def run_batch(base_path: str, rows: List[Dict[str, Any]], out_dir: str, workers: int = 1,
+              chunk_size: int = 32) -> Iterator[Tuple[int, bool, str]]:
+    """Yields (row index, ok, status) for every row as its chunk completes."""
+    rows = number_duplicate_filenames(rows)
+    if workers <= 1:
+        _init_worker(base_path)
+        for chunk in _chunks(rows, chunk_size):
+            yield from _process_chunk(out_dir, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base_path,)) as pool:
+        for results in pool.map(partial(_process_chunk, out_dir), _chunks(rows, chunk_size)):
+            yield from results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate Kohya configs from a base config and a CSV/JSONL tweak table.")
+    parser.add_argument("base", help="Base configuration JSON file")
+    parser.add_argument("table", help="Tweak table (.csv with a header row, or .jsonl)")
+    parser.add_argument("--out-dir", default="configs", help="Output directory (default: configs)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="Only print failures and the summary")
+    args = parser.parse_args(argv)
+
+    status, _ = TamingDragonsModel().set_base_config(args.base)
+    if not status.startswith("✅"):
+        print(status, file=sys.stderr)
+        return 2
+    try:
+        rows = read_rows(args.table)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading tweak table: {e}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    failed = 0
+    workers = max(1, min(args.workers, len(rows)))
+    for index, ok, message in run_batch(args.base, rows, args.out_dir, workers):
+        if not ok:
+            failed += 1
+            print(f"row {index}: {message}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"row {index}: {message}")
+
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed > 0 else float('inf')
+    print(f"{len(rows) - failed}/{len(rows)} configs written to {args.out_dir} "
+          f"in {elapsed:.2f}s ({rate:.0f} configs/s, {workers} workers)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
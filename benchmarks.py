@@ -0,0 +1,279 @@
+"""Benchmarks for the TamingDragonsModel hot paths.
+
+    python benchmarks.py run --out bench.json                 # full suite
+    python benchmarks.py run --quick --baseline bench.json    # run and check against a baseline
+    python benchmarks.py compare current.json baseline.json   # check two saved runs
+
+Synthetic configs (1 KB to 50 MB) and libraries (10 to 100k files) are generated in a
+temporary directory. Each operation is timed several times and its median is stored;
+the regression check fails when a median grows beyond the threshold.
+"""
+import argparse
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+import json_codec
+from model import TamingDragonsModel
+
+DEFAULT_SIZES = ["1KB", "100KB", "1MB", "10MB", "50MB"]
+DEFAULT_LIBRARIES = [10, 1000, 100000]
+QUICK_SIZES = ["1KB", "100KB", "1MB"]
+QUICK_LIBRARIES = [10, 1000]
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25 # Fail when an operation is more than 25% slower
+MIN_DELTA_S = 0.0005 # Ignore slowdowns smaller than this (timer noise on tiny operations)
+
+BASE_PARAMS: Dict[str, Any] = {
+    "LoRA_type": "Standard", "sdxl": True, "optimizer": "AdamW8bit", "optimizer_args": "",
+    "output_name": "bench_lora", "training_comment": "benchmark subject", "sample_prompts": "benchmark subject, portrait",
+    "learning_rate": 0.0001, "unet_lr": 0.0001, "text_encoder_lr": 5e-05, "lr_scheduler": "cosine",
+    "epoch": 10, "max_train_steps": 2000, "seed": 1234, "train_batch_size": 2,
+    "network_dim": 32, "network_alpha": 16, "noise_offset": 0.05, "min_snr_gamma": 5,
+    "save_every_n_epochs": 1, "save_every_n_steps": 0, "mixed_precision": "bf16",
+}
+
+def parse_size(text: str) -> int:
+    """'1KB', '10MB', '512' -> bytes."""
+    text = text.strip().upper()
+    for suffix, factor in (("KB", 1024), ("MB", 1024 ** 2), ("GB", 1024 ** 3)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+def make_config(target_bytes: int, seed: int = 0) -> Dict[str, Any]:
+    """A Kohya-like config padded with extra keys until its JSON is about target_bytes long."""
+    rng = random.Random(seed)
+    config = dict(BASE_PARAMS)
+    size = len(json_codec.dumps_pretty(config))
+    index = 0
+    while size < target_bytes:
+        kind = index % 4
+        if kind == 0:
+            value: Any = rng.random() * 10 ** rng.randint(-6, 3)
+        elif kind == 1:
+            value = "".join(rng.choice("abcdefghij ") for _ in range(rng.randint(10, 200)))
+        elif kind == 2:
+            value = [rng.randint(0, 1000) for _ in range(rng.randint(1, 50))]
+        else:
+            value = {"enabled": rng.random() < 0.5, "weights": [round(rng.random(), 4) for _ in range(20)]}
+        key = f"extra_param_{index:07d}"
+        config[key] = value
+        size += len(json_codec.dumps_pretty({key: value})) # Close enough: the per-key cost
+        index += 1
+    return config
+
+def make_variant(config: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """A copy of config with a few daily tweaks and padding values changed."""
+    rng = random.Random(seed)
+    variant = dict(config)
+    variant.update(epoch=rng.randint(5, 30), seed=rng.randint(0, 10 ** 6), learning_rate=rng.choice([1e-4, 5e-5, 2e-4]))
+    extra = [key for key in config if key.startswith("extra_param_")]
+    for key in rng.sample(extra, min(len(extra), 5)):
+        variant[key] = "changed"
+    return variant
+
+def write_config(path: str, config: Dict[str, Any]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json_codec.dump_file(config, f)
+
+def make_library(root: str, count: int, seed: int = 0) -> str:
+    """Writes count small config variants into root (spread over subdirectories of 1000)."""
+    base = make_config(4096, seed)
+    for index in range(count):
+        subdir = os.path.join(root, f"batch_{index // 1000:03d}")
+        if index % 1000 == 0:
+            os.makedirs(subdir, exist_ok=True)
+        write_config(os.path.join(subdir, f"config_{index:06d}.json"), make_variant(base, index))
+    return root
+
+def time_operation(operation: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Median/min wall time of operation over repeat runs (setup runs untimed before each)."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "runs": repeat}
+
+def bench_config_size(workdir: str, size_label: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Times every model hot path on one synthetic config size."""
+    size = parse_size(size_label)
+    config = make_config(size, seed=size)
+    base_path = os.path.join(workdir, f"base_{size_label}.json")
+    comp_path = os.path.join(workdir, f"comp_{size_label}.json")
+    write_config(base_path, config)
+    write_config(comp_path, make_variant(config, seed=1))
+    del config
+
+    if size >= 10 * 1024 * 1024:
+        repeat = max(1, repeat // 3) # Keep the 10/50 MB cases tolerable
+
+    model = TamingDragonsModel()
+    model.lineage_path = None # Time the save itself, not a lineage log growing with every repeat
+    model.set_base_config(base_path)
+    save_dir = os.path.join(workdir, "saved")
+    epochs = iter(range(1, 10 ** 9))
+
+    def edit(count: int):
+        """Applies count separate daily tweaks, each touching one summary row."""
+        for key in ("epoch", "seed", "max_train_steps", "train_batch_size", "output_name")[:count]:
+            value = f"bench_{next(epochs)}" if key == "output_name" else str(next(epochs) % 1000 + 1)
+            model.update_working_config_daily_tweaks({key: value})
+
+    def invalidate_summary():
+        model._summary_renderer().invalidate()
+
+    operations = {
+        "load_config_file": (lambda: model.load_config_file(base_path), None),
+        "set_base_config": (lambda: model.set_base_config(base_path), None),
+        "compare_loaded_configs": (lambda: model.compare_loaded_configs(comp_path), model.comparison_cache.clear),
+        "compare_loaded_configs_cached": (lambda: model.compare_loaded_configs(comp_path), None),
+        "update_working_config_daily_tweaks": (
+            lambda: model.update_working_config_daily_tweaks({"epoch": str(next(epochs)), "output_name": "bench_tweaked"}),
+            None),
+        "get_working_config_summary_markdown_cached": (model.get_working_config_summary_markdown, None),
+        "get_working_config_summary_markdown_after_1_edit": (model.get_working_config_summary_markdown,
+                                                             lambda: edit(1)),
+        "get_working_config_summary_markdown_after_5_edits": (model.get_working_config_summary_markdown,
+                                                              lambda: edit(5)),
+        "get_working_config_summary_markdown_full": (model.get_working_config_summary_markdown, invalidate_summary),
+        "save_working_config": (lambda: model.save_working_config("bench_save", save_dir), None),
+        "suggest_filename": (model.suggest_filename, None),
+    }
+
+    results = {}
+    for name, (operation, setup) in operations.items():
+        results[f"{name}@{size_label}"] = time_operation(operation, repeat, setup)
+    model.save_writer.flush()
+    return results
+
+def bench_library(workdir: str, count: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Times a cold and a warm (nothing changed) library index scan."""
+    root = make_library(os.path.join(workdir, f"library_{count}"), count)
+    index_path = os.path.join(root, ".taming_dragons_index.json")
+
+    def drop_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    def scan():
+        model = TamingDragonsModel()
+        model.open_library(root)
+        return model
+
+    def load_configs(use_snapshot: bool):
+        model = scan()
+        model.load_library_configs(use_snapshot)
+
+    results = {
+        f"open_library_cold@{count}": time_operation(scan, max(1, repeat // 2), setup=drop_index),
+        f"open_library_warm@{count}": time_operation(scan, repeat),
+        f"load_library_configs_json@{count}": time_operation(lambda: load_configs(False), max(1, repeat // 2)),
+        f"load_library_configs_snapshot@{count}": time_operation(lambda: load_configs(True), repeat,
+                                                                 setup=lambda: load_configs(True)),
+    }
+    shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def run_suite(sizes: List[str], libraries: List[int], repeat: int = DEFAULT_REPEAT,
+              log: Callable[[str], None] = print) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    workdir = tempfile.mkdtemp(prefix="taming_dragons_bench_")
+    try:
+        for size_label in sizes:
+            log(f"config {size_label}...")
+            results.update(bench_config_size(workdir, size_label, repeat))
+        for count in libraries:
+            log(f"library of {count} files...")
+            results.update(bench_library(workdir, count, repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_codec": json_codec.get_codec().name,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def find_regressions(current: Dict[str, Any], baseline: Dict[str, Any],
+                     threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Operations (present in both runs) whose median grew by more than threshold."""
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        now, before = result["median_s"], previous["median_s"]
+        if now - before > MIN_DELTA_S and now > before * (1 + threshold):
+            regressions.append(f"{name}: {before * 1000:.3f} ms -> {now * 1000:.3f} ms (+{(now / before - 1) * 100:.0f}%)")
+    return regressions
+
+def results_markdown(report: Dict[str, Any]) -> str:
+    lines = ["| Operation | Median (ms) | Min (ms) | Runs |", "|---|---|---|---|"]
+    for name, result in report["results"].items():
+        lines.append(f"| {name} | {result['median_s'] * 1000:.3f} | {result['min_s'] * 1000:.3f} | {result['runs']} |")
+    return "\n".join(lines)
+
+def _check(report: Dict[str, Any], baseline_path: str, threshold: float) -> int:
+    regressions = find_regressions(report, json_codec.load_file(baseline_path), threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} operations regressed by more than {threshold * 100:.0f}%:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print(f"✅ No regressions beyond {threshold * 100:.0f}% against {baseline_path}")
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the TamingDragonsModel hot paths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--sizes", help=f"Comma-separated config sizes (default: {','.join(DEFAULT_SIZES)})")
+    run_parser.add_argument("--libraries", help="Comma-separated library file counts "
+                                                f"(default: {','.join(map(str, DEFAULT_LIBRARIES))})")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller sizes and libraries")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per operation")
+    run_parser.add_argument("--out", help="Write results as a JSON baseline")
+    run_parser.add_argument("--baseline", help="Fail if slower than this saved run")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="Allowed slowdown as a fraction (default: 0.25)")
+
+    compare_parser = sub.add_parser("compare", help="Check a saved run against a baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _check(json_codec.load_file(args.current), args.baseline, args.threshold)
+
+    sizes = args.sizes.split(",") if args.sizes else (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    if args.libraries:
+        libraries = [int(count) for count in args.libraries.split(",") if count and int(count) > 0]
+    else:
+        libraries = QUICK_LIBRARIES if args.quick else DEFAULT_LIBRARIES
+
+    report = run_suite(sizes, libraries, args.repeat, log=lambda message: print(message, file=sys.stderr))
+    print(results_markdown(report))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(report, f)
+    return _check(report, args.baseline, args.threshold) if args.baseline else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 32
+
+def hash_file(path: str) -> str:
+    """Content hash of a file (same digest as the config library index)."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class FileFingerprints:
+    """Content hashes of files, re-hashed only when their mtime or size changes."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, int, str]] = {} # real path -> (mtime_ns, size, hash)
+
+    @staticmethod
+    def stat_key(path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def content_hash(self, path: str, expected: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        """Hash of path's current content. With expected=(mtime_ns, size), returns None if the
+        file changed since then (so content loaded earlier can no longer be identified by it)."""
+        real_path = os.path.realpath(path)
+        mtime_ns, size = self.stat_key(real_path)
+        if expected is not None and (mtime_ns, size) != tuple(expected):
+            return None
+
+        entry = self._entries.get(real_path)
+        if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+            return entry[2]
+        digest = hash_file(real_path)
+        if self.stat_key(real_path) != (mtime_ns, size):
+            return None # Modified while hashing
+        self._entries[real_path] = (mtime_ns, size, digest)
+        return digest
+
+class ComparisonCache:
+    """LRU cache of comparison results keyed by (base hash, comparison hash).
+
+    Keys are content hashes, so a file that changes on disk simply stops matching its
+    old entry, which then ages out. max_entries can be changed at any time.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, value: int):
+        self._max_entries = max(0, value)
+        self._evict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False) # Least recently used first
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
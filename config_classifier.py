@@ -0,0 +1,243 @@
+"""Rule-driven classification of Kohya configs.
+
+DECISION_TABLE lists (output, value, conditions) rows; for each output the first row
+whose conditions all hold wins, and UNKNOWN is used when none does. Conditions are
+(key, op, argument):
+
+    true   value is truthy                set    value present and not None/""/[]/{}
+    eq     value == argument              gt     numeric value > argument
+    has    argument is a substring of the lower-cased string value (lists are joined)
+
+Classifier compiles the table once: every key is read (and, for "has", lower-cased)
+a single time per config and each rule becomes one precomputed test over those values.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import json_codec
+
+UNKNOWN = "Unknown"
+OUTPUTS = ('model_family', 'network_type', 'trainer_mode')
+MODEL_FAMILIES = ('SD1.5', 'SD2', 'SDXL', 'SD3', 'Flux')
+NETWORK_TYPES = ('LoRA', 'LoCon', 'LoHa', 'LoKr', 'DoRA', 'LyCORIS')
+TRAINER_MODES = ('LoRA', 'DreamBooth', 'Fine-tune', 'Textual Inversion')
+
+POOL_THRESHOLD = 256 # Fewer files than this are classified in-process
+CHUNK_SIZE = 512
+
+Condition = Tuple[str, str, Any]
+
+DECISION_TABLE: List[Tuple[str, str, List[Condition]]] = [
+    # Model family: the GUI's model switches, then the base model's name, then the extra
+    # model files only one family uses. Kohya configs without any hint train SD1.5.
+    ('model_family', 'Flux', [('flux1_checkbox', 'true', None)]),
+    ('model_family', 'Flux', [('LoRA_type', 'has', 'flux')]),
+    ('model_family', 'SD3', [('sd3_checkbox', 'true', None)]),
+    ('model_family', 'SDXL', [('sdxl', 'true', None)]),
+    ('model_family', 'SD2', [('v2', 'true', None)]),
+    ('model_family', 'Flux', [('pretrained_model_name_or_path', 'has', 'flux')]),
+    ('model_family', 'SD3', [('pretrained_model_name_or_path', 'has', 'sd3')]),
+    ('model_family', 'SD3', [('pretrained_model_name_or_path', 'has', 'stable-diffusion-3')]),
+    ('model_family', 'SDXL', [('pretrained_model_name_or_path', 'has', 'sdxl')]),
+    ('model_family', 'SDXL', [('pretrained_model_name_or_path', 'has', 'xl-base')]),
+    ('model_family', 'SDXL', [('pretrained_model_name_or_path', 'has', 'xl_base')]),
+    ('model_family', 'SD2', [('pretrained_model_name_or_path', 'has', 'stable-diffusion-2')]),
+    ('model_family', 'SD2', [('pretrained_model_name_or_path', 'has', 'v2-1')]),
+    ('model_family', 'Flux', [('ae', 'set', None), ('t5xxl', 'set', None)]),
+    ('model_family', 'SD3', [('clip_g', 'set', None)]),
+    ('model_family', 'SD1.5', [('sdxl', 'eq', False)]),
+    ('model_family', 'SD1.5', [('v2', 'eq', False)]),
+    ('model_family', 'SD1.5', [('pretrained_model_name_or_path', 'set', None)]),
+
+    # Network type: weight decomposition wins over the algorithm it decomposes.
+    ('network_type', 'DoRA', [('dora_wd', 'true', None)]),
+    ('network_type', 'DoRA', [('network_args', 'has', 'dora_wd=true')]),
+    ('network_type', 'LoKr', [('LoRA_type', 'has', 'lokr')]),
+    ('network_type', 'LoKr', [('network_args', 'has', 'algo=lokr')]),
+    ('network_type', 'LoHa', [('LoRA_type', 'has', 'loha')]),
+    ('network_type', 'LoHa', [('network_args', 'has', 'algo=loha')]),
+    ('network_type', 'LoCon', [('LoRA_type', 'has', 'locon')]),
+    ('network_type', 'LoCon', [('network_args', 'has', 'algo=locon')]),
+    ('network_type', 'LyCORIS', [('LoRA_type', 'has', 'lycoris')]),
+    ('network_type', 'LoRA', [('LoRA_type', 'set', None)]),
+    ('network_type', 'LoRA', [('network_dim', 'set', None)]),
+
+    # Trainer mode: which Kohya tab (training script) the config belongs to.
+    ('trainer_mode', 'Textual Inversion', [('token_string', 'set', None)]),
+    ('trainer_mode', 'Textual Inversion', [('num_vectors_per_token', 'set', None)]),
+    ('trainer_mode', 'LoRA', [('LoRA_type', 'set', None)]),
+    ('trainer_mode', 'LoRA', [('network_dim', 'set', None)]),
+    ('trainer_mode', 'Fine-tune', [('latent_metadata_filename', 'set', None)]),
+    ('trainer_mode', 'Fine-tune', [('caption_metadata_filename', 'set', None)]),
+    ('trainer_mode', 'DreamBooth', [('pretrained_model_name_or_path', 'set', None)]),
+]
+
+def _lowered(value: Any) -> str:
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value).lower()
+    return ""
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _compile_condition(slot: int, op: str, argument: Any) -> Callable[[tuple], bool]:
+    if op == 'true':
+        return lambda values: bool(values[slot])
+    if op == 'set':
+        return lambda values: values[slot] not in (None, "", [], {})
+    if op == 'eq':
+        kind = type(argument)
+        return lambda values: type(values[slot]) is kind and values[slot] == argument
+    if op == 'gt':
+        return lambda values: _is_number(values[slot]) and values[slot] > argument
+    if op == 'has': # slot holds the lower-cased text
+        needle = str(argument).lower()
+        return lambda values: needle in values[slot]
+    raise ValueError(f"unknown condition operator '{op}'")
+
+class Classifier:
+    """A DECISION_TABLE compiled for fast repeated use; see the module docstring."""
+
+    def __init__(self, table: List[Tuple[str, str, List[Condition]]] = DECISION_TABLE):
+        self.keys: List[str] = [] # Raw values fill the first slots, lower-cased text the rest
+        self._text_keys: List[int] = []
+        conditions_used = [condition for _, _, conditions in table for condition in conditions]
+        for key, _, _ in conditions_used:
+            if key not in self.keys:
+                self.keys.append(key)
+        for key, op, _ in conditions_used:
+            if op == 'has' and self.keys.index(key) not in self._text_keys:
+                self._text_keys.append(self.keys.index(key))
+
+        rules: Dict[str, List[Tuple[str, Callable[[tuple], bool]]]] = {output: [] for output in OUTPUTS}
+        for output, value, conditions in table:
+            if output not in rules:
+                raise ValueError(f"unknown classifier output '{output}'")
+            tests = [_compile_condition(self._slot(key, op), op, argument) for key, op, argument in conditions]
+            rules[output].append((value, tests[0] if len(tests) == 1 else
+                                  (lambda values, tests=tests: all(test(values) for test in tests))))
+        self._rules = [(output, rules[output]) for output in OUTPUTS]
+
+    def _slot(self, key: str, op: str) -> int:
+        slot = self.keys.index(key)
+        return len(self.keys) + self._text_keys.index(slot) if op == 'has' else slot
+
+    def classify(self, config: Mapping[str, Any]) -> Dict[str, str]:
+        """{'model_family', 'network_type', 'trainer_mode'} for one config."""
+        values = list(map(config.get, self.keys))
+        values.extend([_lowered(values[slot]) for slot in self._text_keys])
+        result = {}
+        for output, rules in self._rules:
+            label = UNKNOWN
+            for value, test in rules:
+                if test(values):
+                    label = value
+                    break
+            result[output] = label
+        return result
+
+    def classify_many(self, configs: Iterable[Mapping[str, Any]]) -> Iterator[Dict[str, str]]:
+        classify = self.classify
+        return (classify(config) for config in configs)
+
+_default: Optional[Classifier] = None
+
+def default_classifier() -> Classifier:
+    global _default
+    if _default is None:
+        _default = Classifier()
+    return _default
+
+def classify_config(config: Mapping[str, Any]) -> Dict[str, str]:
+    return default_classifier().classify(config)
+
+def type_label(classes: Mapping[str, str]) -> str:
+    """Display name such as "SDXL LoRA", "Flux DoRA" or "SD1.5 DreamBooth"."""
+    kind = classes['network_type'] if classes['trainer_mode'] == 'LoRA' else classes['trainer_mode']
+    parts = [part for part in (classes['model_family'], kind) if part != UNKNOWN]
+    return " ".join(parts) if parts else UNKNOWN
+
+def config_type_label(config: Mapping[str, Any]) -> str:
+    return type_label(classify_config(config))
+
+def family_statistics(classes: Iterable[Mapping[str, str]]) -> Dict[str, Any]:
+    """Counts per model family, network type, trainer mode and family/type label."""
+    stats: Dict[str, Any] = {'configs': 0, 'labels': {}}
+    for output in OUTPUTS:
+        stats[output] = {}
+    for item in classes:
+        stats['configs'] += 1
+        for output in OUTPUTS:
+            counts = stats[output]
+            counts[item[output]] = counts.get(item[output], 0) + 1
+        label = type_label(item)
+        stats['labels'][label] = stats['labels'].get(label, 0) + 1
+    for key in OUTPUTS + ('labels',):
+        stats[key] = dict(sorted(stats[key].items(), key=lambda item: (-item[1], item[0])))
+    return stats
+
+def statistics_to_markdown(stats: Dict[str, Any]) -> str:
+    total = stats['configs']
+    if not total:
+        return "ℹ️ No configs to classify."
+    parts = [f"## 🏷️ Config Types ({total} configs)"]
+    for output, title in (('model_family', "Model Family"), ('network_type', "Network Type"),
+                          ('trainer_mode', "Trainer Mode"), ('labels', "Family and Type")):
+        lines = [f"### {title}", "", "| Value | Configs | Share |", "|---|---|---|"]
+        lines.extend(f"| {value} | {count} | {count / total:.1%} |" for value, count in stats[output].items())
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+def _classify_chunk(paths: List[str]) -> List[Tuple[str, Optional[Dict[str, str]], str]]:
+    classifier = default_classifier()
+    results = []
+    for path in paths:
+        try:
+            config = json_codec.load_file(path)
+            if not isinstance(config, dict):
+                raise ValueError("top-level JSON value is not an object")
+            results.append((path, classifier.classify(config), ""))
+        except (OSError, ValueError) as e:
+            results.append((path, None, str(e)))
+    return results
+
+def classify_files(paths: List[str], workers: Optional[int] = None) -> Dict[str, Any]:
+    """Classifies config files (on every core for large batches). Returns a JSON-serializable
+    report: family_statistics() plus per-file 'classes' and 'errors'."""
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        results = [result for chunk in chunks for result in _classify_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [result for chunk in pool.map(_classify_chunk, chunks) for result in chunk]
+
+    classes = {path: item for path, item, _ in results if item is not None}
+    report = family_statistics(classes.values())
+    report['classes'] = classes
+    report['errors'] = [{'file': path, 'error': error} for path, item, error in results if item is None]
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Classify Kohya configs by model family, network type and "
+                                                 "trainer mode, and report library-wide statistics.")
+    parser.add_argument("directory")
+    parser.add_argument("--report", help="Write the JSON report (statistics and per-file classes) here")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    from config_library import iter_config_files
+
+    class_report = classify_files(sorted(path for path, _ in iter_config_files(Path(args.directory))), args.workers)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(class_report, f)
+    print(statistics_to_markdown(class_report))
+    if class_report['errors']:
+        print(f"\n⚠️ {len(class_report['errors'])} files could not be read", file=sys.stderr)
+    sys.exit(1 if class_report['errors'] else 0)
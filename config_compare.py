@@ -0,0 +1,111 @@
+import json
+from array import array
+from typing import Dict, Any, Tuple, List, Iterable, Optional
+
+NOT_SET = "Not set"
+
+def value_token(value: Any) -> str:
+    """Canonical, hashable token for a config value (distinguishes 1, 1.0, true and "1")."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+class ComparisonMatrix:
+    """Columnar N-way comparison of configs over a fixed set of keys.
+
+    Each key is a dictionary-encoded column: the distinct values seen for that key
+    plus an ``array('i')`` of per-config codes into them. Building the matrix is a
+    single O(N*K) pass and every query reads one column, so there are no pairwise
+    comparisons.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys: List[str] = list(keys)
+        self.names: List[str] = []
+        self._values: Dict[str, List[Any]] = {key: [] for key in self.keys}
+        self._tokens: Dict[str, Dict[str, int]] = {key: {} for key in self.keys}
+        self._codes: Dict[str, array] = {key: array('i') for key in self.keys}
+
+    @classmethod
+    def from_configs(cls, named_configs: Iterable[Tuple[str, Dict[str, Any]]],
+                     keys: Iterable[str]) -> 'ComparisonMatrix':
+        matrix = cls(keys)
+        for name, config in named_configs:
+            matrix.add(name, config)
+        return matrix
+
+    def add(self, name: str, config: Dict[str, Any]):
+        """Appends one config as a new row."""
+        self.names.append(name)
+        for key in self.keys:
+            value = config[key] if key in config else NOT_SET
+            token = NOT_SET if value is NOT_SET else value_token(value)
+            tokens = self._tokens[key]
+            code = tokens.get(token)
+            if code is None:
+                code = tokens[token] = len(self._values[key])
+                self._values[key].append(value)
+            self._codes[key].append(code)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def codes(self, key: str) -> array:
+        """Per-config value codes for a key (index into distinct_values(key))."""
+        return self._codes[key]
+
+    def distinct_values(self, key: str) -> List[Any]:
+        """Distinct values for a key, in order of first appearance. Missing keys read as 'Not set'."""
+        return list(self._values[key])
+
+    def groups(self, key: str) -> List[Tuple[Any, List[str]]]:
+        """Returns (value, [config names sharing it]) for every distinct value of a key."""
+        members: List[List[str]] = [[] for _ in self._values[key]]
+        for name, code in zip(self.names, self._codes[key]):
+            members[code].append(name)
+        return list(zip(self._values[key], members))
+
+    def differs(self, key: str) -> bool:
+        return len(self._values[key]) > 1
+
+    def differing_keys(self) -> List[str]:
+        """Keys that do not have the same value across every config."""
+        return [key for key in self.keys if self.differs(key)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-data form of the matrix, suitable for JSON output or either frontend."""
+        return {
+            'configs': list(self.names),
+            'differing_keys': self.differing_keys(),
+            'keys': {
+                key: {
+                    'differs': self.differs(key),
+                    'values': [{'value': value, 'configs': names} for value, names in self.groups(key)],
+                }
+                for key in self.keys
+            },
+        }
+
+    def to_markdown(self, labels: Optional[Dict[str, str]] = None, max_names: int = 5,
+                    max_values: int = 10) -> str:
+        """Markdown report listing, for each differing key, which configs share each value."""
+        labels = labels or {}
+        parts = [f"## 🔍 {len(self.names)}-Way Configuration Comparison"]
+
+        differing = self.differing_keys()
+        if not differing:
+            parts.append("✅ **All configurations match in the compared parameters!**")
+            return "\n\n".join(parts)
+
+        parts.append(f"**{len(differing)} of {len(self.keys)} parameters differ.**")
+        for key in differing:
+            lines = [f"### {labels.get(key, key)}"]
+            groups = self.groups(key)
+            for value, names in groups[:max_values]:
+                shown = ", ".join(names[:max_names])
+                if len(names) > max_names:
+                    shown += f", … (+{len(names) - max_names})"
+                lines.append(f"- `{value}` ({len(names)}): {shown}")
+            if len(groups) > max_values:
+                lines.append(f"- … {len(groups) - max_values} more distinct values")
+            parts.append("\n".join(lines))
+
+        return "\n\n".join(parts)
@@ -0,0 +1,115 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Tuple, Union, Optional
+
+PathPart = Union[str, int]
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+class SubtreeHasher:
+    """Computes and memoizes content digests for the dict/list subtrees of a config.
+
+    Digests are computed lazily for the subtrees a diff actually visits and cached by
+    object identity (the hasher keeps a reference to each hashed container so ids
+    cannot be reused). A base config digested once can be diffed against any number
+    of other configs with equal branches skipped in O(1).
+    """
+
+    def __init__(self):
+        self._memo: Dict[int, bytes] = {}
+        self._keepalive: List[Any] = []
+
+    def digest(self, value: Any) -> bytes:
+        cached = self._memo.get(id(value)) if isinstance(value, (dict, list)) else None
+        if cached is not None:
+            return cached
+
+        # The C JSON encoder serializes a subtree far faster than walking it in Python,
+        # and keeps 1, 1.0, true and "1" distinct.
+        try:
+            text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=repr)
+        except TypeError: # Non-string dict keys cannot be sorted
+            text = repr(value)
+        result = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+        if isinstance(value, (dict, list)):
+            self._memo[id(value)] = result
+            self._keepalive.append(value)
+        return result
+
+    def clear(self):
+        self._memo.clear()
+        self._keepalive.clear()
+
+def format_path(path: List[PathPart]) -> str:
+    """Renders a key path as ``optimizer_args[0]`` / ``a.b.c``."""
+    text = ""
+    for part in path:
+        if isinstance(part, int):
+            text += f"[{part}]"
+        else:
+            text += f".{part}" if text else str(part)
+    return text
+
+def deep_diff(base: Any, other: Any, base_hasher: Optional[SubtreeHasher] = None,
+              other_hasher: Optional[SubtreeHasher] = None) -> List[Dict[str, Any]]:
+    """Recursively diffs two configs over all keys and nested lists/dicts.
+
+    Returns a list of plain dicts ``{'op', 'path', 'old', 'new'}`` where ``op`` is
+    'added', 'removed' or 'changed' and ``path`` is a list of keys/indices. Lists
+    are compared index by index. Pass a long-lived ``base_hasher`` to reuse the
+    base's subtree digests across many diffs.
+    """
+    hashers = (base_hasher or SubtreeHasher(), other_hasher or SubtreeHasher())
+    changes: List[Dict[str, Any]] = []
+    # The roots almost always differ, so their children are compared without digesting them.
+    _diff_node(base, other, [], hashers, changes, check_digest=False)
+    return changes
+
+def _diff_node(old: Any, new: Any, path: List[PathPart], hashers: Tuple[SubtreeHasher, SubtreeHasher],
+               changes: List[Dict[str, Any]], check_digest: bool = True):
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        if check_digest and hashers[0].digest(old) == hashers[1].digest(new):
+            return
+        for key in old:
+            if key not in new:
+                changes.append({'op': REMOVED, 'path': path + [key], 'old': old[key], 'new': None})
+            else:
+                _diff_node(old[key], new[key], path + [key], hashers, changes)
+        for key in new:
+            if key not in old:
+                changes.append({'op': ADDED, 'path': path + [key], 'old': None, 'new': new[key]})
+    elif isinstance(old, list) and isinstance(new, list):
+        if check_digest and hashers[0].digest(old) == hashers[1].digest(new):
+            return
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff_node(old[i], new[i], path + [i], hashers, changes)
+        for i in range(common, len(old)):
+            changes.append({'op': REMOVED, 'path': path + [i], 'old': old[i], 'new': None})
+        for i in range(common, len(new)):
+            changes.append({'op': ADDED, 'path': path + [i], 'old': None, 'new': new[i]})
+    elif type(old) is not type(new) or old != new:
+        changes.append({'op': CHANGED, 'path': path, 'old': old, 'new': new})
+
+def diff_to_markdown(changes: List[Dict[str, Any]], max_value_len: int = 80) -> str:
+    """Markdown list of a deep_diff result, one line per changed path."""
+    def short(value: Any) -> str:
+        text = str(value)
+        return text if len(text) <= max_value_len else text[:max_value_len - 1] + "…"
+
+    lines = []
+    for change in changes:
+        path = format_path(change['path'])
+        if change['op'] == ADDED:
+            lines.append(f"- ➕ **{path}:** `{short(change['new'])}`")
+        elif change['op'] == REMOVED:
+            lines.append(f"- ➖ **{path}:** `{short(change['old'])}`")
+        else:
+            lines.append(f"- **{path}:** `{short(change['old'])}` → `{short(change['new'])}`")
+    return "\n".join(lines)
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import operator
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+import json_codec
+
+NUM_PERM = 128 # MinHash slots per config
+DEFAULT_THRESHOLD = 0.7 # Estimated Jaccard similarity that puts two configs in one family
+# Per-run identity, not family traits: two runs of the same recipe differ only here
+IGNORED_KEYS: FrozenSet[str] = frozenset({'output_name', 'training_comment', 'sample_prompts', 'seed'})
+
+POOL_THRESHOLD = 256 # Fewer files than this are hashed in-process
+CHUNK_SIZE = 256
+MODE_SAMPLE = 1000 # Members used to pick a family's representative
+
+_MASK = (1 << 64) - 1
+_EMPTY = _MASK
+
+def _token(key: str, value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return f"{key}={json.dumps(value, sort_keys=True, ensure_ascii=False)}"
+    return f"{key}={value!r}"
+
+def config_tokens(config: Dict[str, Any], ignore: FrozenSet[str] = IGNORED_KEYS) -> Set[str]:
+    """The config as a set of 'key=value' tokens (nested values serialized canonically)."""
+    return {_token(key, value) for key, value in config.items() if key not in ignore}
+
+def token_hash(token: str) -> int:
+    """Stable 64-bit token hash (the same in every process and run, unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+_hash_cache: Dict[Tuple[str, type, Any], int] = {}
+_HASH_CACHE_LIMIT = 1 << 20
+
+def config_token_hashes(config: Dict[str, Any], ignore: FrozenSet[str] = IGNORED_KEYS) -> Set[int]:
+    """token_hash of every config token. Scalar tokens repeat across a library, so their
+    hashes are memoized per process."""
+    hashes = set()
+    cache = _hash_cache
+    for key, value in config.items():
+        if key in ignore:
+            continue
+        if isinstance(value, (dict, list)):
+            hashes.add(token_hash(_token(key, value)))
+            continue
+        cache_key = (key, type(value), value)
+        h = cache.get(cache_key)
+        if h is None:
+            if len(cache) >= _HASH_CACHE_LIMIT:
+                cache.clear()
+            h = cache[cache_key] = token_hash(_token(key, value))
+        hashes.add(h)
+    return hashes
+
+def minhash_signature(hashes: Iterable[int], num_perm: int = NUM_PERM) -> array:
+    """One-permutation MinHash of a set of token hashes: each hash picks a slot and the
+    slot keeps its minimum. Empty slots borrow the next filled slot (rotation
+    densification), so equal slots still estimate Jaccard similarity."""
+    slots = [_EMPTY] * num_perm
+    for h in hashes:
+        slot = h % num_perm
+        value = h // num_perm
+        if value < slots[slot]:
+            slots[slot] = value
+    if _EMPTY in slots and len(set(slots)) > 1:
+        offset = _MASK // num_perm + 1
+        filled = [slot != _EMPTY for slot in slots]
+        for i in range(num_perm):
+            if not filled[i]:
+                distance = 1
+                while not filled[(i + distance) % num_perm]:
+                    distance += 1
+                slots[i] = (slots[(i + distance) % num_perm] + distance * offset) & _MASK
+    return array('Q', slots)
+
+def estimate_jaccard(a: array, b: array) -> float:
+    return sum(map(operator.eq, a, b)) / len(a)
+
+def lsh_bands(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """(bands, rows) minimizing false positives below and false negatives above threshold."""
+    def area(bands: int, rows: int, lo: float, hi: float, positive: bool) -> float:
+        steps = 100
+        total = 0.0
+        for i in range(steps):
+            s = lo + (hi - lo) * (i + 0.5) / steps
+            p = 1 - (1 - s ** rows) ** bands
+            total += p if positive else 1 - p
+        return total * (hi - lo) / steps
+
+    best = (1, num_perm)
+    best_error = float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        error = area(bands, rows, 0.0, threshold, True) + area(bands, rows, threshold, 1.0, False)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+def _signature_chunk(paths: List[str], num_perm: int, ignore: FrozenSet[str]) -> List[Tuple[str, Optional[bytes], str]]:
+    results = []
+    for path in paths:
+        try:
+            config = json_codec.load_file(path)
+            if not isinstance(config, dict):
+                raise ValueError("top-level JSON value is not an object")
+            results.append((path, minhash_signature(config_token_hashes(config, ignore), num_perm).tobytes(), ""))
+        except (OSError, ValueError) as e:
+            results.append((path, None, str(e)))
+    return results
+
+def compute_signatures(paths: List[str], num_perm: int = NUM_PERM, ignore: FrozenSet[str] = IGNORED_KEYS,
+                       workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[array], str]]:
+    """Yields (path, signature or None, error) per file; large batches use every core."""
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    task = partial(_signature_chunk, num_perm=num_perm, ignore=ignore)
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        results = map(task, chunks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(task, chunks)
+    try:
+        for chunk in results:
+            for path, data, error in chunk:
+                signature = None
+                if data is not None:
+                    signature = array('Q')
+                    signature.frombytes(data)
+                yield path, signature, error
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def _representative(rows: List[int], signatures: List[array]) -> int:
+    """The member agreeing with the family's per-slot majority value most often."""
+    columns = zip(*(signatures[row] for row in rows[:MODE_SAMPLE]))
+    mode = [Counter(column).most_common(1)[0][0] for column in columns]
+    return max(rows, key=lambda row: (sum(map(operator.eq, signatures[row], mode)), -row))
+
+def cluster_signatures(paths: List[str], signatures: List[array],
+                       threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Groups configs into families with LSH banding; pairs sharing a band are kept when
+    their estimated similarity reaches threshold. Families are listed largest first, as
+    {'representative', 'size', 'members', 'mean_similarity'}."""
+    if not signatures:
+        return []
+    bands, rows_per_band = lsh_bands(threshold, len(signatures[0]))
+    union_find = _UnionFind(len(paths))
+    for band in range(bands):
+        start = band * rows_per_band
+        buckets: Dict[bytes, List[int]] = {}
+        for row, signature in enumerate(signatures):
+            bucket = buckets.setdefault(signature[start:start + rows_per_band].tobytes(), [])
+            for other in bucket: # Every member, so the outcome does not depend on input order
+                if union_find.find(other) != union_find.find(row) \
+                        and estimate_jaccard(signatures[other], signature) >= threshold:
+                    union_find.union(other, row)
+            bucket.append(row)
+
+    members: Dict[int, List[int]] = {}
+    for row in range(len(paths)):
+        members.setdefault(union_find.find(row), []).append(row)
+
+    families = []
+    for rows in members.values():
+        representative = _representative(rows, signatures) if len(rows) > 1 else rows[0]
+        similarities = [estimate_jaccard(signatures[representative], signatures[row]) for row in rows]
+        families.append({
+            'representative': paths[representative],
+            'size': len(rows),
+            'members': sorted(paths[row] for row in rows),
+            'mean_similarity': round(sum(similarities) / len(similarities), 4),
+        })
+    families.sort(key=lambda family: (-family['size'], family['representative']))
+    return families
+
+def cluster_files(paths: List[str], threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                  workers: Optional[int] = None) -> Dict[str, Any]:
+    """MinHash + LSH clustering of config files. Returns a JSON-serializable report."""
+    kept_paths: List[str] = []
+    signatures: List[array] = []
+    errors = []
+    for path, signature, error in compute_signatures(paths, num_perm, workers=workers):
+        if signature is None:
+            errors.append({'file': path, 'error': error})
+        else:
+            kept_paths.append(path)
+            signatures.append(signature)
+
+    bands, rows_per_band = lsh_bands(threshold, num_perm)
+    families = cluster_signatures(kept_paths, signatures, threshold)
+    return {
+        'threshold': threshold, 'num_perm': num_perm, 'bands': bands, 'rows_per_band': rows_per_band,
+        'configs': len(kept_paths),
+        'families': [family for family in families if family['size'] > 1],
+        'singletons': [family['representative'] for family in families if family['size'] == 1],
+        'errors': errors,
+    }
+
+def cluster_directory(root_dir: str, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                      workers: Optional[int] = None) -> Dict[str, Any]:
+    from config_library import iter_config_files
+
+    root = Path(root_dir)
+    report = cluster_files(sorted(path for path, _ in iter_config_files(root)), threshold, num_perm, workers)
+    report['root'] = str(root.resolve())
+    return report
+
+def families_to_markdown(report: Dict[str, Any], root: Optional[str] = None, max_families: int = 20,
+                         max_members: int = 5) -> str:
+    def relative(path: str) -> str:
+        return os.path.relpath(path, root) if root else path
+
+    families = report['families']
+    parts = [f"## 🐉 Config Families\n\n**{len(families)} families** and {len(report['singletons'])} unique configs "
+             f"among {report['configs']} (similarity ≥ {report['threshold']:.0%})"]
+    for number, family in enumerate(families[:max_families], 1):
+        lines = [f"### {number}. `{relative(family['representative'])}` — {family['size']} configs, "
+                 f"{family['mean_similarity']:.0%} mean similarity"]
+        others = [path for path in family['members'] if path != family['representative']]
+        lines.extend(f"- `{relative(path)}`" for path in others[:max_members])
+        if len(others) > max_members:
+            lines.append(f"- … and {len(others) - max_members} more")
+        parts.append("\n".join(lines))
+    if len(families) > max_families:
+        parts.append(f"… and {len(families) - max_families} more families")
+    if report['errors']:
+        parts.append(f"⚠️ {len(report['errors'])} files could not be read")
+    return "\n\n".join(parts)
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Group a directory of Kohya configs into families of "
+                                                 "near-duplicates (MinHash + LSH) with a representative base each.")
+    parser.add_argument("directory")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Similarity (0-1) at which configs belong to one family (default: 0.7)")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM)
+    parser.add_argument("--report", help="Write the JSON report here")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    family_report = cluster_directory(args.directory, args.threshold, args.num_perm, args.workers)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(family_report, f)
+    print(families_to_markdown(family_report, family_report['root']))
+    sys.exit(1 if family_report['errors'] else 0)
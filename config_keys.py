@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+from config_classifier import default_classifier
+
+DAILY_TWEAKS_MAP: Dict[str, str] = {
+    'output_name': 'Output Name',
+    'training_comment': 'Training Comment (Trigger Words)',
+    'sample_prompts': 'Sample Prompts',
+    'learning_rate': 'Learning Rate',
+    'unet_lr': 'UNet Learning Rate',
+    'text_encoder_lr': 'Text Encoder Learning Rate',
+    'epoch': 'Epochs',
+    'max_train_steps': 'Max Train Steps',
+    'seed': 'Seed',
+    'train_batch_size': 'Batch Size'
+}
+
+IMPORTANT_PARAMS_MAP: Dict[str, str] = {
+    'optimizer': 'Optimizer',
+    'lr_scheduler': 'LR Scheduler',
+    'network_dim': 'Network Dimension',
+    'network_alpha': 'Network Alpha',
+    'noise_offset': 'Noise Offset',
+    'min_snr_gamma': 'Min SNR Gamma',
+    'save_every_n_epochs': 'Save Every N Epochs',
+    'save_every_n_steps': 'Save Every N Steps'
+}
+
+# Keys needed for the UI, the summary and type detection; the library index and the
+# streaming loader read only these.
+SUMMARY_KEYS: List[str] = list(DAILY_TWEAKS_MAP) + list(IMPORTANT_PARAMS_MAP) + ['optimizer_args']
+SUMMARY_KEYS += [key for key in default_classifier().keys if key not in SUMMARY_KEYS]
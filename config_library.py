@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Tuple, List, Iterator, Optional
+
+from config_classifier import classify_config, type_label
+from config_keys import SUMMARY_KEYS
+from config_schema import default_schema
+import json_codec
+
+INDEX_FILENAME = ".taming_dragons_index.json"
+INDEX_VERSION = 4
+
+# Keys copied into each index entry so lookups and queries never have to touch the JSON
+# file: the summary keys plus every parameter of the bundled schema.
+_schema = default_schema()
+INDEXED_KEYS: List[str] = SUMMARY_KEYS + sorted(set(_schema.params if _schema else ()) - set(SUMMARY_KEYS))
+
+def hash_bytes(data: bytes) -> str:
+    """Returns the content hash used to key index entries."""
+    return hashlib.sha1(data).hexdigest()
+
+def iter_config_files(root: Path) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yields (path, stat) for every .json file below root, skipping the index itself.
+
+    Hidden directories (config store, patch backups, ...) are not descended into.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith('.json') and entry.name != INDEX_FILENAME:
+                        yield entry.path, entry.stat()
+        except OSError:
+            continue
+
+class ConfigLibrary:
+    """Index of a directory tree of Kohya configs, persisted in a sidecar cache file.
+
+    Each entry is keyed by path and validated by mtime + size + content hash, so a
+    rescan only re-reads files whose stat changed and only re-parses files whose
+    content actually changed.
+    """
+
+    def __init__(self, root_dir: str, index_path: Optional[str] = None):
+        self.root = Path(root_dir).resolve()
+        self.index_path = Path(index_path) if index_path else self.root / INDEX_FILENAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save_index(self):
+        """Writes the index to its sidecar file (temp file + rename)."""
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def build_entry(data: bytes, st: os.stat_result) -> Dict[str, Any]:
+        """Parses raw config bytes into an index entry."""
+        entry: Dict[str, Any] = {
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'hash': hash_bytes(data),
+        }
+        try:
+            config = json_codec.loads(data.decode('utf-8'))
+            if not isinstance(config, dict):
+                raise ValueError("top-level JSON value is not an object")
+        except ValueError as e:
+            entry['error'] = str(e)
+            return entry
+
+        entry.update(classify_config(config)) # model_family, network_type, trainer_mode
+        entry['config_type'] = type_label(entry)
+        entry['optimizer'] = config.get('optimizer', 'Unknown')
+        entry['fields'] = {key: config[key] for key in INDEXED_KEYS if key in config}
+        return entry
+
+    def scan(self) -> str:
+        """Walks the directory tree and refreshes changed entries. Returns a status message."""
+        start = time.perf_counter()
+        seen = set()
+        parsed = rehashed = 0
+
+        for path, st in iter_config_files(self.root):
+            seen.add(path)
+            old = self.entries.get(path)
+            if old and old['mtime_ns'] == st.st_mtime_ns and old['size'] == st.st_size:
+                continue
+
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+
+            if old and old['size'] == len(data) and old['hash'] == hash_bytes(data):
+                # Touched but not modified: refresh the stat key only.
+                old['mtime_ns'] = st.st_mtime_ns
+                rehashed += 1
+                continue
+
+            self.entries[path] = self.build_entry(data, st)
+            parsed += 1
+
+        removed = [path for path in self.entries if path not in seen]
+        for path in removed:
+            del self.entries[path]
+
+        if parsed or rehashed or removed:
+            self.save_index()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return (f"✅ Indexed {len(self.entries)} configs in {elapsed_ms:.1f} ms "
+                f"({parsed} parsed, {rehashed} touched, {len(removed)} removed)")
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Returns the index entry for a path, or None if it is not indexed."""
+        return self.entries.get(str(Path(file_path).resolve()))
+
+    def valid_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yields (path, entry) pairs for configs that parsed successfully."""
+        for path, entry in self.entries.items():
+            if 'error' not in entry:
+                yield path, entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
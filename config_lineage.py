@@ -0,0 +1,186 @@
+import gc
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from comparison_cache import hash_file
+from config_query import eq_key
+
+LINEAGE_FILENAME = ".taming_dragons_lineage.jsonl"
+LINEAGE_AUTO = "auto" # Log lineage beside the saved configs (in the library root when one is open)
+
+class LineageGraph:
+    """Indexed lineage of saved configs.
+
+    Nodes are content hashes (the sha1 used by the library index); an edge records that a
+    config was saved from a parent with a top-level delta. Parent/child adjacency and an
+    index of which node set which key to which value make every query proportional to
+    the size of its answer.
+    """
+
+    def __init__(self):
+        self.edges: Dict[str, List[Dict[str, Any]]] = {} # hash -> records that produced it
+        self.paths: Dict[str, List[str]] = {} # hash -> paths it was saved or loaded as
+        self._by_path: Dict[str, str] = {} # path -> hash last saved or loaded there
+        self.parents: Dict[str, Set[str]] = {}
+        self.children: Dict[str, Set[str]] = {}
+        self._set_by: Dict[Tuple[str, Any], Set[str]] = {} # (key, equality key) -> nodes setting it
+        self._touched: Dict[str, Set[str]] = {} # key -> nodes that set or removed it
+
+    def _add_path(self, digest: str, path: Optional[str]):
+        if path:
+            known = self.paths.setdefault(digest, [])
+            if path in known:
+                known.remove(path)
+            known.append(path) # Most recent last
+            self._by_path[path] = digest
+
+    def add(self, edge: Dict[str, Any]):
+        child, parent = edge['hash'], edge.get('parent')
+        self.edges.setdefault(child, []).append(edge)
+        if parent:
+            self._add_path(parent, edge.get('parent_path'))
+        self._add_path(child, edge.get('path'))
+        self.parents.setdefault(child, set())
+        if parent:
+            self.parents[child].add(parent)
+            self.children.setdefault(parent, set()).add(child)
+        delta = edge.get('delta', {})
+        for key, value in delta.get('set', {}).items():
+            self._set_by.setdefault((key, eq_key(value)), set()).add(child)
+            self._touched.setdefault(key, set()).add(child)
+        for key in delta.get('removed', []):
+            self._touched.setdefault(key, set()).add(child)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.parents or digest in self.children
+
+    def __len__(self) -> int:
+        return len(self.parents) + sum(1 for digest in self.children if digest not in self.parents)
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """Node hash for a file path (hashed if it exists), a recorded path or a hash prefix."""
+        if os.path.isfile(ref):
+            return hash_file(ref)
+        if ref in self:
+            return ref
+        digest = self._by_path.get(ref) or self._by_path.get(str(Path(ref).resolve()))
+        if digest:
+            return digest
+        matches = [digest for digest in self.paths if digest.startswith(ref)] if len(ref) >= 6 else []
+        return matches[0] if len(matches) == 1 else None
+
+    def path_of(self, digest: str) -> str:
+        """The most recent path a node was saved or loaded as (its hash if none)."""
+        paths = self.paths.get(digest)
+        return paths[-1] if paths else digest
+
+    def _walk(self, starts: Iterable[str], links: Dict[str, Set[str]],
+              blocked: Optional[Set[str]] = None) -> List[str]:
+        seen = set(starts)
+        order = []
+        queue = deque(seen)
+        while queue:
+            node = queue.popleft()
+            for nxt in links.get(node, ()):
+                if nxt not in seen and (blocked is None or nxt not in blocked):
+                    seen.add(nxt)
+                    order.append(nxt)
+                    queue.append(nxt)
+        return order
+
+    def descendants(self, digest: str) -> List[str]:
+        """Every config derived from digest, directly or indirectly, nearest first."""
+        return self._walk([digest], self.children)
+
+    def ancestors(self, digest: str) -> List[str]:
+        """Every config digest was derived from, nearest first."""
+        return self._walk([digest], self.parents)
+
+    def path(self, source: str, target: str) -> Optional[List[str]]:
+        """Shortest derivation chain [source, ..., target], or None if target does not descend from source."""
+        previous: Dict[str, Optional[str]] = {target: None}
+        queue = deque([target])
+        while queue:
+            node = queue.popleft()
+            if node == source:
+                chain = [node]
+                while previous[chain[-1]] is not None:
+                    chain.append(previous[chain[-1]])
+                return chain
+            for parent in self.parents.get(node, ()):
+                if parent not in previous:
+                    previous[parent] = node
+                    queue.append(parent)
+        return None
+
+    def deltas(self, digest: str) -> List[Dict[str, Any]]:
+        """The recorded deltas that produced digest (one per recorded save)."""
+        return self.edges.get(digest, [])
+
+    def inheritors(self, key: str, value: Any, sources: Iterable[str] = ()) -> List[str]:
+        """Configs carrying key=value because it was set on them or on an ancestor they did
+        not override. sources adds nodes known to have the value without it being recorded
+        (e.g. an original base file)."""
+        origins = set(self._set_by.get((key, eq_key(value)), ())) | set(sources)
+        overriding = self._touched.get(key, set()) - origins
+        inherited = self._walk(origins, self.children, overriding)
+        return sorted(origins) + inherited
+
+class LineageStore:
+    """Append-only JSON-lines sidecar of lineage records, one line per saved config:
+
+        {"hash", "path", "parent", "parent_path", "delta": {"set", "removed"}, "time"}
+
+    graph() returns the LineageGraph, reading only lines appended since the last call.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._graph = LineageGraph()
+        self._offset = 0
+
+    def record(self, digest: str, path: str, parent: Optional[str], parent_path: Optional[str],
+               delta: Dict[str, Any], timestamp: Optional[float] = None) -> Dict[str, Any]:
+        edge = {'hash': digest, 'path': path, 'parent': parent, 'parent_path': parent_path,
+                'delta': delta, 'time': round(time.time() if timestamp is None else timestamp, 3)}
+        line = json.dumps(edge, ensure_ascii=False, separators=(',', ':')) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line) # One write per record, so concurrent appends do not interleave
+        return edge
+
+    def graph(self) -> LineageGraph:
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return self._graph
+
+        end = data.rfind(b"\n") + 1 # Leave a partially written last line for next time
+        lines = [line for line in data[:end].splitlines() if line.strip()]
+        try:
+            edges = json.loads(b"[" + b",".join(lines) + b"]") # One parse for the whole batch
+        except ValueError:
+            edges = []
+            for line in lines: # Skip damaged lines only
+                try:
+                    edges.append(json.loads(line))
+                except ValueError:
+                    continue
+
+        gc_was_enabled = gc.isenabled()
+        gc.disable() # Building many small sets would otherwise trigger repeated collections
+        try:
+            for edge in edges:
+                if isinstance(edge, dict) and 'hash' in edge:
+                    self._graph.add(edge)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self._offset += end
+        return self._graph
@@ -0,0 +1,222 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import json_codec
+from config_diff import SubtreeHasher, format_path
+from save_pipeline import atomic_write_json
+
+MISSING = object() # Key absent on one side of the merge
+
+OURS = 'ours'
+THEIRS = 'theirs'
+SKIP = 'skip' # Batch mode only: leave conflicted files untouched
+CONFLICT_POLICIES = (OURS, THEIRS, SKIP)
+
+POOL_THRESHOLD = 32 # Fewer targets than this are merged in-process
+CHUNK_SIZE = 16
+
+class _Merger:
+    """Three-way merge of nested dicts; lists and scalars are merged as whole values."""
+
+    def __init__(self, prefer: str):
+        self.prefer = prefer
+        self.hashers = {name: SubtreeHasher() for name in ('base', 'ours', 'theirs')}
+        self.applied: List[Dict[str, Any]] = []
+        self.conflicts: List[Dict[str, Any]] = []
+
+    def same(self, a: Any, side_a: str, b: Any, side_b: str) -> bool:
+        if a is MISSING or b is MISSING:
+            return a is b
+        if isinstance(a, (dict, list)) and isinstance(b, (dict, list)):
+            return a is b or self.hashers[side_a].digest(a) == self.hashers[side_b].digest(b)
+        return type(a) is type(b) and a == b
+
+    def merge_dict(self, base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any],
+                   path: List[Any]) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        keys = list(ours) + [key for key in theirs if key not in ours]
+        keys += [key for key in base if key not in ours and key not in theirs]
+        for key in keys:
+            value = self.merge_value(base.get(key, MISSING), ours.get(key, MISSING),
+                                     theirs.get(key, MISSING), path + [key])
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+
+    def merge_value(self, base: Any, ours: Any, theirs: Any, path: List[Any]) -> Any:
+        if self.same(ours, 'ours', theirs, 'theirs'):
+            return ours
+        if self.same(ours, 'ours', base, 'base'):
+            self.applied.append({'path': path, 'old': base, 'new': theirs})
+            return theirs
+        if self.same(theirs, 'theirs', base, 'base'):
+            return ours
+        if isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict):
+            return self.merge_dict(base, ours, theirs, path)
+        self.conflicts.append({'path': path, 'base': base, 'ours': ours, 'theirs': theirs})
+        return theirs if self.prefer == THEIRS else ours
+
+def merge3(base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any],
+           prefer: str = OURS) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Three-way merges two configs derived from base.
+
+    Changes made on only one side are applied; keys changed differently on both sides
+    are conflicts, resolved with ``prefer`` (ours or theirs) in the merged result.
+    Returns (merged, applied changes from theirs, conflicts). Conflict/change paths are
+    key lists; absent values are the MISSING sentinel.
+    """
+    merger = _Merger(prefer)
+    merged = merger.merge_dict(base, ours, theirs, [])
+    return merged, merger.applied, merger.conflicts
+
+def _plain(value: Any) -> Any:
+    return None if value is MISSING else value
+
+def conflicts_to_report(conflicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """JSON-serializable conflicts: {'path': 'a.b[0]', 'base', 'ours', 'theirs', 'missing': [sides]}."""
+    report = []
+    for conflict in conflicts:
+        entry = {'path': format_path(conflict['path'])}
+        missing = []
+        for side in ('base', 'ours', 'theirs'):
+            entry[side] = _plain(conflict[side])
+            if conflict[side] is MISSING:
+                missing.append(side)
+        if missing:
+            entry['missing'] = missing
+        report.append(entry)
+    return report
+
+def merge_to_markdown(applied: List[Dict[str, Any]], conflicts: List[Dict[str, Any]],
+                      max_value_len: int = 80) -> str:
+    def short(value: Any) -> str:
+        text = "(not set)" if value is MISSING else str(value)
+        return text if len(text) <= max_value_len else text[:max_value_len - 1] + "…"
+
+    parts = ["## 🔀 Three-Way Merge"]
+    if applied:
+        parts.append(f"### ✅ Applied from theirs ({len(applied)})")
+        parts.append("\n".join(f"- **{format_path(c['path'])}:** `{short(c['old'])}` → `{short(c['new'])}`"
+                               for c in applied))
+    if conflicts:
+        parts.append(f"### ⚠️ Conflicts ({len(conflicts)})")
+        parts.append("\n".join(f"- **{format_path(c['path'])}:** base `{short(c['base'])}`, "
+                               f"ours `{short(c['ours'])}`, theirs `{short(c['theirs'])}`"
+                               for c in conflicts))
+    if not applied and not conflicts:
+        parts.append("ℹ️ Nothing to merge: theirs has no changes that ours does not already have.")
+    return "\n\n".join(parts)
+
+_worker_sides: Tuple[Dict[str, Any], Dict[str, Any]] = ({}, {})
+
+def _init_worker(base: Dict[str, Any], theirs: Dict[str, Any]):
+    global _worker_sides
+    _worker_sides = (base, theirs)
+
+def merge_file(path: str, base: Dict[str, Any], theirs: Dict[str, Any], out_dir: Optional[str] = None,
+               on_conflict: str = SKIP, root: Optional[str] = None) -> Dict[str, Any]:
+    """Merges one downstream config file (ours) and writes the result atomically.
+
+    The result goes to out_dir (keeping the path relative to root) or replaces the file.
+    Returns a JSON-serializable result: file, status (merged/unchanged/conflict/error),
+    applied count and conflicts.
+    """
+    result: Dict[str, Any] = {'file': path, 'status': 'unchanged', 'applied': 0, 'conflicts': []}
+    try:
+        ours = json_codec.load_file(path)
+        if not isinstance(ours, dict):
+            raise ValueError("top-level JSON value is not an object")
+        merged, applied, conflicts = merge3(base, ours, theirs, OURS if on_conflict == SKIP else on_conflict)
+        result['applied'] = len(applied)
+        result['conflicts'] = conflicts_to_report(conflicts)
+        if conflicts and on_conflict == SKIP:
+            result['status'] = 'conflict'
+            return result
+
+        target = Path(path)
+        if out_dir:
+            relative = os.path.relpath(path, root) if root else os.path.basename(path)
+            target = Path(out_dir) / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+        if applied or conflicts or out_dir:
+            atomic_write_json(target, merged)
+        if applied or conflicts:
+            result['status'] = 'merged'
+        result['output'] = str(target)
+    except (OSError, ValueError) as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    return result
+
+def _merge_chunk(paths: List[str], out_dir: Optional[str], on_conflict: str, root: Optional[str],
+                 sides: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    base, theirs = sides if sides is not None else _worker_sides
+    return [merge_file(path, base, theirs, out_dir, on_conflict, root) for path in paths]
+
+def merge_batch(base: Dict[str, Any], theirs: Dict[str, Any], paths: List[str], out_dir: Optional[str] = None,
+                on_conflict: str = SKIP, root: Optional[str] = None,
+                workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Propagates the base -> theirs changes into every downstream config, yielding per-file results.
+
+    base and theirs are sent to each worker process once; tasks carry only file paths.
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}")
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        for chunk in chunks:
+            yield from _merge_chunk(chunk, out_dir, on_conflict, root, (base, theirs))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base, theirs)) as pool:
+        for results in pool.map(partial(_merge_chunk, out_dir=out_dir, on_conflict=on_conflict, root=root), chunks):
+            yield from results
+
+def summarize_batch(results: List[Dict[str, Any]]) -> str:
+    counts = {status: 0 for status in ('merged', 'unchanged', 'conflict', 'error')}
+    for result in results:
+        counts[result['status']] += 1
+    icon = "⚠️" if counts['conflict'] or counts['error'] else "✅"
+    return (f"{icon} Merged {counts['merged']} of {len(results)} configs "
+            f"({counts['unchanged']} unchanged, {counts['conflict']} conflicted, {counts['error']} errors)")
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Propagate an upstream config change (base -> theirs) "
+                                                 "into many downstream configs with a three-way merge.")
+    parser.add_argument("base", help="Upstream config before the change")
+    parser.add_argument("theirs", help="Upstream config after the change")
+    parser.add_argument("targets", nargs="+", help="Downstream config files or directories")
+    parser.add_argument("--out-dir", help="Write merged configs here instead of in place")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default=SKIP,
+                        help="skip conflicted files (default) or resolve with ours/theirs")
+    parser.add_argument("--report", help="Write the per-file JSON report here")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    from config_library import iter_config_files
+
+    target_paths = []
+    for target in args.targets:
+        if os.path.isdir(target):
+            target_paths.extend(sorted(path for path, _ in iter_config_files(Path(target))))
+        else:
+            target_paths.append(target)
+    root = args.targets[0] if len(args.targets) == 1 and os.path.isdir(args.targets[0]) else None
+
+    batch_results = list(merge_batch(json_codec.load_file(args.base), json_codec.load_file(args.theirs),
+                                     target_paths, args.out_dir, args.on_conflict, root, args.workers))
+    for batch_result in batch_results:
+        if batch_result['status'] in ('conflict', 'error'):
+            detail = batch_result.get('error') or ", ".join(c['path'] for c in batch_result['conflicts'])
+            print(f"{batch_result['status']}: {batch_result['file']}: {detail}", file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(batch_results, f)
+    print(summarize_batch(batch_results))
+    sys.exit(1 if any(r['status'] in ('conflict', 'error') for r in batch_results) else 0)
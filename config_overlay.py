@@ -0,0 +1,117 @@
+import copy
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Any, Iterator, Optional, Set, Tuple
+
+_MISSING = object()
+
+def same_value(a: Any, b: Any) -> bool:
+    """Equality that keeps 1, 1.0 and True apart (they are different JSON values)."""
+    return type(a) is type(b) and a == b
+
+def as_plain_dict(config: Mapping) -> Dict[str, Any]:
+    """Returns config as a plain dict (e.g. for json.dump), without copying when it already is one."""
+    if isinstance(config, dict):
+        return config
+    to_dict = getattr(config, 'to_dict', None)
+    return to_dict() if to_dict is not None else dict(config)
+
+class ConfigOverlay(MutableMapping):
+    """Copy-on-write view of a base config: the base is never modified, edits live in a delta.
+
+    Creating an overlay costs O(1) regardless of the base size. Nested lists/dicts
+    read from the base are deep-copied into the overlay on first access, so mutating
+    them in place cannot leak into the base or into sibling overlays.
+    """
+
+    def __init__(self, base: Mapping, delta: Optional[Dict[str, Any]] = None,
+                 deleted: Optional[Set[str]] = None):
+        self._base = base
+        self._delta: Dict[str, Any] = delta if delta is not None else {}
+        self._deleted: Set[str] = deleted if deleted is not None else set()
+
+    @property
+    def base(self) -> Mapping:
+        return self._base
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._delta.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._deleted:
+            raise KeyError(key)
+        value = self._base[key]
+        if isinstance(value, (dict, list)):
+            value = self._delta[key] = copy.deepcopy(value) # Copy on first read of a nested value
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._delta[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._delta.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._delta:
+            return True
+        return key not in self._deleted and key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._base:
+            if key not in self._deleted:
+                yield key
+        for key in self._delta:
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        if self._delta:
+            return True
+        if not self._deleted:
+            return bool(self._base) # Cheap even for an unmaterialized LazyConfig
+        return any(key not in self._deleted for key in self._base)
+
+    def changes(self) -> Dict[str, Tuple[Any, Any]]:
+        """{key: (base value, current value)} for every key that differs from the base.
+
+        Keys new to the base report None as their base value; removed keys report None
+        as their current value (see removed_keys() to tell them apart from a real None).
+        """
+        result = {}
+        for key, value in self._delta.items():
+            if key not in self._base:
+                result[key] = (None, value)
+            elif not same_value(self._base[key], value):
+                result[key] = (self._base[key], value)
+        for key in self._deleted:
+            result[key] = (self._base[key], None)
+        return result
+
+    def removed_keys(self) -> Set[str]:
+        return set(self._deleted)
+
+    def copy(self) -> 'ConfigOverlay':
+        """Sibling overlay on the same base; costs O(size of the delta)."""
+        return ConfigOverlay(self._base, copy.deepcopy(self._delta), set(self._deleted))
+
+    def rebased(self, base: Mapping) -> 'ConfigOverlay':
+        """The same edits over another base holding the same values (e.g. a plain copy of
+        the old one). The delta is handed over, not copied; drop this overlay afterwards."""
+        return ConfigOverlay(base, self._delta, self._deleted)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the current contents (shares unmodified values with the base)."""
+        base = as_plain_dict(self._base)
+        result = {key: value for key, value in base.items() if key not in self._deleted}
+        result.update(self._delta)
+        return result
+
+    def __repr__(self) -> str:
+        return f"<ConfigOverlay {len(self._delta)} edited, {len(self._deleted)} removed>"
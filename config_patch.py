@@ -0,0 +1,436 @@
+import copy
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import json_codec
+from config_diff import deep_diff, format_path
+from save_pipeline import atomic_write_text, fsync_dir
+
+BACKUP_DIRNAME = ".taming_dragons_patches" # Hidden, so library scans and later patches skip it
+MANIFEST_FILENAME = "manifest.jsonl"
+
+POOL_THRESHOLD = 64 # Fewer files than this are patched in-process
+CHUNK_SIZE = 256
+MAX_SAMPLE_DIFFS = 20 # Per-file diffs kept in a dry-run report
+
+# A JSON Patch (RFC 6902) operation list, or a partial config dict merged into each file.
+Patch = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+class PatchTestFailed(Exception):
+    """A JSON Patch 'test' operation did not match: the file is skipped, not an error."""
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError(f"Invalid JSON pointer: {pointer!r}")
+    return [part.replace('~1', '/').replace('~0', '~') for part in pointer[1:].split('/')]
+
+def _list_index(container: list, part: str, allow_end: bool) -> int:
+    if allow_end and part == '-':
+        return len(container)
+    if not part.isdigit() or (len(part) > 1 and part[0] == '0'):
+        raise ValueError(f"Invalid list index: {part!r}")
+    index = int(part)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise ValueError(f"List index out of range: {index}")
+    return index
+
+def _resolve(doc: Any, parts: List[str]) -> Any:
+    for part in parts:
+        if isinstance(doc, dict):
+            if part not in doc:
+                raise ValueError(f"Path not found: /{'/'.join(parts)}")
+            doc = doc[part]
+        elif isinstance(doc, list):
+            doc = doc[_list_index(doc, part, allow_end=False)]
+        else:
+            raise ValueError(f"Path not found: /{'/'.join(parts)}")
+    return doc
+
+def _parent_for_write(doc: Any, parts: List[str]) -> Any:
+    """The container holding parts[-1], copied on the way down so the input is never mutated."""
+    node = doc
+    for part in parts[:-1]:
+        if isinstance(node, dict):
+            if part not in node:
+                raise ValueError(f"Path not found: /{'/'.join(parts)}")
+            node[part] = copy.copy(node[part])
+            node = node[part]
+        elif isinstance(node, list):
+            index = _list_index(node, part, allow_end=False)
+            node[index] = copy.copy(node[index])
+            node = node[index]
+        else:
+            raise ValueError(f"Path not found: /{'/'.join(parts)}")
+    if not isinstance(node, (dict, list)):
+        raise ValueError(f"Path not found: /{'/'.join(parts)}")
+    return node
+
+def _add(doc: Any, parts: List[str], value: Any) -> Any:
+    if not parts:
+        return value
+    parent = _parent_for_write(doc, parts)
+    if isinstance(parent, dict):
+        parent[parts[-1]] = value
+    else:
+        parent.insert(_list_index(parent, parts[-1], allow_end=True), value)
+    return doc
+
+def _remove(doc: Any, parts: List[str]) -> Tuple[Any, Any]:
+    if not parts:
+        raise ValueError("Cannot remove the whole document")
+    parent = _parent_for_write(doc, parts)
+    if isinstance(parent, dict):
+        if parts[-1] not in parent:
+            raise ValueError(f"Path not found: /{'/'.join(parts)}")
+        return doc, parent.pop(parts[-1])
+    return doc, parent.pop(_list_index(parent, parts[-1], allow_end=False))
+
+def json_equal(a: Any, b: Any) -> bool:
+    """Equality of RFC 6902 'test': numbers compare by value (1 equals 1.0), booleans are
+    not numbers, and arrays and objects compare member by member."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(map(json_equal, a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(json_equal(value, b[key]) for key, value in a.items())
+    return type(a) is type(b) and a == b
+
+def apply_json_patch(config: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Applies RFC 6902 operations to a copy of config (the input is not modified).
+
+    Raises PatchTestFailed when a 'test' operation does not match and ValueError for
+    invalid operations or paths.
+    """
+    doc: Any = copy.copy(config)
+    for operation in operations:
+        op = operation.get('op')
+        parts = _parse_pointer(operation.get('path', ''))
+        if op == 'add':
+            doc = _add(doc, parts, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            doc, _ = _remove(doc, parts)
+        elif op == 'replace':
+            _resolve(doc, parts) # Must exist
+            value = copy.deepcopy(operation['value'])
+            if not parts:
+                doc = value
+            else:
+                parent = _parent_for_write(doc, parts)
+                if isinstance(parent, dict):
+                    parent[parts[-1]] = value
+                else:
+                    parent[_list_index(parent, parts[-1], allow_end=False)] = value
+        elif op == 'move':
+            source = _parse_pointer(operation['from'])
+            doc, value = _remove(doc, source)
+            doc = _add(doc, parts, value)
+        elif op == 'copy':
+            doc = _add(doc, parts, copy.deepcopy(_resolve(doc, _parse_pointer(operation['from']))))
+        elif op == 'test':
+            actual = _resolve(doc, parts)
+            if not json_equal(actual, operation['value']):
+                raise PatchTestFailed(operation.get('path', ''))
+        else:
+            raise ValueError(f"Unknown JSON Patch operation: {op!r}")
+    if not isinstance(doc, dict):
+        raise ValueError("Patch result is not a JSON object")
+    return doc
+
+def apply_partial(config: Dict[str, Any], partial_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of config with partial_config's values set; nested dicts are merged key by key.
+
+    Unlike JSON Merge Patch, null is stored as a value (Kohya uses null); use a JSON
+    Patch 'remove' operation to delete keys.
+    """
+    result = dict(config)
+    for key, value in partial_config.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_partial(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+def apply_patch(config: Dict[str, Any], patch: Patch) -> Dict[str, Any]:
+    return apply_json_patch(config, patch) if isinstance(patch, list) else apply_partial(config, patch)
+
+def matches(config: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """True if every top-level key in where has that value in config (see json_equal)."""
+    if not where:
+        return True
+    for key, value in where.items():
+        if key not in config or not json_equal(config[key], value):
+            return False
+    return True
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def _append_manifest(backup_dir: str, entry: List[str]):
+    """Appends one manifest line in a single O_APPEND write, so worker processes can share the file."""
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+    fd = os.open(os.path.join(backup_dir, MANIFEST_FILENAME), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)
+    try:
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def patch_file(path: str, patch: Patch, root: str, where: Optional[Dict[str, Any]] = None,
+               dry_run: bool = False, backup_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Patches one config file. Returns a JSON-serializable result.
+
+    status is patched / unchanged (patch made no difference) / skipped (where or a
+    'test' operation did not match) / error. Before a file is rewritten its original
+    bytes are copied into backup_dir and listed in its manifest, and the result carries
+    both content hashes.
+    """
+    relative = os.path.relpath(path, root)
+    result: Dict[str, Any] = {'file': relative, 'status': 'unchanged'}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        config = json_codec.loads(data.decode('utf-8'))
+        if not isinstance(config, dict):
+            raise ValueError("top-level JSON value is not an object")
+        if not matches(config, where):
+            result['status'] = 'skipped'
+            return result
+        try:
+            patched = apply_patch(config, patch)
+        except PatchTestFailed as e:
+            result['status'] = 'skipped'
+            result['reason'] = f"test failed at {e}"
+            return result
+
+        changes = deep_diff(config, patched)
+        if not changes:
+            return result
+        result['status'] = 'patched'
+        result['changed_paths'] = [format_path(change['path']) for change in changes]
+        if dry_run:
+            result['changes'] = changes
+            return result
+
+        text = json_codec.dumps_pretty(patched)
+        result['original_hash'] = _hash(data)
+        result['patched_hash'] = _hash(text.replace("\n", os.linesep).encode('utf-8'))
+        if backup_dir: # Backup and manifest line reach the disk before the file is replaced
+            backup_path = Path(backup_dir) / relative
+            backup_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(backup_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            _append_manifest(backup_dir, [relative, result['original_hash'], result['patched_hash']])
+        atomic_write_text(Path(path), text, sync_dir=False) # Directories are synced once per run
+    except (OSError, ValueError, KeyError) as e:
+        result['status'] = 'error'
+        result['error'] = str(e) if not isinstance(e, KeyError) else f"Missing field in patch operation: {e}"
+    return result
+
+def _patch_chunk(paths: List[str], patch: Patch, root: str, where: Optional[Dict[str, Any]],
+                 dry_run: bool, backup_dir: Optional[str]) -> List[Dict[str, Any]]:
+    return [patch_file(path, patch, root, where, dry_run, backup_dir) for path in paths]
+
+def _new_run_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(3)
+
+def patch_directory(root_dir: str, patch: Patch, where: Optional[Dict[str, Any]] = None, dry_run: bool = False,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+    """Applies patch to every config below root_dir that matches where, over worker processes.
+
+    A real run backs up every rewritten file under ``<root>/.taming_dragons_patches/<run_id>/``
+    with a manifest, so rollback_run() can undo it. Returns a JSON-serializable report;
+    a dry run writes nothing and includes a per-path change summary and sample diffs.
+    """
+    from config_library import iter_config_files
+
+    root = str(Path(root_dir).resolve())
+    paths = sorted(path for path, _ in iter_config_files(Path(root)))
+    run_id = None if dry_run else _new_run_id()
+    backup_dir = None if dry_run else os.path.join(root, BACKUP_DIRNAME, run_id)
+
+    task = partial(_patch_chunk, patch=patch, root=root, where=where, dry_run=dry_run, backup_dir=backup_dir)
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        for chunk in chunks:
+            results.extend(task(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(task, chunks):
+                results.extend(chunk_results)
+
+    report: Dict[str, Any] = {
+        'root': root, 'run_id': run_id, 'dry_run': dry_run, 'files': len(results),
+        'counts': dict(Counter(result['status'] for result in results)),
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'changed_paths': dict(Counter(p for result in results for p in result.get('changed_paths', ()))),
+        'errors': [{'file': r['file'], 'error': r['error']} for r in results if r['status'] == 'error'],
+    }
+    if dry_run:
+        report['sample_diffs'] = [{'file': r['file'], 'changes': r['changes']}
+                                  for r in results if r['status'] == 'patched'][:MAX_SAMPLE_DIFFS]
+    else:
+        patched = [r for r in results if r['status'] == 'patched']
+        for directory in {os.path.dirname(os.path.join(root, r['file'])) for r in patched}:
+            fsync_dir(Path(directory))
+        if not os.path.exists(os.path.join(backup_dir, MANIFEST_FILENAME)): # Nothing was rewritten
+            report['run_id'] = None
+    return report
+
+def list_runs(root_dir: str) -> List[str]:
+    """Patch runs that can be rolled back, oldest first."""
+    runs_dir = Path(root_dir) / BACKUP_DIRNAME
+    if not runs_dir.is_dir():
+        return []
+    return sorted(entry.name for entry in runs_dir.iterdir() if (entry / MANIFEST_FILENAME).exists())
+
+def rollback_run(root_dir: str, run_id: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """Restores the files a patch run rewrote (the latest run by default).
+
+    Files changed again since the run are left alone unless force is set. The run's
+    backups are removed once every file was restored.
+    """
+    root = Path(root_dir).resolve()
+    runs = list_runs(str(root))
+    if not runs:
+        raise ValueError("No patch runs to roll back")
+    run_id = run_id or runs[-1]
+    run_dir = root / BACKUP_DIRNAME / run_id
+    manifest_path = run_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        raise ValueError(f"Unknown patch run: {run_id}")
+
+    restored, modified, missing = [], [], []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = [json_codec.loads(line) for line in f if line.strip()]
+    for relative, original_hash, patched_hash in entries:
+        target = root / relative
+        backup = run_dir / relative
+        if not backup.exists():
+            missing.append(relative)
+            continue
+        try:
+            with open(target, 'rb') as f:
+                current_hash = _hash(f.read())
+        except OSError:
+            current_hash = None
+        if current_hash != patched_hash and current_hash != original_hash and not force:
+            modified.append(relative)
+            continue
+        tmp_path = target.with_name(f".{target.name}.rollback.tmp")
+        shutil.copyfile(backup, tmp_path)
+        os.replace(tmp_path, target)
+        restored.append(relative)
+
+    if not modified and not missing:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return {'run_id': run_id, 'restored': len(restored), 'modified_since': modified, 'missing_backups': missing}
+
+def load_patch(text_or_path: str) -> Patch:
+    """A patch from a JSON file path or inline JSON text."""
+    stripped = text_or_path.lstrip()
+    if stripped.startswith('{') or stripped.startswith('['):
+        patch = json_codec.loads(stripped)
+    else:
+        patch = json_codec.load_file(text_or_path)
+    if not isinstance(patch, (dict, list)):
+        raise ValueError("A patch must be a JSON object (partial config) or array (JSON Patch)")
+    return patch
+
+def parse_assignments(assignments: List[str]) -> Dict[str, Any]:
+    """['key=value', ...] -> dict; values are parsed as JSON when possible, else kept as text."""
+    result = {}
+    for assignment in assignments:
+        key, sep, value = assignment.partition('=')
+        if not sep or not key:
+            raise ValueError(f"Expected KEY=VALUE, got {assignment!r}")
+        try:
+            result[key] = json_codec.loads(value)
+        except ValueError:
+            result[key] = value
+    return result
+
+def summarize_report(report: Dict[str, Any]) -> str:
+    counts = report['counts']
+    verb = "Would patch" if report['dry_run'] else "Patched"
+    status = "❌" if counts.get('error') else "✅"
+    text = (f"{status} {verb} {counts.get('patched', 0)} of {report['files']} configs "
+            f"({counts.get('unchanged', 0)} unchanged, {counts.get('skipped', 0)} skipped, "
+            f"{counts.get('error', 0)} errors) in {report['elapsed_s']:.2f}s")
+    if report.get('run_id'):
+        text += f". Roll back with run id {report['run_id']}"
+    return text
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Apply a JSON Patch or partial config to every config in a directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    apply_parser = sub.add_parser("apply", help="Patch every matching config")
+    apply_parser.add_argument("directory")
+    apply_parser.add_argument("patch", nargs="?", help="Patch file, or inline JSON (object = partial config, array = JSON Patch)")
+    apply_parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                              help="Set a top-level key (repeatable; VALUE is parsed as JSON if possible)")
+    apply_parser.add_argument("--where", action="append", default=[], metavar="KEY=VALUE",
+                              help="Only patch configs where KEY has this value (repeatable)")
+    apply_parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    apply_parser.add_argument("--report", help="Write the JSON report here")
+    apply_parser.add_argument("--workers", type=int, default=None)
+    rollback_parser = sub.add_parser("rollback", help="Undo a patch run (the latest by default)")
+    rollback_parser.add_argument("directory")
+    rollback_parser.add_argument("run_id", nargs="?")
+    rollback_parser.add_argument("--force", action="store_true", help="Also restore files edited since the run")
+    list_parser = sub.add_parser("runs", help="List patch runs that can be rolled back")
+    list_parser.add_argument("directory")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "runs":
+            print("\n".join(list_runs(args.directory)) or "No patch runs.")
+            sys.exit(0)
+        if args.command == "rollback":
+            outcome = rollback_run(args.directory, args.run_id, args.force)
+            print(f"✅ Restored {outcome['restored']} configs from run {outcome['run_id']}")
+            for relative in outcome['modified_since']:
+                print(f"modified since the patch, not restored: {relative}", file=sys.stderr)
+            sys.exit(1 if outcome['modified_since'] or outcome['missing_backups'] else 0)
+
+        if args.patch and args.set:
+            parser.error("give either a patch or --set, not both")
+        patch_value = load_patch(args.patch) if args.patch else parse_assignments(args.set)
+        if not patch_value:
+            parser.error("nothing to apply: give a patch or --set KEY=VALUE")
+        run_report = patch_directory(args.directory, patch_value, parse_assignments(args.where) or None,
+                                     args.dry_run, args.workers)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(run_report, f)
+    if args.dry_run:
+        for changed_path, count in sorted(run_report['changed_paths'].items(), key=lambda item: -item[1]):
+            print(f"{changed_path}: {count} configs")
+    for error in run_report['errors']:
+        print(f"error: {error['file']}: {error['error']}", file=sys.stderr)
+    print(summarize_report(run_report))
+    sys.exit(1 if run_report['errors'] else 0)
@@ -0,0 +1,150 @@
+import bisect
+import json
+import re
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+# field OP value, where value is a "quoted string" or a bare word (typed as JSON when possible)
+_TERM = re.compile(r'\s*([A-Za-z_][\w.]*)\s*(>=|<=|!=|=|>|<|~)\s*("(?:[^"\\]|\\.)*"|[^\s"]+)')
+_WORD = re.compile(r'\w+')
+
+NUMERIC_OPS = ('>=', '<=', '>', '<')
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed or refers to an unindexed field."""
+
+def parse_query(query: str) -> List[Tuple[str, str, Any]]:
+    """'optimizer=Prodigy network_dim>=64 training_comment~"woman"' -> [(field, op, value), ...]
+
+    Terms are ANDed. Bare values are typed as JSON (64, 1e-4, true, null) and fall back to
+    text; quoted values are always text.
+    """
+    terms = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        m = _TERM.match(query, pos)
+        if not m:
+            raise QueryError(f"Cannot parse query at: {query[pos:]!r}")
+        field, op, raw = m.groups()
+        if raw.startswith('"'):
+            value: Any = json.loads(raw)
+        else:
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                value = raw
+        if op in NUMERIC_OPS and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+            raise QueryError(f"'{field}{op}' needs a number, got {raw}")
+        terms.append((field, op, value))
+        pos = m.end()
+        while pos < len(query) and query[pos].isspace():
+            pos += 1
+    if not terms:
+        raise QueryError("Empty query")
+    return terms
+
+def eq_key(value: Any) -> Any:
+    """Equality key: numbers compare by value (64 == 64.0), text case-insensitively."""
+    if isinstance(value, bool):
+        return ('bool', value)
+    if isinstance(value, (int, float)):
+        return ('num', float(value))
+    if isinstance(value, str):
+        return ('str', value.casefold())
+    if value is None:
+        return ('null',)
+    return ('json', json.dumps(value, sort_keys=True, ensure_ascii=False))
+
+class QueryIndex:
+    """In-memory indexes over the library's indexed fields.
+
+    Every field gets an inverted index (equality key -> row ids); numeric values also go
+    into a sorted (value, row) list for range terms, and text values into a word index
+    for ``~`` (case-insensitive substring) terms. Results are config file paths, ready
+    for TamingDragonsModel.set_base_config().
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict[str, Any]]]):
+        self.paths: List[str] = []
+        self.fields: Set[str] = set()
+        self._inverted: Dict[str, Dict[Any, Set[int]]] = {}
+        self._numeric: Dict[str, Tuple[List[float], List[int]]] = {}
+        self._words: Dict[str, Dict[str, Set[int]]] = {}
+        self._text: Dict[str, Dict[int, str]] = {}
+
+        numeric_pairs: Dict[str, List[Tuple[float, int]]] = {}
+        for path, entry in entries:
+            row = len(self.paths)
+            self.paths.append(path)
+            for field, value in entry.get('fields', {}).items():
+                self.fields.add(field)
+                self._inverted.setdefault(field, {}).setdefault(eq_key(value), set()).add(row)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numeric_pairs.setdefault(field, []).append((float(value), row))
+                elif isinstance(value, str) and value:
+                    text = value.casefold()
+                    self._text.setdefault(field, {})[row] = text
+                    words = self._words.setdefault(field, {})
+                    for word in set(_WORD.findall(text)):
+                        words.setdefault(word, set()).add(row)
+
+        for field, pairs in numeric_pairs.items():
+            pairs.sort()
+            self._numeric[field] = ([value for value, _ in pairs], [row for _, row in pairs])
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _rows_eq(self, field: str, value: Any) -> Set[int]:
+        return self._inverted.get(field, {}).get(eq_key(value), set())
+
+    def _rows_range(self, field: str, op: str, value: float) -> Set[int]:
+        values, rows = self._numeric.get(field, ([], []))
+        if op == '>=':
+            return set(rows[bisect.bisect_left(values, value):])
+        if op == '>':
+            return set(rows[bisect.bisect_right(values, value):])
+        if op == '<=':
+            return set(rows[:bisect.bisect_right(values, value)])
+        return set(rows[:bisect.bisect_left(values, value)])
+
+    def _rows_contains(self, field: str, value: Any) -> Set[int]:
+        needle = str(value).casefold()
+        texts = self._text.get(field, {})
+        query_words = _WORD.findall(needle)
+        if not query_words:
+            return {row for row, text in texts.items() if needle in text}
+
+        # Rows having, for every query word, some indexed word containing it; then verify.
+        vocabulary = self._words.get(field, {})
+        candidates: Optional[Set[int]] = None
+        for query_word in sorted(set(query_words), key=len, reverse=True):
+            rows: Set[int] = set()
+            for word, postings in vocabulary.items():
+                if query_word in word:
+                    rows |= postings
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
+                return set()
+        return {row for row in candidates if needle in texts[row]}
+
+    def _rows_for(self, field: str, op: str, value: Any) -> Set[int]:
+        if field not in self.fields:
+            raise QueryError(f"Field '{field}' is not indexed")
+        if op == '=':
+            return self._rows_eq(field, value)
+        if op == '!=':
+            return set(range(len(self.paths))) - self._rows_eq(field, value)
+        if op == '~':
+            return self._rows_contains(field, value)
+        return self._rows_range(field, op, float(value))
+
+    def search(self, query: str) -> List[str]:
+        """Paths of the configs matching every term of the query, sorted."""
+        result: Optional[Set[int]] = None
+        for field, op, value in parse_query(query):
+            rows = self._rows_for(field, op, value)
+            result = rows if result is None else result & rows
+            if not result:
+                return []
+        return sorted(self.paths[row] for row in result)
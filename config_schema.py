@@ -0,0 +1,300 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import json_codec
+
+SCHEMA_VERSION = 1
+DEFAULT_SCHEMA_PATH = Path(__file__).with_name("kohya_schema.json")
+
+POOL_THRESHOLD = 64 # Fewer files than this are validated in-process
+CHUNK_SIZE = 64
+
+TRUE_STRINGS = ('true', '1', 'yes', 'on', 'checked') # Same as coerce_tweak_value
+
+# A spec is a plain dict as stored in the schema file:
+# {"type": "bool|int|float|number|str|list|dict|any" (or a list of these), "nullable": bool,
+#  "min": x, "max": x, "choices": [...]}
+# A nullable parameter that is not text also accepts "", which Kohya saves for empty fields.
+ParamSpec = Dict[str, Any]
+
+# One validation problem: {"key", "code", "message", "value"} (+ "file" in directory reports).
+ValidationError = Dict[str, Any]
+
+_TYPE_NAMES = {bool: 'bool', int: 'int', float: 'float', str: 'str', list: 'list', dict: 'dict'}
+
+def _parse_bool(text: str) -> bool:
+    return text.strip().lower() in TRUE_STRINGS
+
+def _parse_number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+_PARSERS: Dict[str, Callable[[str], Any]] = {
+    'bool': _parse_bool,
+    'int': int,
+    'float': float,
+    'number': _parse_number,
+    'str': str,
+}
+
+def _type_check(type_name: str) -> Callable[[Any], bool]:
+    if type_name == 'int':
+        return lambda v: type(v) is int
+    if type_name == 'float' or type_name == 'number': # JSON does not keep 1 and 1.0 apart reliably
+        return lambda v: type(v) is float or type(v) is int
+    if type_name == 'any':
+        return lambda v: True
+    expected = {'bool': bool, 'str': str, 'list': list, 'dict': dict}[type_name]
+    return lambda v: type(v) is expected
+
+class CompiledParam:
+    """Validator and text coercer for one parameter, built once from its spec."""
+    __slots__ = ('key', 'types', 'type', 'nullable', 'min', 'max', 'choices', '_is_type', '_parse')
+
+    def __init__(self, key: str, spec: ParamSpec):
+        self.key = key
+        type_spec = spec.get('type', 'any')
+        self.types: Tuple[str, ...] = tuple(type_spec) if isinstance(type_spec, list) else (type_spec,)
+        for type_name in self.types:
+            if type_name not in _PARSERS and type_name not in ('list', 'dict', 'any'):
+                raise ValueError(f"Unknown type '{type_name}' for parameter '{key}'")
+        self.type = " or ".join(self.types) # For messages; single-typed params compare against it
+        self.nullable = bool(spec.get('nullable', False))
+        self.min = spec.get('min')
+        self.max = spec.get('max')
+        self.choices = frozenset(spec['choices']) if spec.get('choices') else None
+        checks = [_type_check(type_name) for type_name in self.types]
+        self._is_type = checks[0] if len(checks) == 1 else (lambda v: any(check(v) for check in checks))
+        self._parse = next((_PARSERS[type_name] for type_name in self.types if type_name in _PARSERS), None)
+
+    def check(self, value: Any) -> Optional[ValidationError]:
+        """Returns None if value is valid, else an error dict."""
+        if value is None or (value == "" and 'str' not in self.types):
+            if self.nullable:
+                return None
+            if value is None:
+                return self._error('type', f"expected {self.type}, got null", value)
+        if not self._is_type(value):
+            got = _TYPE_NAMES.get(type(value), type(value).__name__)
+            return self._error('type', f"expected {self.type}, got {got}", value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool): # Ranges bound numbers only
+            if self.min is not None and value < self.min:
+                return self._error('range', f"must be >= {self.min}", value)
+            if self.max is not None and value > self.max:
+                return self._error('range', f"must be <= {self.max}", value)
+        if self.choices is not None and value not in self.choices:
+            return self._error('choice', f"must be one of {', '.join(sorted(map(str, self.choices)))}", value)
+        return None
+
+    def coerce(self, text: str, current: Any = None) -> Any:
+        """Converts text entered by the user to this parameter's type; raises ValueError if invalid.
+
+        A parameter with several types parses the text as the type of current (the value
+        being replaced) when that type is allowed, else as the first listed type.
+        """
+        current_type = _TYPE_NAMES.get(type(current))
+        parse = (_PARSERS.get(current_type) if current_type in self.types else None) or self._parse
+        if parse is None:
+            raise ValueError(f"{self.key} ({self.type}) cannot be entered as text")
+        if self.nullable and not text.strip() and parse is not str:
+            return None
+        try:
+            value = parse(text.strip() if parse is not str else text)
+        except ValueError:
+            raise ValueError(f"{self.key}: '{text}' is not a valid {self.type}") from None
+        error = self.check(value)
+        if error:
+            raise ValueError(f"{self.key}: {error['message']}")
+        return value
+
+    def _error(self, code: str, message: str, value: Any) -> ValidationError:
+        return {'key': self.key, 'code': code, 'message': message, 'value': value}
+
+    def to_spec(self) -> ParamSpec:
+        spec: ParamSpec = {'type': self.types[0] if len(self.types) == 1 else list(self.types)}
+        if self.nullable:
+            spec['nullable'] = True
+        if self.min is not None:
+            spec['min'] = self.min
+        if self.max is not None:
+            spec['max'] = self.max
+        if self.choices is not None:
+            spec['choices'] = sorted(self.choices)
+        return spec
+
+class ConfigSchema:
+    """Compiled set of known parameters. Keys the schema does not know are not checked."""
+
+    def __init__(self, specs: Dict[str, ParamSpec]):
+        self.params: Dict[str, CompiledParam] = {key: CompiledParam(key, spec) for key, spec in specs.items()}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.params
+
+    def coerce(self, key: str, text: str, current: Any = None) -> Any:
+        """Types text for key (see CompiledParam.coerce). key must be in the schema."""
+        return self.params[key].coerce(text, current)
+
+    def check(self, key: str, value: Any) -> Optional[ValidationError]:
+        param = self.params.get(key)
+        return param.check(value) if param is not None else None
+
+    def validate(self, config: Dict[str, Any]) -> List[ValidationError]:
+        """Every problem in a config (known keys only)."""
+        errors = []
+        params = self.params
+        for key, value in config.items():
+            param = params.get(key)
+            if param is not None:
+                error = param.check(value)
+                if error:
+                    errors.append(error)
+        return errors
+
+    def specs(self) -> Dict[str, ParamSpec]:
+        return {key: param.to_spec() for key, param in self.params.items()}
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json_codec.dump_file({'version': SCHEMA_VERSION, 'params': self.specs()}, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'ConfigSchema':
+        data = json_codec.load_file(path)
+        if data.get('version') != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported schema version: {data.get('version')}")
+        return cls(data['params'])
+
+_default_schema: Optional[ConfigSchema] = None
+
+def default_schema() -> Optional[ConfigSchema]:
+    """The bundled Kohya schema (loaded once), or None if the file is missing."""
+    global _default_schema
+    if _default_schema is None and DEFAULT_SCHEMA_PATH.exists():
+        _default_schema = ConfigSchema.load(str(DEFAULT_SCHEMA_PATH))
+    return _default_schema
+
+def infer_schema(configs: Iterable[Dict[str, Any]]) -> ConfigSchema:
+    """Infers parameter types from a corpus of configs.
+
+    A key seen with ints and floats becomes "float", one seen with null is nullable,
+    and a key seen with otherwise conflicting types is left unchecked ("any").
+    Ranges and choices are not inferred, since a corpus only shows values in use.
+    """
+    seen: Dict[str, set] = {}
+    for config in configs:
+        for key, value in config.items():
+            seen.setdefault(key, set()).add(None if value is None else _TYPE_NAMES.get(type(value), 'any'))
+
+    specs: Dict[str, ParamSpec] = {}
+    for key, types in seen.items():
+        nullable = None in types
+        types.discard(None)
+        if types == {'int', 'float'}:
+            type_name = 'float'
+        elif len(types) == 1:
+            type_name = types.pop()
+        else:
+            type_name = 'any'
+        specs[key] = {'type': type_name, 'nullable': True} if nullable else {'type': type_name}
+    return ConfigSchema(specs)
+
+def _load_config(path: str) -> Dict[str, Any]:
+    config = json_codec.load_file(path)
+    if not isinstance(config, dict):
+        raise ValueError("top-level JSON value is not an object")
+    return config
+
+def infer_schema_from_directory(root_dir: str) -> ConfigSchema:
+    from config_library import iter_config_files
+
+    def configs() -> Iterator[Dict[str, Any]]:
+        for path, _ in iter_config_files(Path(root_dir)):
+            try:
+                yield _load_config(path)
+            except (OSError, ValueError):
+                continue
+    return infer_schema(configs())
+
+_worker_schema: Optional[ConfigSchema] = None
+
+def _init_worker(specs: Dict[str, ParamSpec]):
+    global _worker_schema
+    _worker_schema = ConfigSchema(specs)
+
+def _validate_chunk(paths: List[str], schema: Optional[ConfigSchema] = None) -> List[Tuple[str, List[ValidationError]]]:
+    schema = schema if schema is not None else _worker_schema
+    results = []
+    for path in paths:
+        try:
+            errors = schema.validate(_load_config(path))
+        except (OSError, ValueError) as e:
+            errors = [{'key': None, 'code': 'parse', 'message': str(e), 'value': None}]
+        results.append((path, errors))
+    return results
+
+def validate_files(schema: ConfigSchema, paths: List[str],
+                   workers: Optional[int] = None) -> Iterator[Tuple[str, List[ValidationError]]]:
+    """Yields (path, errors) for every file; large batches are spread over worker processes."""
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        for chunk in chunks:
+            yield from _validate_chunk(chunk, schema)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema.specs(),)) as pool:
+        for results in pool.map(_validate_chunk, chunks):
+            yield from results
+
+def validate_directory(schema: ConfigSchema, root_dir: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Validates every .json config below root_dir. Returns a JSON-serializable report."""
+    from config_library import iter_config_files
+
+    root = Path(root_dir)
+    paths = sorted(path for path, _ in iter_config_files(root))
+    report: Dict[str, Any] = {'schema_version': SCHEMA_VERSION, 'root': str(root.resolve()),
+                              'files_checked': 0, 'files_invalid': 0, 'errors': []}
+    for path, errors in validate_files(schema, paths, workers):
+        report['files_checked'] += 1
+        if errors:
+            report['files_invalid'] += 1
+            relative = os.path.relpath(path, root)
+            report['errors'].extend({'file': relative, **error} for error in errors)
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Validate Kohya configs against a parameter schema, or infer one.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    validate_parser = sub.add_parser("validate", help="Validate every config in a directory")
+    validate_parser.add_argument("directory")
+    validate_parser.add_argument("--schema", default=str(DEFAULT_SCHEMA_PATH), help="Schema file")
+    validate_parser.add_argument("--report", help="Write the JSON error report here (default: stdout)")
+    validate_parser.add_argument("--workers", type=int, default=None)
+    infer_parser = sub.add_parser("infer", help="Infer a schema from a directory of configs")
+    infer_parser.add_argument("directory")
+    infer_parser.add_argument("--out", required=True, help="Schema file to write")
+    args = parser.parse_args()
+
+    if args.command == "infer":
+        inferred = infer_schema_from_directory(args.directory)
+        inferred.save(args.out)
+        print(f"✅ Inferred {len(inferred.params)} parameters into {args.out}")
+        sys.exit(0)
+
+    result = validate_directory(ConfigSchema.load(args.schema), args.directory, args.workers)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json_codec.dump_file(result, f)
+    else:
+        print(json_codec.dumps_pretty(result))
+    print(f"{'❌' if result['files_invalid'] else '✅'} {result['files_invalid']} of "
+          f"{result['files_checked']} configs invalid ({len(result['errors'])} errors)", file=sys.stderr)
+    sys.exit(1 if result['files_invalid'] else 0)
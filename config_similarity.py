@@ -0,0 +1,175 @@
+import heapq
+import math
+import os
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError: # The pure-Python column kernel below gives the same results
+    np = None
+
+from config_schema import default_schema
+
+# Categorical parameters compared by exact value (one-hot); bool schema parameters are added.
+CATEGORICAL_KEYS: List[str] = [
+    'optimizer', 'lr_scheduler', 'LoRA_type', 'mixed_precision', 'save_precision',
+    'save_model_as', 'sample_sampler', 'max_resolution', 'xformers',
+]
+# Numeric parameters that say nothing about how a config trains
+IGNORED_KEYS = frozenset({'seed', 'max_data_loader_n_workers'})
+# Compared on a log10 scale, so 1e-4 vs 2e-4 weighs like 1e-5 vs 2e-5
+LOG_SCALE_KEYS = frozenset({'learning_rate', 'unet_lr', 'text_encoder_lr'})
+LOG_FLOOR = 1e-8
+
+ONE_HOT_SCALE = math.sqrt(0.5) # A categorical mismatch costs 1, like one standard deviation
+MISSING_TOKEN = '∅'
+
+def _spec_types(spec: Dict[str, Any]) -> List[str]:
+    return spec['type'] if isinstance(spec['type'], list) else [spec['type']]
+
+def default_feature_keys() -> Tuple[List[str], List[str]]:
+    """(numeric keys, categorical keys) taken from the bundled schema."""
+    schema = default_schema()
+    specs = schema.specs() if schema else {}
+    numeric = sorted(key for key, spec in specs.items() # Multi-typed numbers too ("0" strings are skipped)
+                     if {'int', 'float', 'number'} & set(_spec_types(spec)) and key not in IGNORED_KEYS)
+    categorical = CATEGORICAL_KEYS + sorted(key for key, spec in specs.items()
+                                            if spec['type'] == 'bool' and key not in CATEGORICAL_KEYS)
+    return numeric, categorical
+
+def _numeric(key: str, value: Any) -> Optional[float]:
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    value = float(value)
+    if key in LOG_SCALE_KEYS:
+        return math.log10(max(value, LOG_FLOOR))
+    return value if math.isfinite(value) else None
+
+def _token(value: Any) -> str:
+    return MISSING_TOKEN if value is None else repr(value)
+
+class SimilarityIndex:
+    """Feature matrix of a config library for nearest-neighbour search.
+
+    Numeric parameters are z-score normalized (learning rates on a log scale) with
+    missing values at the column mean; categoricals are one-hot encoded. A query is
+    one squared-Euclidean distance pass over the whole matrix: a NumPy matrix
+    operation when NumPy is installed, otherwise one pass per feature column.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict[str, Any]]],
+                 numeric_keys: Optional[List[str]] = None, categorical_keys: Optional[List[str]] = None):
+        if numeric_keys is None or categorical_keys is None:
+            default_numeric, default_categorical = default_feature_keys()
+            numeric_keys = default_numeric if numeric_keys is None else numeric_keys
+            categorical_keys = default_categorical if categorical_keys is None else categorical_keys
+
+        self.paths: List[str] = []
+        raw_numeric: Dict[str, List[Optional[float]]] = {key: [] for key in numeric_keys}
+        self._vocab: Dict[str, Dict[str, int]] = {key: {} for key in categorical_keys}
+        self._codes: Dict[str, array] = {key: array('i') for key in categorical_keys}
+        for path, entry in entries:
+            fields = entry.get('fields', {})
+            self.paths.append(path)
+            for key, column in raw_numeric.items():
+                column.append(_numeric(key, fields.get(key)))
+            for key, vocab in self._vocab.items():
+                self._codes[key].append(vocab.setdefault(_token(fields.get(key)), len(vocab)))
+
+        # Column statistics; constant columns cannot tell configs apart and are dropped.
+        self._stats: Dict[str, Tuple[float, float]] = {}
+        self._columns: Dict[str, array] = {}
+        for key, column in raw_numeric.items():
+            present = [value for value in column if value is not None]
+            if len(present) < 2:
+                continue
+            mean = math.fsum(present) / len(present)
+            std = math.sqrt(math.fsum((value - mean) ** 2 for value in present) / len(present))
+            if std == 0:
+                continue
+            self._stats[key] = (mean, std)
+            self._columns[key] = array('d', (0.0 if value is None else (value - mean) / std for value in column))
+        self.numeric_keys = list(self._columns)
+        self.categorical_keys = [key for key in categorical_keys if len(self._vocab[key]) > 1]
+
+        self._matrix = self._build_matrix() if np is not None else None
+
+    def _build_matrix(self):
+        blocks = [np.frombuffer(self._columns[key], dtype=np.float64)[:, None] for key in self.numeric_keys]
+        for key in self.categorical_keys:
+            codes = np.frombuffer(self._codes[key], dtype=np.int32)
+            one_hot = np.zeros((len(self.paths), len(self._vocab[key])))
+            one_hot[np.arange(len(self.paths)), codes] = ONE_HOT_SCALE
+            blocks.append(one_hot)
+        if not blocks:
+            return np.zeros((len(self.paths), 0))
+        return np.hstack(blocks)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _query_numeric(self, config: Dict[str, Any]) -> Dict[str, float]:
+        query = {}
+        for key in self.numeric_keys:
+            value = _numeric(key, config.get(key))
+            mean, std = self._stats[key]
+            query[key] = 0.0 if value is None else (value - mean) / std
+        return query
+
+    def _query_codes(self, config: Dict[str, Any]) -> Dict[str, int]:
+        """Category code per key; -1 for a value no library config has."""
+        return {key: self._vocab[key].get(_token(config.get(key)), -1) for key in self.categorical_keys}
+
+    def distances(self, config: Dict[str, Any]) -> List[float]:
+        """Squared distance from config to every library config, in self.paths order."""
+        numeric, codes = self._query_numeric(config), self._query_codes(config)
+        if self._matrix is not None:
+            vector = [numeric[key] for key in self.numeric_keys]
+            for key in self.categorical_keys:
+                one_hot = [0.0] * len(self._vocab[key])
+                if codes[key] >= 0:
+                    one_hot[codes[key]] = ONE_HOT_SCALE
+                vector.extend(one_hot)
+            return (((self._matrix - np.asarray(vector)) ** 2).sum(axis=1)).tolist()
+
+        total = [0.0] * len(self.paths)
+        for key in self.numeric_keys:
+            q = numeric[key]
+            total = [d + (v - q) * (v - q) for d, v in zip(total, self._columns[key])]
+        for key in self.categorical_keys:
+            q = codes[key]
+            if q < 0:
+                total = [d + 0.5 for d in total] # Unknown value: half a mismatch from everyone
+            else:
+                total = [d if c == q else d + 1.0 for d, c in zip(total, self._codes[key])]
+        return total
+
+    def nearest(self, config: Dict[str, Any], k: int = 10,
+                exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """The k library configs closest to config as (path, distance), closest first."""
+        excluded = {os.path.realpath(path) for path in exclude} # Library paths are already resolved
+        squared = self.distances(config)
+        candidates = (row for row, path in enumerate(self.paths) if path not in excluded)
+        rows = heapq.nsmallest(k, candidates, key=lambda row: (squared[row], self.paths[row]))
+        return [(self.paths[row], math.sqrt(max(squared[row], 0.0))) for row in rows]
+
+def similarity_score(distance: float) -> float:
+    """Distance -> similarity in (0, 1]; identical feature vectors score 1."""
+    return 1.0 / (1.0 + distance)
+
+def similar_to_markdown(results: List[Tuple[str, float]], root: str, entries: Dict[str, Dict[str, Any]],
+                        total: int) -> str:
+    if not results:
+        return "ℹ️ No other configs in the library to compare against."
+    lines = [f"## 🧭 Most Similar Configs ({len(results)} of {total})", "",
+             "| # | Config | Similarity | Optimizer | Network Dim | Learning Rate |", "|---|---|---|---|---|---|"]
+    for rank, (path, distance) in enumerate(results, 1):
+        fields = entries.get(path, {}).get('fields', {})
+        lines.append(f"| {rank} | `{os.path.relpath(path, root)}` | {similarity_score(distance) * 100:.1f}% | "
+                     f"{fields.get('optimizer', '—')} | {fields.get('network_dim', '—')} | "
+                     f"{fields.get('learning_rate', '—')} |")
+    if np is None:
+        lines += ["", "ℹ️ NumPy is not installed, so distances were computed by a pure-Python loop over "
+                      "every feature column (much slower on large libraries). Install it with `pip install numpy`."]
+    return "\n".join(lines)
@@ -0,0 +1,225 @@
+"""Memory-mapped binary snapshots of a ConfigTable.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     '<8sIIQQ': magic, format version, reserved, directory offset, directory length
+    sections   row shapes (uint32 per row), names (string table), one data section per
+               column (int8 / int64 / float64 / uint32 codes) and, for dictionary-encoded
+               columns, a string table of JSON-encoded distinct values
+    directory  JSON: keys, shapes, column kinds, section offsets and the source stamp
+
+A string table is uint64 offsets (count + 1) followed by the UTF-8 blob. Rows are stored
+sorted by name so lookups bisect the mapped names. Opening reads only the header and
+directory; every column page is loaded on first access.
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from config_table import ConfigRow, ConfigTable
+from save_pipeline import atomic_write_bytes
+
+SNAPSHOT_FILENAME = ".taming_dragons_snapshot.bin"
+MAGIC = b"TDSNAP\x00\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQ')
+_TYPECODES = {'bool': 'b', 'int': 'q', 'float': 'd', 'encoded': 'I'}
+
+class SnapshotError(ValueError):
+    """Raised for a snapshot that is missing, damaged, of another version or stale."""
+
+def source_stamp(entries: Iterable[Tuple[str, str]]) -> str:
+    """Digest of (path, content hash) pairs: equal stamps mean the same source configs."""
+    h = hashlib.sha1()
+    for path, digest in sorted(entries):
+        h.update(f"{path}\0{digest}\n".encode('utf-8', 'surrogatepass'))
+    return h.hexdigest()
+
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray(_HEADER.size)
+
+    def section(self, data: bytes) -> int:
+        self.buffer.extend(bytes(-len(self.buffer) % 8))
+        offset = len(self.buffer)
+        self.buffer.extend(data)
+        return offset
+
+    def array(self, values: array) -> int:
+        if sys.byteorder != 'little':
+            values = array(values.typecode, values)
+            values.byteswap()
+        return self.section(values.tobytes())
+
+    def strings(self, texts: List[str]) -> List[int]:
+        blobs = [text.encode('utf-8', 'surrogatepass') for text in texts]
+        offsets = array('Q', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return [self.array(offsets), self.section(b"".join(blobs)), len(blobs)]
+
+def write_snapshot(table: ConfigTable, path: str, stamp: str):
+    """Writes table (rows sorted by name) to path atomically."""
+    order = sorted(range(len(table)), key=table.names.__getitem__)
+    writer = _Writer()
+    directory: Dict[str, Any] = {
+        'stamp': stamp, 'rows': len(order), 'keys': table.keys,
+        'shapes': [list(key_ids) for key_ids, _ in table._shapes],
+        'row_shapes': writer.array(array('I', (table._row_shapes[row] for row in order))),
+        'names': writer.strings([table.names[row] for row in order]),
+        'columns': [],
+    }
+    for column in table._columns:
+        data = column.data if column.data is not None else array('b')
+        data = data + array(data.typecode, bytes((len(order) - len(data)) * data.itemsize)) # Rows without the key
+        entry: Dict[str, Any] = {'kind': column.kind or 'bool',
+                                 'data': writer.array(array(data.typecode, (data[row] for row in order)))}
+        if column.kind == 'encoded':
+            entry['values'] = writer.strings([json.dumps(value, ensure_ascii=False) for value in column.values])
+        directory['columns'].append(entry)
+
+    directory_bytes = json.dumps(directory, ensure_ascii=False).encode('utf-8')
+    directory_offset = writer.section(directory_bytes)
+    writer.buffer[:_HEADER.size] = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, directory_offset, len(directory_bytes))
+    atomic_write_bytes(Path(path), bytes(writer.buffer))
+
+class _MappedStrings:
+    """Sequence view of a string table inside the mapping."""
+
+    def __init__(self, view: memoryview, offsets_at: int, blob_at: int, count: int):
+        self._offsets = view[offsets_at:offsets_at + (count + 1) * 8].cast('Q')
+        self._view = view
+        self._blob_at = blob_at
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start = self._blob_at + self._offsets[index]
+        return str(self._view[start:self._blob_at + self._offsets[index + 1]], 'utf-8', 'surrogatepass')
+
+    def release(self):
+        self._offsets.release()
+
+class _MappedColumn:
+    """Read-only counterpart of config_table._Column backed by the mapping."""
+    __slots__ = ('kind', 'data', 'values', '_decoded')
+
+    def __init__(self, view: memoryview, entry: Dict[str, Any], rows: int):
+        self.kind = entry['kind']
+        typecode = _TYPECODES[self.kind]
+        size = array(typecode).itemsize
+        self.data = view[entry['data']:entry['data'] + rows * size].cast(typecode)
+        self.values = _MappedStrings(view, *entry['values']) if 'values' in entry else None
+        self._decoded: Dict[int, Any] = {}
+
+    def get(self, row: int) -> Any:
+        item = self.data[row]
+        if self.kind == 'encoded':
+            value = self._decoded.get(item)
+            if value is None and item not in self._decoded:
+                value = self._decoded[item] = json.loads(self.values[item])
+            return value
+        if self.kind == 'bool':
+            return bool(item)
+        return item
+
+    def release(self):
+        self.data.release()
+        if self.values is not None:
+            self.values.release()
+
+class SnapshotTable:
+    """A ConfigTable opened from a snapshot file: same row views, nothing decoded up front."""
+
+    def __init__(self, path: str, expected_stamp: Optional[str] = None):
+        if sys.byteorder != 'little':
+            raise SnapshotError("snapshots are only mapped on little-endian machines")
+        self._mmap = self._view = self._row_shapes = self.names = None
+        self._columns: List[_MappedColumn] = []
+        try:
+            self._file = open(path, 'rb')
+        except OSError as e:
+            raise SnapshotError(str(e)) from e
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = self._view = memoryview(self._mmap) # Every view below derives from it; see close()
+            magic, version, _, directory_at, directory_len = _HEADER.unpack_from(view, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise SnapshotError(f"not a version {FORMAT_VERSION} snapshot")
+            directory = json.loads(bytes(view[directory_at:directory_at + directory_len]))
+            if expected_stamp is not None and directory['stamp'] != expected_stamp:
+                raise SnapshotError("snapshot is stale")
+
+            self.stamp: str = directory['stamp']
+            self.keys: List[str] = [sys.intern(key) for key in directory['keys']]
+            self._key_ids = {key: key_id for key_id, key in enumerate(self.keys)}
+            self._shapes = [(tuple(key_ids), frozenset(key_ids)) for key_ids in directory['shapes']]
+            rows = directory['rows']
+            self._row_shapes = view[directory['row_shapes']:directory['row_shapes'] + rows * 4].cast('I')
+            self.names = _MappedStrings(view, *directory['names'])
+            for entry in directory['columns']:
+                self._columns.append(_MappedColumn(view, entry, rows))
+            if len(self._row_shapes) != rows or len(self.names) != rows \
+                    or any(len(column.data) != rows for column in self._columns):
+                raise SnapshotError("truncated snapshot")
+        except SnapshotError:
+            self._abandon()
+            raise
+        except (ValueError, TypeError, struct.error, KeyError) as e:
+            self._abandon()
+            raise SnapshotError(f"damaged snapshot: {e}") from e
+
+    def _abandon(self):
+        """close() for a snapshot that failed to open. A view made by a column that failed
+        half-way may still be held by the traceback; the mapping is then freed with it."""
+        try:
+            self.close()
+        except BufferError:
+            self._file.close()
+
+    def _row_of(self, name: str) -> Optional[int]:
+        row = bisect.bisect_left(self.names, name)
+        return row if row < len(self.names) and self.names[row] == name else None
+
+    def get(self, name: str) -> Optional[ConfigRow]:
+        row = self._row_of(name)
+        return ConfigRow(self, row) if row is not None else None
+
+    def row(self, index: int) -> ConfigRow:
+        return ConfigRow(self, index)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._row_of(name) is not None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[ConfigRow]:
+        return (ConfigRow(self, row) for row in range(len(self.names)))
+
+    def close(self):
+        """Unmaps the snapshot and closes the file; row views must not be used afterwards.
+
+        The mapping can only be closed once no memoryview into it remains, so the views
+        derived from the root view are released first, then the root view itself.
+        """
+        for column in self._columns:
+            column.release()
+        self._columns = []
+        for part in (self.names, self._row_shapes, self._view):
+            if part is not None:
+                part.release()
+        self.names = self._row_shapes = self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config_overlay import same_value
+import json_codec
+from save_pipeline import atomic_write_json
+
+REFS_LOG = "refs.jsonl"
+DEFAULT_CACHE_SIZE = 256
+
+def content_hash(config: Dict[str, Any]) -> str:
+    """Hash of a config's canonical JSON form (key order and whitespace do not matter)."""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def top_level_delta(base: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """{'set': changed/added keys, 'removed': keys missing from config} relative to base."""
+    changed = {key: value for key, value in config.items()
+               if key not in base or not same_value(base[key], value)}
+    removed = [key for key in base if key not in config]
+    return {'set': changed, 'removed': removed}
+
+class ConfigStore:
+    """Content-addressed store for saved configs.
+
+    Every config is stored once under the hash of its content, so exact copies are
+    deduplicated. A variant saved together with its base is stored as a small
+    top-level delta against the (full) base object. Names map to hashes through an
+    append-only refs log, and decoded configs are kept in an LRU cache.
+    """
+
+    def __init__(self, root: str, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.refs: Dict[str, str] = {}
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.cache_size = cache_size
+        self._load_refs()
+
+    def _load_refs(self):
+        refs_path = self.root / REFS_LOG
+        if not refs_path.exists():
+            return
+        with open(refs_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    name, digest = json.loads(line)
+                except ValueError:
+                    continue # Torn last line after a crash
+                self.refs[name] = digest
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def has_object(self, digest: str) -> bool:
+        return self._object_path(digest).exists()
+
+    def _write_object(self, digest: str, payload: Dict[str, Any]):
+        path = self._object_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        atomic_write_json(path, payload)
+
+    def put_object(self, config: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Stores a config (as a delta against base when that is smaller). Returns (hash, kind)."""
+        digest = content_hash(config)
+        if self.has_object(digest):
+            return digest, 'duplicate'
+
+        payload: Dict[str, Any] = {'kind': 'full', 'config': config}
+        if base is not None:
+            base_digest, _ = self.put_object(base)
+            if base_digest == digest: # Unchanged from the base: the object just written
+                return digest, 'full'
+            delta = top_level_delta(base, config)
+            if len(delta['set']) + len(delta['removed']) < len(config) // 2:
+                payload = {'kind': 'delta', 'base': base_digest, **delta}
+
+        self._write_object(digest, payload)
+        self._remember(digest, config)
+        return digest, payload['kind']
+
+    def put(self, name: str, config: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> str:
+        """Stores config under a name (e.g. its filename). Returns a status message."""
+        digest, kind = self.put_object(config, base)
+        if self.refs.get(name) != digest:
+            self.refs[name] = digest
+            with open(self.root / REFS_LOG, 'a', encoding='utf-8') as f:
+                f.write(json.dumps([name, digest], ensure_ascii=False) + "\n")
+
+        detail = {'full': "full copy", 'delta': "delta against base", 'duplicate': "deduplicated"}[kind]
+        return f"✅ Configuration stored as: {name} ({detail}, {digest[:12]})"
+
+    def _remember(self, digest: str, config: Dict[str, Any]):
+        self._cache[digest] = config
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_object(self, digest: str) -> Dict[str, Any]:
+        """Decodes a stored config by hash (through the LRU cache). Do not mutate the result."""
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            return cached
+
+        payload = json_codec.load_file(self._object_path(digest))
+        if payload['kind'] == 'delta':
+            base = self.get_object(payload['base'])
+            removed = set(payload['removed'])
+            config = {key: value for key, value in base.items() if key not in removed}
+            config.update(payload['set'])
+        else:
+            config = payload['config']
+
+        self._remember(digest, config)
+        return config
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        digest = self.refs.get(name)
+        return self.get_object(digest) if digest else None
+
+    def names(self) -> List[str]:
+        return sorted(self.refs)
+
+    def export(self, name: str, target_path: str) -> str:
+        """Writes a stored config out as a plain, pretty-printed JSON file."""
+        config = self.get(name)
+        if config is None:
+            return f"❌ No stored configuration named {name}"
+        Path(target_path).parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(Path(target_path), config)
+        return f"✅ Exported {name} to {target_path}"
+
+    def export_all(self, target_dir: str) -> str:
+        for name in self.refs:
+            self.export(name, os.path.join(target_dir, name))
+        return f"✅ Exported {len(self.refs)} configurations to {target_dir}"
+
+    def stats(self) -> Dict[str, int]:
+        """Object counts and on-disk size of the store."""
+        counts = {'names': len(self.refs), 'objects': 0, 'bytes': 0}
+        for path in self.objects_dir.glob("*/*.json"):
+            counts['objects'] += 1
+            counts['bytes'] += path.stat().st_size
+        return counts
@@ -0,0 +1,87 @@
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Set, Tuple
+
+NOT_SET = "Not set"
+
+# (row index, label, value text) of a summary row whose text changed
+RowUpdate = Tuple[int, str, str]
+
+class SummaryRenderer:
+    """Markdown summary of a config, one line per shown key, rendered incrementally.
+
+    Each row's line is cached; render() and update() re-render only the keys passed to
+    mark_dirty() since the last call (every row when they are handed a different config
+    object). update() also reports which rows changed, so a view can patch just those
+    instead of re-laying out the whole document. Rows are the entries of lines: a title,
+    then per section a heading (which may start with a blank line) followed by its key
+    rows, so row i is paragraph (block) i of the rendered document.
+    """
+
+    def __init__(self, title: str, sections: List[Tuple[str, List[Tuple[str, str]]]],
+                 none_as_missing: Iterable[str] = ()):
+        self.lines: List[str] = [title]
+        self._rows: Dict[str, List[Tuple[int, str]]] = {} # key -> [(row index, label)]
+        for heading, rows in sections:
+            self.lines.append(heading)
+            for key, label in rows:
+                self._rows.setdefault(key, []).append((len(self.lines), label))
+                self.lines.append("")
+        self._none_as_missing = frozenset(none_as_missing) # Keys whose None value shows as NOT_SET
+        self._config: Optional[Mapping[str, Any]] = None
+        self._dirty: Set[str] = set()
+        self._changed: Dict[int, Tuple[str, str]] = {} # Rows changed since the last update()
+        self._needs_full = True # The next update() must return the whole text
+        self._text: Optional[str] = None
+
+    def mark_dirty(self, keys: Iterable[str]):
+        rows = self._rows
+        self._dirty.update(key for key in keys if key in rows)
+
+    def invalidate(self):
+        """Re-renders everything next time (e.g. after editing the config behind the renderer's back)."""
+        self._config = None
+
+    def _value_text(self, config: Mapping[str, Any], key: str) -> str:
+        value = config.get(key, NOT_SET)
+        if value is None and key in self._none_as_missing:
+            value = NOT_SET
+        return f"{value}"
+
+    def _render_key(self, config: Mapping[str, Any], key: str, track: bool):
+        text = self._value_text(config, key)
+        for row, label in self._rows[key]:
+            rendered = f"- **{label}:** `{text}`"
+            if rendered != self.lines[row]:
+                self.lines[row] = rendered
+                self._text = None
+                if track:
+                    self._changed[row] = (label, text)
+
+    def _refresh(self, config: Mapping[str, Any]):
+        if config is not self._config:
+            self._config = config
+            for key in self._rows:
+                self._render_key(config, key, False)
+            self._changed.clear()
+            self._needs_full = True
+        else:
+            for key in self._dirty:
+                self._render_key(config, key, True)
+        self._dirty.clear()
+
+    def render(self, config: Mapping[str, Any]) -> str:
+        self._refresh(config)
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def update(self, config: Mapping[str, Any]) -> Tuple[Optional[str], List[RowUpdate]]:
+        """(whole markdown, []) the first time and after a config switch, otherwise
+        (None, rows whose text changed since the previous update())."""
+        self._refresh(config)
+        if self._needs_full:
+            self._needs_full = False
+            self._changed.clear()
+            return self.render(config), []
+        changed = [(row, label, text) for row, (label, text) in sorted(self._changed.items())]
+        self._changed.clear()
+        return None, changed
@@ -0,0 +1,206 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from pathlib import Path
+from typing import Dict, Any, Tuple, List, Iterator, Optional, Union
+
+from config_overlay import as_plain_dict
+import json_codec
+from model import coerce_param_text, suggest_filename_for
+
+SWEEP_MODES = ('grid', 'random', 'lhs')
+
+# Sweeps smaller than this are written inline; a process pool costs more than it saves.
+POOL_THRESHOLD = 64
+CHUNK_SIZE = 128
+
+# A range is either an explicit list of values or
+# {'min': ..., 'max': ..., 'steps': 5, 'log': False, 'type': 'int' | 'float'}.
+RangeSpec = Union[List[Any], Tuple[Any, ...], Dict[str, Any]]
+
+class InvalidSweepValue(ValueError):
+    """A sweep value the schema rejects for its parameter."""
+
+def _is_int_range(spec: Dict[str, Any], base_value: Any) -> bool:
+    if 'type' in spec:
+        return spec['type'] == 'int'
+    return isinstance(base_value, int) and not isinstance(base_value, bool)
+
+def _scale(spec: Dict[str, Any], fraction: float, as_int: bool) -> Any:
+    """Maps a fraction in [0, 1] onto a numeric range (log-scaled if spec['log'])."""
+    low, high = float(spec['min']), float(spec['max'])
+    if spec.get('log'):
+        value = math.exp(math.log(low) + fraction * (math.log(high) - math.log(low)))
+    else:
+        value = low + fraction * (high - low)
+    return int(round(value)) if as_int else value
+
+def grid_values(spec: RangeSpec, base_value: Any = None) -> List[Any]:
+    """Expands a range spec into the list of values used by a grid sweep."""
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    steps = int(spec.get('steps', 5))
+    as_int = _is_int_range(spec, base_value)
+    if steps <= 1:
+        return [_scale(spec, 0.0, as_int)]
+    values = [_scale(spec, i / (steps - 1), as_int) for i in range(steps)]
+    return list(dict.fromkeys(values)) # Integer rounding can produce duplicates
+
+def _sample(spec: RangeSpec, fraction: float, base_value: Any) -> Any:
+    if isinstance(spec, (list, tuple)):
+        return spec[min(int(fraction * len(spec)), len(spec) - 1)]
+    return _scale(spec, fraction, _is_int_range(spec, base_value))
+
+def generate_overrides(base_config: Dict[str, Any], ranges: Dict[str, RangeSpec], mode: str = 'grid',
+                       count: Optional[int] = None, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yields one {key: value} override dict per sweep point.
+
+    'grid' is the cartesian product of every range, 'random' draws ``count``
+    independent points and 'lhs' draws ``count`` Latin-hypercube points (each range
+    split into ``count`` strata, each stratum used exactly once).
+    """
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Unknown sweep mode '{mode}' (expected one of {', '.join(SWEEP_MODES)})")
+    keys = list(ranges)
+
+    if mode == 'grid':
+        axes = [grid_values(ranges[key], base_config.get(key)) for key in keys]
+        for combo in product(*axes):
+            yield dict(zip(keys, combo))
+        return
+
+    if not count or count < 1:
+        raise ValueError(f"A {mode} sweep needs a positive count")
+    rng = random.Random(seed)
+
+    if mode == 'random':
+        for _ in range(count):
+            yield {key: _sample(ranges[key], rng.random(), base_config.get(key)) for key in keys}
+        return
+
+    strata = {}
+    for key in keys:
+        order = list(range(count))
+        rng.shuffle(order)
+        strata[key] = order
+    for i in range(count):
+        yield {key: _sample(ranges[key], (strata[key][i] + rng.random()) / count, base_config.get(key))
+               for key in keys}
+
+def _override_text(value: Any) -> str:
+    """A sweep value as the text a user would type for it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def apply_overrides(base_config: Dict[str, Any], overrides: Dict[str, Any], schema=None) -> Dict[str, Any]:
+    """Returns a copy of base_config with overrides applied, typed and checked like
+    update_working_config_daily_tweaks (with schema, a ConfigSchema, for known keys).
+
+    Raises InvalidSweepValue naming every override value the schema rejects.
+    """
+    variant = dict(base_config)
+    errors = []
+    for key, value in overrides.items():
+        original_val = base_config.get(key)
+        try:
+            if isinstance(value, (list, dict)) or (original_val is None and (schema is None or key not in schema)):
+                error = schema.check(key, value) if schema is not None else None # Nothing to parse; check as-is
+                if error:
+                    raise ValueError(f"{key}: {error['message']}")
+                variant[key] = value
+            else:
+                variant[key] = coerce_param_text(schema, key, _override_text(value), original_val)
+        except ValueError as e:
+            errors.append(f"{e} (value {value!r})")
+    if errors:
+        raise InvalidSweepValue("; ".join(errors))
+    return variant
+
+def plan_sweep(base_config: Dict[str, Any], ranges: Dict[str, RangeSpec], mode: str = 'grid',
+               count: Optional[int] = None, seed: Optional[int] = None,
+               schema=None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yields (filename, typed overrides) per sweep point with unique output names and filenames.
+
+    Unless output_name is itself swept, each variant gets ``<output_name>_sNNNN`` so the
+    trained LoRAs do not overwrite each other; filenames come from suggest_filename_for().
+    Raises InvalidSweepValue at the first point with a rejected value.
+    """
+    base_name = base_config.get('output_name') or suggest_filename_for(base_config)[:-len('_config.json')]
+    used = set()
+    for index, overrides in enumerate(generate_overrides(base_config, ranges, mode, count, seed)):
+        variant = apply_overrides(base_config, overrides, schema)
+        typed = {key: variant[key] for key in overrides}
+        if 'output_name' not in ranges:
+            typed['output_name'] = variant['output_name'] = f"{base_name}_s{index:04d}"
+
+        filename = suggest_filename_for(variant)
+        if filename in used:
+            filename = f"{filename[:-len('.json')]}_{index:04d}.json"
+        used.add(filename)
+        yield filename, typed
+
+_worker_base: Dict[str, Any] = {}
+
+def _init_worker(base_config: Dict[str, Any]):
+    global _worker_base
+    _worker_base = base_config
+
+def _write_chunk(out_dir: str, chunk: List[Tuple[str, Dict[str, Any]]],
+                 base_config: Optional[Dict[str, Any]] = None) -> List[str]:
+    base = base_config if base_config is not None else _worker_base
+    written = []
+    for filename, overrides in chunk:
+        path = os.path.join(out_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            json_codec.dump_file({**base, **overrides}, f)
+        written.append(path)
+    return written
+
+def _chunks(items: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def write_sweep(base_config: Dict[str, Any], plan: List[Tuple[str, Dict[str, Any]]], out_dir: str,
+                workers: Optional[int] = None) -> Iterator[str]:
+    """Writes every planned variant into out_dir, yielding paths as chunks finish.
+
+    The base is sent to each worker process once; tasks carry only the overrides.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    if len(plan) < POOL_THRESHOLD or workers == 1:
+        for chunk in _chunks(iter(plan), CHUNK_SIZE):
+            yield from _write_chunk(out_dir, chunk, base_config)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base_config,)) as pool:
+        for written in pool.map(partial(_write_chunk, out_dir), _chunks(iter(plan), CHUNK_SIZE)):
+            yield from written
+
+def run_sweep(base_config: Dict[str, Any], ranges: Dict[str, RangeSpec], out_dir: str, mode: str = 'grid',
+              count: Optional[int] = None, seed: Optional[int] = None,
+              workers: Optional[int] = None, schema=None) -> Tuple[List[str], str]:
+    """Plans and writes a sweep. Returns (written paths, status message); nothing is
+    written if a sweep value is rejected by schema."""
+    start = time.perf_counter()
+    base_config = as_plain_dict(base_config) # Resolve overlays/lazy configs once, before they go to workers
+    try:
+        plan = list(plan_sweep(base_config, ranges, mode, count, seed, schema))
+    except InvalidSweepValue as e:
+        return [], f"❌ Invalid sweep value: {str(e)}"
+    written = list(write_sweep(base_config, plan, out_dir, workers))
+    elapsed = time.perf_counter() - start
+    rate = len(written) / elapsed if elapsed > 0 else float('inf')
+    return written, f"✅ Wrote {len(written)} {mode} sweep configs to {out_dir} in {elapsed:.2f}s ({rate:.0f} configs/s)"
@@ -0,0 +1,229 @@
+import json
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+_KINDS = {bool: 'bool', int: 'int', float: 'float'} # Exact types; subclasses are dictionary-encoded
+_TYPECODES = {'bool': 'b', 'int': 'q', 'float': 'd', 'encoded': 'I'}
+FILLER_CODE = 0xFFFFFFFF # Encoded slot of a row that lacks the key
+
+def _value_key(value: Any) -> Any:
+    """Dictionary-encoding key that keeps 1, 1.0 and True apart and handles lists/dicts."""
+    if isinstance(value, (dict, list)):
+        return ('json', json.dumps(value, ensure_ascii=False))
+    return (type(value), value)
+
+class _Column:
+    """Values of one key across all rows.
+
+    Starts typed (bool/int/float array) and falls back to dictionary encoding (distinct
+    values table + integer codes) the first time it sees a value of another type. Rows
+    that lack the key hold a filler that is never read (FILLER_CODE once encoded, so it
+    never lands in the values table).
+    """
+    __slots__ = ('kind', 'data', 'values', 'index')
+
+    def __init__(self):
+        self.kind: Optional[str] = None
+        self.data: Optional[array] = None
+        self.values: List[Any] = []
+        self.index: Dict[Any, int] = {}
+
+    @staticmethod
+    def _kind_of(value: Any) -> str:
+        kind = _KINDS.get(type(value), 'encoded')
+        if kind == 'int' and not INT64_MIN <= value <= INT64_MAX:
+            return 'encoded'
+        return kind
+
+    def _encode(self, value: Any) -> int:
+        key = _value_key(value)
+        code = self.index.get(key)
+        if code is None:
+            code = self.index[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def to_encoded(self, has_value: Callable[[int], bool]):
+        """Switches to dictionary encoding; has_value(row) tells which rows hold the key."""
+        old = self.data
+        as_bool = self.kind == 'bool'
+        self.kind = 'encoded'
+        self.data = array('I', (self._encode(bool(item) if as_bool else item) if has_value(row) else FILLER_CODE
+                                for row, item in enumerate(old)))
+
+    def set(self, row: int, value: Any) -> bool:
+        """Stores row's value. Returns False, storing nothing, if the column must first be
+        switched to dictionary encoding with to_encoded()."""
+        kind = self._kind_of(value)
+        if kind != self.kind:
+            if self.kind is None:
+                self.kind = kind
+                self.data = array(_TYPECODES[kind])
+            elif self.kind != 'encoded':
+                return False
+
+        data = self.data
+        stored = self._encode(value) if self.kind == 'encoded' else value
+        if len(data) == row:
+            data.append(stored)
+        elif len(data) > row:
+            data[row] = stored
+        elif self.kind == 'encoded':
+            data.extend(array('I', [FILLER_CODE]) * (row - len(data)))
+            data.append(stored)
+        else:
+            data.frombytes(bytes((row - len(data)) * data.itemsize))
+            data.append(stored)
+        return True
+
+    def get(self, row: int) -> Any:
+        item = self.data[row]
+        if self.kind == 'encoded':
+            return self.values[item]
+        if self.kind == 'bool':
+            return bool(item)
+        return item
+
+    def nbytes(self) -> int:
+        return len(self.data) * self.data.itemsize if self.data is not None else 0
+
+class ConfigRow(Mapping):
+    """Read-only dict-like view of one ConfigTable row.
+
+    Nested lists/dicts are shared between rows with equal values; treat them as read-only
+    (ConfigOverlay copies them before handing them out for editing).
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'ConfigTable', row: int):
+        self._table = table
+        self._row = row
+
+    def _shape(self) -> Tuple[Tuple[int, ...], frozenset]:
+        return self._table._shapes[self._table._row_shapes[self._row]]
+
+    def __getitem__(self, key: str) -> Any:
+        key_id = self._table._key_ids.get(key)
+        if key_id is None or key_id not in self._shape()[1]:
+            raise KeyError(key)
+        return self._table._columns[key_id].get(self._row)
+
+    def __contains__(self, key: object) -> bool:
+        key_id = self._table._key_ids.get(key)
+        return key_id is not None and key_id in self._shape()[1]
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._table.keys
+        for key_id in self._shape()[0]:
+            yield keys[key_id]
+
+    def __len__(self) -> int:
+        return len(self._shape()[0])
+
+    def to_dict(self) -> Dict[str, Any]:
+        table, row = self._table, self._row
+        return {table.keys[key_id]: table._columns[key_id].get(row) for key_id in self._shape()[0]}
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row]
+
+    def __repr__(self) -> str:
+        return f"ConfigRow({self.name!r}, {len(self)} keys)"
+
+class ConfigTable:
+    """Columnar in-memory store for many configs.
+
+    Key strings live once in a shared key table; each row stores only a shape id (the
+    ordered tuple of its key ids, shared by every config with the same keys) and one
+    slot per column: int64/float64/bool arrays for numeric keys, dictionary-encoded codes
+    for everything else. Rows are read through ConfigRow views, which behave like the
+    original dicts (same keys, order and values).
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+        self._columns: List[_Column] = []
+        self._shapes: List[Tuple[Tuple[int, ...], frozenset]] = []
+        self._shape_ids: Dict[Tuple[int, ...], int] = {}
+        self._row_shapes = array('I')
+        self.names: List[str] = []
+        self._rows_by_name: Dict[str, int] = {}
+
+    def _key_id(self, key: str) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self.keys)
+            self.keys.append(sys.intern(key))
+            self._columns.append(_Column())
+        return key_id
+
+    def add(self, name: str, config: Dict[str, Any]) -> ConfigRow:
+        """Appends a config (or replaces the row of the same name) and returns its view."""
+        row = self._rows_by_name.get(name)
+        if row is None:
+            row = len(self.names)
+            self.names.append(name)
+            self._rows_by_name[name] = row
+
+        key_ids = tuple(self._key_id(key) for key in config)
+        shape_id = self._shape_ids.get(key_ids)
+        if shape_id is None:
+            shape_id = self._shape_ids[key_ids] = len(self._shapes)
+            self._shapes.append((key_ids, frozenset(key_ids)))
+        if row == len(self._row_shapes):
+            self._row_shapes.append(shape_id)
+        else:
+            self._row_shapes[row] = shape_id
+
+        columns = self._columns
+        for key_id, value in zip(key_ids, config.values()):
+            if not columns[key_id].set(row, value):
+                columns[key_id].to_encoded( # Skips fillers and the value row is about to replace
+                    lambda other: other != row and key_id in self._shapes[self._row_shapes[other]][1])
+                columns[key_id].set(row, value)
+        return ConfigRow(self, row)
+
+    def get(self, name: str) -> Optional[ConfigRow]:
+        row = self._rows_by_name.get(name)
+        return ConfigRow(self, row) if row is not None else None
+
+    def row(self, index: int) -> ConfigRow:
+        return ConfigRow(self, index)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._rows_by_name
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[ConfigRow]:
+        return (ConfigRow(self, row) for row in range(len(self.names)))
+
+    def column_values(self, key: str) -> List[Any]:
+        """Distinct values of an encoded column, or [] for typed and unknown columns."""
+        key_id = self._key_ids.get(key)
+        return list(self._columns[key_id].values) if key_id is not None else []
+
+    def stats(self) -> Dict[str, Any]:
+        """Row/key/shape counts and the bytes held in column arrays (excluding value tables)."""
+        kinds: Dict[str, int] = {}
+        for column in self._columns:
+            kinds[column.kind] = kinds.get(column.kind, 0) + 1
+        return {
+            'rows': len(self.names), 'keys': len(self.keys), 'shapes': len(self._shapes),
+            'column_kinds': kinds,
+            'array_bytes': sum(column.nbytes() for column in self._columns) + len(self._row_shapes) * 4,
+        }
+
+    @classmethod
+    def from_configs(cls, named_configs: Iterable[Tuple[str, Dict[str, Any]]]) -> 'ConfigTable':
+        table = cls()
+        for name, config in named_configs:
+            table.add(name, config)
+        return table
@@ -0,0 +1,94 @@
+import copy
+import sys
+from collections import deque
+from typing import Any, List, Tuple, Optional, MutableMapping
+
+MISSING = object() # Marks a key that did not exist on one side of an edit
+
+DEFAULT_HISTORY_BYTES = 4 * 1024 * 1024
+
+# One edit: (key, value before, value after); an entry is one user action.
+KeyDelta = Tuple[str, Any, Any]
+
+def estimate_size(value: Any) -> int:
+    """Rough memory footprint of a JSON-like value, used for the history cap."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return 0 if value is MISSING else sys.getsizeof(value)
+
+def _detached(value: Any) -> Any:
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+class EditHistory:
+    """Undo/redo stacks of per-key deltas with a memory cap.
+
+    Only the keys touched by each action are stored, never full snapshots. When the
+    estimated size of all entries exceeds max_bytes, the oldest undo entries are
+    evicted first.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_HISTORY_BYTES):
+        self.max_bytes = max_bytes
+        self._undo: deque = deque() # (deltas, size)
+        self._redo: List[Tuple[List[KeyDelta], int]] = []
+        self._total_bytes = 0
+
+    def record(self, deltas: List[KeyDelta]):
+        """Pushes one action; clears the redo stack."""
+        deltas = [(key, _detached(old), _detached(new)) for key, old, new in deltas]
+        if not deltas:
+            return
+        for _, size in self._redo:
+            self._total_bytes -= size
+        self._redo.clear()
+
+        size = sum(estimate_size(key) + estimate_size(old) + estimate_size(new) for key, old, new in deltas)
+        self._undo.append((deltas, size))
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes and len(self._undo) > 1:
+            _, evicted = self._undo.popleft()
+            self._total_bytes -= evicted
+
+    def undo(self, config: MutableMapping[str, Any]) -> Optional[List[str]]:
+        """Reverts the latest action on config. Returns the keys touched, or None if nothing to undo."""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return self._apply(config, [(key, old) for key, old, _ in reversed(entry[0])])
+
+    def redo(self, config: MutableMapping[str, Any]) -> Optional[List[str]]:
+        """Re-applies the latest undone action. Returns the keys touched, or None if nothing to redo."""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return self._apply(config, [(key, new) for key, _, new in entry[0]])
+
+    @staticmethod
+    def _apply(config: MutableMapping[str, Any], values: List[Tuple[str, Any]]) -> List[str]:
+        for key, value in values:
+            if value is MISSING:
+                config.pop(key, None)
+            else:
+                config[key] = _detached(value)
+        return [key for key, _ in values]
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._total_bytes = 0
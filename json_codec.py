@@ -0,0 +1,232 @@
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, Any, Callable, List, Optional, Union
+
+# Selects the codec by name (stdlib, orjson, ujson, msgspec); default is the fastest installed one.
+CODEC_ENV_VAR = "TAMING_DRAGONS_JSON"
+
+# Float tokens that other encoders may format differently from Python's repr():
+# exponent forms ("1e-7", "1e16") and orjson's plain form of 1e-05 ("0.00001").
+# Both searches start from a literal, and only numbers ending a line can match,
+# so digits inside strings (which never contain raw newlines) are left alone.
+_EXPONENT = re.compile(r'e[-+]?\d+(?=,?$)', re.MULTILINE)
+_SMALL_FRACTION = re.compile(r'0\.0000\d*(?=,?$)', re.MULTILINE)
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:e[-+]?\d+)?')
+
+# Compared against the stdlib output before a backend is trusted for writing.
+_PROBE = {
+    "output_name": "probe_é_漢字", "escapes": "quote\" slash/ back\\ tab\t nl\n \x01 \x7f  ",
+    "learning_rate": 1e-05, "text_encoder_lr": 5e-05, "unet_lr": 0.0001, "tiny": 1.5e-07,
+    "large": 1e+16, "huge": 1.7976931348623157e+308, "inexact": 0.30000000000000004,
+    "third": 1 / 3, "negative": -2.5, "zero": -0.0, "epoch": 10, "big_int": 2 ** 62,
+    "flags": [True, False, None], "empty_list": [], "empty_dict": {},
+    "nested": {"list": [1, 2.5, "x", [], {}], "dict": {"a": {"b": [0.001]}}},
+}
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def _python_floats(text: str) -> str:
+    """Rewrites float tokens in pretty JSON text to the exact form Python's json module writes."""
+    replacements = {}
+    for pattern in (_EXPONENT, _SMALL_FRACTION):
+        for m in pattern.finditer(text):
+            start = text.rfind(' ', 0, m.start()) + 1
+            token = text[start:m.end()]
+            if start in replacements or not _NUMBER.fullmatch(token):
+                continue
+            line_start = text.rfind('\n', 0, start) + 1
+            if text[start - 3:start] != '": ' and text[line_start:start].strip(' '):
+                continue # Not a value token
+            replacements[start] = (m.end(), repr(float(token)))
+
+    if not replacements:
+        return text
+    parts, pos = [], 0
+    for start in sorted(replacements):
+        end, formatted = replacements[start]
+        parts.append(text[pos:start])
+        parts.append(formatted)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+def _all_finite(obj: Any) -> bool:
+    """False if obj holds NaN/Infinity, which Python writes as NaN but other encoders as null."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return False
+    return True
+
+class JsonCodec:
+    """One JSON backend: parse from str/bytes, and pretty-print exactly like
+    ``json.dump(config, f, indent=2, ensure_ascii=False)`` (the Kohya GUI's format).
+
+    A fast backend falls back to the stdlib for anything it cannot handle the same
+    way (NaN literals, integers over 64 bits, non-string keys), and it is only used
+    for writing if its output on a probe document matches the stdlib byte for byte.
+    """
+
+    def __init__(self, name: str, loads: Callable[[Union[str, bytes]], Any],
+                 dumps_pretty: Optional[Callable[[Any], str]] = None):
+        self.name = name
+        self._loads = loads
+        self._dumps_pretty = dumps_pretty
+        if dumps_pretty is not None and name != "stdlib":
+            try:
+                if self._fast_dumps(_PROBE) != _stdlib_dumps(_PROBE):
+                    self._dumps_pretty = None
+            except Exception:
+                self._dumps_pretty = None
+
+    @property
+    def writes_natively(self) -> bool:
+        """True if pretty output comes from this backend rather than the stdlib fallback."""
+        return self._dumps_pretty is not None
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._loads(data)
+        except ValueError:
+            return json.loads(data) # Raises the usual error for invalid JSON
+
+    def _fast_dumps(self, obj: Any) -> str:
+        return _python_floats(self._dumps_pretty(obj))
+
+    def dumps_pretty(self, obj: Any) -> str:
+        if self._dumps_pretty is None or self.name == "stdlib":
+            return _stdlib_dumps(obj)
+        try:
+            if _all_finite(obj):
+                return self._fast_dumps(obj)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        return _stdlib_dumps(obj)
+
+    def __repr__(self) -> str:
+        return f"<JsonCodec {self.name}{'' if self.writes_natively else ' (stdlib writer)'}>"
+
+def _build_codecs() -> Dict[str, JsonCodec]:
+    codecs = {"stdlib": JsonCodec("stdlib", json.loads, _stdlib_dumps)}
+
+    try:
+        import orjson
+        codecs["orjson"] = JsonCodec(
+            "orjson", orjson.loads,
+            lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8'))
+    except ImportError:
+        pass
+
+    try:
+        import msgspec
+        codecs["msgspec"] = JsonCodec(
+            "msgspec", msgspec.json.decode,
+            lambda obj: msgspec.json.format(msgspec.json.encode(obj), indent=2).decode('utf-8'))
+    except ImportError:
+        pass
+
+    try:
+        import ujson
+        codecs["ujson"] = JsonCodec(
+            "ujson", ujson.loads,
+            lambda obj: ujson.dumps(obj, indent=2, ensure_ascii=False, escape_forward_slashes=False))
+    except ImportError:
+        pass
+
+    return codecs
+
+CODECS: Dict[str, JsonCodec] = _build_codecs()
+PREFERENCE = ["orjson", "msgspec", "ujson", "stdlib"]
+
+def _default_codec() -> JsonCodec:
+    requested = os.environ.get(CODEC_ENV_VAR, "").strip().lower()
+    if requested in CODECS:
+        return CODECS[requested]
+    return next(CODECS[name] for name in PREFERENCE if name in CODECS)
+
+_active = _default_codec()
+
+def get_codec() -> JsonCodec:
+    return _active
+
+def set_codec(name: str) -> str:
+    """Switches the codec used by loads/dumps_pretty/load_file/dump_file. Returns a status message."""
+    global _active
+    if name not in CODECS:
+        return f"❌ JSON codec '{name}' is not available (installed: {', '.join(CODECS)})"
+    _active = CODECS[name]
+    return f"✅ Using JSON codec: {name}"
+
+def loads(data: Union[str, bytes]) -> Any:
+    return _active.loads(data)
+
+def dumps_pretty(obj: Any) -> str:
+    return _active.dumps_pretty(obj)
+
+def load_file(file_path: Union[str, os.PathLike]) -> Any:
+    """Parses a UTF-8 JSON file."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return _active.loads(data.decode('utf-8'))
+
+def dump_file(obj: Any, f) -> None:
+    """Writes obj to an open text file, byte-identical to json.dump(obj, f, indent=2, ensure_ascii=False)."""
+    f.write(_active.dumps_pretty(obj))
+
+def benchmark(file_paths: List[str], repeat: int = 5) -> List[Dict[str, Any]]:
+    """Parse/serialize throughput (MB/s) of every installed codec on the given files."""
+    documents = []
+    for path in file_paths:
+        with open(path, 'rb') as f:
+            documents.append(f.read().decode('utf-8'))
+    total_mb = sum(len(text.encode('utf-8')) for text in documents) / (1024 * 1024)
+    parsed = [json.loads(text) for text in documents]
+
+    results = []
+    for name, codec in CODECS.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in documents:
+                codec.loads(text)
+        parse_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for config in parsed:
+                codec.dumps_pretty(config)
+        dump_time = (time.perf_counter() - start) / repeat
+
+        results.append({
+            'codec': name,
+            'native_writer': codec.writes_natively,
+            'parse_mb_s': total_mb / parse_time if parse_time else float('inf'),
+            'serialize_mb_s': total_mb / dump_time if dump_time else float('inf'),
+        })
+    return results
+
+def benchmark_markdown(results: List[Dict[str, Any]]) -> str:
+    lines = ["| Codec | Parse MB/s | Serialize MB/s | Native writer |", "|---|---|---|---|"]
+    for row in results:
+        lines.append(f"| {row['codec']} | {row['parse_mb_s']:.1f} | {row['serialize_mb_s']:.1f} | "
+                     f"{'yes' if row['native_writer'] else 'no (stdlib)'} |")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the installed JSON codecs on config files.")
+    parser.add_argument("files", nargs="+", help="JSON config files to parse and serialize")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the files per codec")
+    args = parser.parse_args()
+
+    print(f"Active codec: {_active.name}")
+    print(benchmark_markdown(benchmark(args.files, args.repeat)))
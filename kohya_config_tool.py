@@ -1,15 +1,22 @@
 import gradio as gr
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 import re
 
+from comparison_cache import ComparisonCache, FileFingerprints
+from config_classifier import config_type_label
+from config_diff import deep_diff, diff_to_markdown
+import json_codec
+
 class TamingDragons:
     def __init__(self):
         self.base_config = {}
         self.comparison_config = {}
         self.working_config = {}
+        self.fingerprints = FileFingerprints()
+        self.comparison_cache = ComparisonCache() # Reports keyed by (base hash, comparison hash)
+        self.library = None # ConfigLibrary opened by find_similar_configs()
         
         # Daily tweaks - the stuff that changes constantly
         self.daily_tweaks = {
@@ -43,17 +50,9 @@ class TamingDragons:
             if not file_path or not os.path.exists(file_path):
                 return {}, "No file selected"
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = json_codec.load_file(file_path)
             
-            # Detect config type
-            config_type = "Unknown"
-            if config.get('LoRA_type') == 'Flux1':
-                config_type = "Flux1 LoRA"
-            elif config.get('sdxl', False):
-                config_type = "SDXL LoRA"
-            elif config.get('LoRA_type') == 'Standard':
-                config_type = "Standard LoRA"
+            config_type = config_type_label(config)
             
             optimizer = config.get('optimizer', 'Unknown')
             
@@ -86,6 +85,12 @@ class TamingDragons:
         if not base_file or not comp_file:
             return "Please upload both configuration files"
         
+        cache_key = self._comparison_cache_key(base_file.name, comp_file.name)
+        cached = self.comparison_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self.base_config, self.comparison_config, report = cached
+            return report
+        
         self.base_config, base_status = self.load_config(base_file.name)
         self.comparison_config, comp_status = self.load_config(comp_file.name)
         
@@ -142,10 +147,46 @@ class TamingDragons:
                 comparison.append(f"Base: `{base_args}`")
                 comparison.append(f"Comparison: `{comp_args}`")
         
+        # Check every other key, including nested values
+        mapped_keys = set(self.daily_tweaks) | set(self.important_params) | {'optimizer_args'}
+        other_diffs = [c for c in deep_diff(self.base_config, self.comparison_config)
+                       if c['path'][0] not in mapped_keys]
+        if other_diffs:
+            comparison.append(f"\n### 🧩 Other Parameter Differences ({len(other_diffs)})")
+            comparison.append(diff_to_markdown(other_diffs))
+        
         if not daily_diffs and not important_diffs and base_optimizer == comp_optimizer:
             comparison.append("\n✅ **Configurations are very similar!**")
         
-        return "\n\n".join(comparison)
+        report = "\n\n".join(comparison)
+        if cache_key and self._comparison_cache_key(base_file.name, comp_file.name) == cache_key:
+            self.comparison_cache.put(cache_key, (self.base_config, self.comparison_config, report))
+        return report
+
+    def _comparison_cache_key(self, base_path: str, comp_path: str):
+        """(base hash, comparison hash) of the files' current content, or None if unreadable"""
+        try:
+            return self.fingerprints.content_hash(base_path), self.fingerprints.content_hash(comp_path)
+        except OSError:
+            return None
+
+    def find_similar_configs(self, library_dir: str, top_k: float) -> str:
+        """Find the library configs most similar to the working configuration"""
+        if not self.working_config:
+            return "Please load a base configuration first"
+        if not library_dir or not os.path.isdir(library_dir):
+            return "❌ Library folder does not exist"
+        
+        from config_library import ConfigLibrary
+        from config_similarity import SimilarityIndex, similar_to_markdown
+        
+        if self.library is None or self.library.root != Path(library_dir).resolve():
+            self.library = ConfigLibrary(library_dir)
+        self.library.scan() # Picks up configs added since the last search
+        index = SimilarityIndex(self.library.valid_entries())
+        
+        results = index.nearest(self.working_config, int(top_k or 10))
+        return similar_to_markdown(results, str(self.library.root), self.library.entries, len(index))
 
     def update_daily_tweaks(self, *values) -> str:
         """Update the working configuration with daily tweak values"""
@@ -211,7 +252,7 @@ class TamingDragons:
             save_path.parent.mkdir(exist_ok=True)
             
             with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(self.working_config, f, indent=2, ensure_ascii=False)
+                json_codec.dump_file(self.working_config, f)
             
             return f"✅ Configuration saved as: {save_path}"
         
@@ -287,6 +328,16 @@ def create_interface():
             
             compare_btn = gr.Button("🔍 Compare Configurations", variant="primary")
             comparison_result = gr.Markdown("Upload both files to compare")
+            
+            gr.Markdown("### 🧭 Find Similar Configs")
+            gr.Markdown("Rank the configs in a library folder by how closely they match your working configuration.")
+            
+            with gr.Row():
+                library_dir = gr.Textbox(label="Library Folder", placeholder="configs", scale=3)
+                similar_top_k = gr.Number(label="Results", value=10, precision=0, scale=1)
+            
+            similar_btn = gr.Button("🧭 Find Similar Configs")
+            similar_result = gr.Markdown("Load a base configuration and choose a library folder")
         
         with gr.Tab("💾 Save Configuration"):
             gr.Markdown("### Save Your Modified Configuration")
@@ -324,6 +375,12 @@ def create_interface():
             outputs=[comparison_result]
         )
         
+        similar_btn.click(
+            tool.find_similar_configs,
+            inputs=[library_dir, similar_top_k],
+            outputs=[similar_result]
+        )
+        
         # Auto-generate filename suggestion
         def update_filename_suggestion(out_name, comment):
             return tool.generate_filename_suggestion(out_name, comment)
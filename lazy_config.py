@@ -0,0 +1,210 @@
+import json
+import re
+from collections.abc import MutableMapping
+from typing import Dict, Any, Tuple, Iterable, Iterator, Optional, Set
+
+import json_codec
+
+_WS = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+_DECODER = json.JSONDecoder()
+
+class _StreamReader:
+    """Growing text buffer over a file; every helper reads more when a token may be cut off."""
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self._f = f
+        self._chunk_size = chunk_size
+        self.text = ""
+        self.eof = False
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        data = self._f.read(max(self._chunk_size, len(self.text))) # Doubling keeps re-scans amortized O(n)
+        if not data:
+            self.eof = True
+            return False
+        self.text += data
+        return True
+
+    def read_rest(self) -> bool:
+        if self.eof:
+            return False
+        self.text += self._f.read()
+        self.eof = True
+        return True
+
+    def match(self, pattern: 're.Pattern', pos: int) -> Optional['re.Match']:
+        while True:
+            m = pattern.match(self.text, pos)
+            if m and m.end() < len(self.text):
+                return m
+            if not self.more():
+                return m
+
+    def skip_ws(self, pos: int) -> int:
+        return self.match(_WS, pos).end()
+
+    def peek(self, pos: int) -> str:
+        while pos >= len(self.text):
+            if not self.more():
+                return ""
+        return self.text[pos]
+
+    def expect(self, pos: int, char: str) -> int:
+        if self.peek(pos) != char:
+            raise ValueError(f"Expected '{char}' at offset {pos}")
+        return pos + 1
+
+    def decode(self, pos: int) -> Tuple[Any, int]:
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, pos)
+            except json.JSONDecodeError:
+                # A failed decode of a cut-off value is wasted work; avoid repeating it per chunk.
+                if not self.read_rest():
+                    raise
+                continue
+            if end < len(self.text) or not self.more():
+                return value, end
+
+    def skip_value(self, pos: int) -> int:
+        char = self.peek(pos)
+        if char == '"':
+            m = self.match(_STRING, pos) # Skipped without decoding, however long it is
+        elif char in ('{', '['):
+            return self.decode(pos)[1]
+        else:
+            m = self.match(_SCALAR, pos)
+        if not m:
+            raise ValueError(f"Invalid JSON value at offset {pos}")
+        return m.end()
+
+def stream_extract(file_path: str, keys: Iterable[str]) -> Tuple[Dict[str, Any], bool]:
+    """Reads only the requested top-level keys from a JSON object file.
+
+    Values of other keys are skipped without being decoded, and reading stops as
+    soon as every requested key has been found. Returns (found values, nonempty).
+    """
+    wanted = set(keys)
+    found: Dict[str, Any] = {}
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = _StreamReader(f)
+        pos = reader.expect(reader.skip_ws(0), '{')
+        pos = reader.skip_ws(pos)
+        if reader.peek(pos) == '}':
+            return found, False
+
+        while wanted:
+            m = reader.match(_STRING, pos)
+            if not m:
+                raise ValueError(f"Expected a property name at offset {pos}")
+            key = json.loads(m.group())
+            pos = reader.skip_ws(reader.expect(reader.skip_ws(m.end()), ':'))
+
+            if key in wanted:
+                found[key], pos = reader.decode(pos)
+                wanted.discard(key)
+            else:
+                pos = reader.skip_value(pos)
+
+            pos = reader.skip_ws(pos)
+            char = reader.peek(pos)
+            if char == '}':
+                break
+            pos = reader.skip_ws(reader.expect(pos, ','))
+
+    return found, True
+
+class _LazySource:
+    """Parses the full document on first request and shares it between forks."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._document: Optional[Dict[str, Any]] = None
+
+    def document(self) -> Dict[str, Any]:
+        if self._document is None:
+            self._document = json_codec.load_file(self.file_path)
+        return self._document
+
+class LazyConfig(MutableMapping):
+    """Config mapping whose prefetched keys are available immediately.
+
+    Reading any other key, iterating, or taking len() parses the whole file once
+    (the "materialization"); edits made before that are kept and win over the file.
+    Note that json.dump needs a real dict: pass ``config.to_dict()``.
+    """
+
+    def __init__(self, file_path: str, prefetched: Dict[str, Any], known_keys: Iterable[str],
+                 nonempty: bool, source: Optional[_LazySource] = None):
+        self._source = source or _LazySource(file_path)
+        self._data: Dict[str, Any] = dict(prefetched)
+        self._known: Set[str] = set(known_keys) # Keys whose presence/absence the prefetch settled
+        self._deleted: Set[str] = set()
+        self._nonempty = nonempty
+        self._materialized = False
+
+    @classmethod
+    def load(cls, file_path: str, keys: Iterable[str]) -> 'LazyConfig':
+        keys = list(keys)
+        prefetched, nonempty = stream_extract(file_path, keys)
+        return cls(file_path, prefetched, keys, nonempty)
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._materialized
+
+    def _materialize(self) -> Dict[str, Any]:
+        if not self._materialized:
+            full = dict(self._source.document())
+            full.update(self._data)
+            for key in self._deleted:
+                full.pop(key, None)
+            self._data = full
+            self._deleted = set()
+            self._materialized = True
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._data:
+            return self._data[key]
+        if self._materialized or key in self._known or key in self._deleted:
+            raise KeyError(key)
+        return self._materialize()[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._data[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str):
+        self[key] # Raises KeyError if absent
+        self._data.pop(key, None)
+        if not self._materialized:
+            self._deleted.add(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __bool__(self) -> bool:
+        return bool(self._data) if self._materialized else self._nonempty
+
+    def copy(self):
+        """Plain dict once materialized; otherwise a lazy fork sharing the parsed source."""
+        if self._materialized:
+            return dict(self._data)
+        fork = LazyConfig(self._source.file_path, self._data, self._known, self._nonempty, self._source)
+        fork._deleted = set(self._deleted)
+        return fork
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._materialize())
+
+    def __repr__(self) -> str:
+        state = "materialized" if self._materialized else f"{len(self._data)} prefetched keys"
+        return f"<LazyConfig {self._source.file_path!r} ({state})>"
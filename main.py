@@ -1,3 +1,4 @@
+import functools
 import sys
 from pathlib import Path
 
@@ -7,10 +8,32 @@ from PySide6.QtWidgets import (
     QFileDialog, QMessageBox, QMenuBar, QMenu, QStatusBar, QGridLayout,
     QStyleFactory, QSplitter # Added QSplitter
 )
-from PySide6.QtGui import QAction, QKeySequence
-from PySide6.QtCore import Slot, Qt, QSettings
+from PySide6.QtGui import QAction, QKeySequence, QTextCharFormat, QTextCursor
+from PySide6.QtCore import Slot, Qt, QSettings, QObject, Signal
 
 from model import TamingDragonsModel
+import tracing
+
+class SaveNotifier(QObject):
+    """Carries background save results (path, ok, status) back to the GUI thread."""
+    save_finished = Signal(str, bool, str)
+
+def traced_slot(func):
+    """Wraps a slot in a "gui" span and shows in the status bar how long its model calls
+    took (dialogs left open by the user are not counted), or the whole slot if it made
+    none. Returns func unchanged while tracing is off."""
+    if not tracing.tracer.enabled:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        model_ms = tracing.tracer.busy_ms("model")
+        with tracing.span(func.__name__, "gui") as slot_span:
+            result = func(self, *args)
+        model_ms = tracing.tracer.busy_ms("model") - model_ms
+        self._show_latency(func.__name__, model_ms if model_ms else slot_span.duration_ms)
+        return result
+    return wrapper
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -19,6 +42,8 @@ class MainWindow(QMainWindow):
         self.current_base_config_path = None
         self.current_comp_config_path = None
         self.settings = QSettings("TamingDragonsOrg", "KohyaConfigTool")
+        self.save_notifier = SaveNotifier()
+        self.save_notifier.save_finished.connect(self._on_save_finished)
         self._init_ui()
         self._load_app_settings()
         self.app = QApplication.instance()
@@ -32,6 +57,9 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready. Load a base configuration to start.")
+        if tracing.tracer.enabled:
+            self.latency_label = QLabel("⏱ Tracing on")
+            self.status_bar.addPermanentWidget(self.latency_label)
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -134,6 +162,22 @@ class MainWindow(QMainWindow):
         compare_run_button = QPushButton("🔍 Compare Configurations")
         compare_run_button.clicked.connect(self._run_comparison)
         layout.addWidget(compare_run_button, 0, Qt.AlignmentFlag.AlignLeft)
+        similar_group = QGroupBox("Find Similar Configs in a Library")
+        similar_layout = QHBoxLayout()
+        library_btn = QPushButton("Open Config Library...")
+        library_btn.clicked.connect(self._open_library_dialog)
+        similar_layout.addWidget(library_btn)
+        self.library_label = QLabel("No library opened.")
+        self.library_label.setWordWrap(True)
+        similar_layout.addWidget(self.library_label, 1)
+        similar_button = QPushButton("🧭 Find Similar to Working Config")
+        similar_button.clicked.connect(self._find_similar_configs)
+        similar_layout.addWidget(similar_button)
+        types_button = QPushButton("🏷️ Library Config Types")
+        types_button.clicked.connect(self._show_library_types)
+        similar_layout.addWidget(types_button)
+        similar_group.setLayout(similar_layout)
+        layout.addWidget(similar_group)
         self.comparison_result_display = QTextEdit()
         self.comparison_result_display.setReadOnly(True)
         self.comparison_result_display.setPlaceholderText("Comparison results will appear here.")
@@ -177,6 +221,15 @@ class MainWindow(QMainWindow):
         exit_action.setShortcut(QKeySequence.StandardKey.Quit)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
+        edit_menu = menu_bar.addMenu("&Edit")
+        undo_action = QAction("&Undo Tweak", self)
+        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        undo_action.triggered.connect(self._undo_tweak)
+        edit_menu.addAction(undo_action)
+        redo_action = QAction("&Redo Tweak", self)
+        redo_action.setShortcuts([QKeySequence("Ctrl+Y"), QKeySequence.StandardKey.Redo])
+        redo_action.triggered.connect(self._redo_tweak)
+        edit_menu.addAction(redo_action)
         view_menu = menu_bar.addMenu("&View")
         style_menu = view_menu.addMenu("&Style")
         self.style_actions = []
@@ -257,6 +310,7 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage(f"Color scheme set to {action.text()}", 3000)
 
     @Slot()
+    @traced_slot
     def _load_base_config_dialog(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Load Base Configuration", "", "JSON files (*.json)")
         if file_path:
@@ -265,12 +319,7 @@ class MainWindow(QMainWindow):
             self.load_status_label.setText(status)
             self.status_bar.showMessage(status, 5000)
             if tweak_values:
-                for key, value_str in tweak_values.items():
-                    if key in self.tweak_inputs:
-                        if isinstance(self.tweak_inputs[key], QTextEdit):
-                             self.tweak_inputs[key].setPlainText(value_str)
-                        else:
-                             self.tweak_inputs[key].setText(value_str)
+                self._populate_tweak_inputs(tweak_values)
                 self._update_config_summary_display()
                 self._update_suggested_filename_display()
                 QMessageBox.information(self, "Config Loaded", status)
@@ -278,6 +327,7 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Load Error", status)
 
     @Slot()
+    @traced_slot
     def _update_daily_tweaks_from_ui(self):
         if not self.model.working_config:
             QMessageBox.warning(self, "Error", "Please load a base configuration first.")
@@ -295,9 +345,60 @@ class MainWindow(QMainWindow):
         self._update_config_summary_display()
         self._update_suggested_filename_display()
 
+    def _populate_tweak_inputs(self, tweak_values):
+        for key, value_str in tweak_values.items():
+            if key in self.tweak_inputs:
+                if isinstance(self.tweak_inputs[key], QTextEdit):
+                     self.tweak_inputs[key].setPlainText(value_str)
+                else:
+                     self.tweak_inputs[key].setText(value_str)
+
+    @Slot()
+    def _undo_tweak(self):
+        self._apply_history_step(self.model.undo_working_edit())
+
+    @Slot()
+    def _redo_tweak(self):
+        self._apply_history_step(self.model.redo_working_edit())
+
+    def _apply_history_step(self, status):
+        self.update_status_label.setText(status)
+        self.status_bar.showMessage(status, 3000)
+        if self.model.working_config:
+            self._populate_tweak_inputs(self.model.get_daily_tweak_values())
+            self._update_config_summary_display()
+            self._update_suggested_filename_display()
+
     def _update_config_summary_display(self):
-        summary_md = self.model.get_working_config_summary_markdown()
-        self.summary_display.setMarkdown(summary_md)
+        summary_md, changed_rows = self.model.get_working_config_summary_update()
+        if summary_md is not None:
+            self.summary_display.setMarkdown(summary_md)
+            return
+        for row, label, value in changed_rows:
+            if not self._patch_summary_row(row, label, value):
+                self.summary_display.setMarkdown(self.model.get_working_config_summary_markdown())
+                return
+
+    def _patch_summary_row(self, row, label, value):
+        """Rewrites one "**Label:** `value`" list item in place, keeping the label and value
+        formats, so the rest of the document is not re-parsed or re-laid out."""
+        block = self.summary_display.document().findBlockByNumber(row)
+        if not value or not block.isValid() or block.textList() is None \
+                or not block.text().startswith(f"{label}:"):
+            return False
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + 1)
+        label_format = cursor.charFormat()
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        value_format = cursor.charFormat()
+        cursor.setPosition(block.position())
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.beginEditBlock()
+        cursor.insertText(f"{label}:", label_format)
+        cursor.insertText(" ", QTextCharFormat())
+        cursor.insertText(value, value_format)
+        cursor.endEditBlock()
+        return True
 
     @Slot()
     def _select_compare_base_file(self):
@@ -321,6 +422,7 @@ class MainWindow(QMainWindow):
             self.compare_comp_file_label.setText(Path(file_path).name)
 
     @Slot()
+    @traced_slot
     def _run_comparison(self):
         base_to_compare = getattr(self, 'current_base_config_path_for_compare', self.current_base_config_path)
         if not base_to_compare:
@@ -332,9 +434,40 @@ class MainWindow(QMainWindow):
         if not self.model.base_config:
              QMessageBox.warning(self, "Error", "Please load a primary Base Configuration in the 'Quick Tweaks' tab first.")
              return
+        hits_before = self.model.comparison_cache.hits
         result_md = self.model.compare_loaded_configs(self.current_comp_config_path)
         self.comparison_result_display.setMarkdown(result_md)
-        self.status_bar.showMessage("Comparison complete.", 3000)
+        cached = self.model.comparison_cache.hits > hits_before
+        self.status_bar.showMessage("Comparison complete (cached)." if cached else "Comparison complete.", 3000)
+
+    @Slot()
+    def _open_library_dialog(self):
+        root_dir = QFileDialog.getExistingDirectory(self, "Open Config Library")
+        if not root_dir:
+            return
+        status = self.model.open_library(root_dir)
+        self.library_label.setText(f"{Path(root_dir).name}: {status}")
+        self.status_bar.showMessage(status, 5000)
+
+    @Slot()
+    def _find_similar_configs(self):
+        if self.model.library is None:
+            self._open_library_dialog()
+            if self.model.library is None:
+                return
+        _, result_md = self.model.find_similar_configs()
+        self.comparison_result_display.setMarkdown(result_md)
+        self.status_bar.showMessage("Similarity search complete.", 3000)
+
+    @Slot()
+    def _show_library_types(self):
+        if self.model.library is None:
+            self._open_library_dialog()
+            if self.model.library is None:
+                return
+        _, result_md = self.model.classify_library()
+        self.comparison_result_display.setMarkdown(result_md)
+        self.status_bar.showMessage("Library classified.", 3000)
 
     @Slot()
     def _update_suggested_filename_display(self):
@@ -348,6 +481,7 @@ class MainWindow(QMainWindow):
             self.save_as_edit.setText("")
 
     @Slot()
+    @traced_slot
     def _save_config_dialog(self):
         if not self.model.working_config:
             QMessageBox.warning(self, "Error", "No configuration loaded to save.")
@@ -360,14 +494,30 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Filename cannot be empty.")
             self.save_status_label.setText("❌ Filename cannot be empty.")
             return
-        status = self.model.save_working_config(final_filename_to_use)
+        status = self.model.save_working_config_async(final_filename_to_use,
+                                                      callback=self.save_notifier.save_finished.emit)
         self.save_status_label.setText(status)
         self.status_bar.showMessage(status, 5000)
-        if "✅" in status:
+        if "❌" in status:
+            QMessageBox.warning(self, "Save Error", status)
+
+    @Slot(str, bool, str)
+    def _on_save_finished(self, path, ok, status):
+        self.save_status_label.setText(status)
+        self.status_bar.showMessage(status, 5000)
+        if ok:
             QMessageBox.information(self, "Config Saved", status)
         else:
             QMessageBox.warning(self, "Save Error", status)
 
+    def _show_latency(self, operation, elapsed_ms):
+        self.latency_label.setText(f"⏱ {operation.strip('_')}: {elapsed_ms:.1f} ms")
+
+    def closeEvent(self, event):
+        # Let queued saves reach the disk before the process exits
+        self.model.save_writer.flush(timeout=10)
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     if "Fusion" in QStyleFactory.keys():
@@ -1,56 +1,135 @@
 import json
 import os
+import time
 from pathlib import Path
 import re
-from typing import Dict, Any, Tuple, List
-
+import threading
+from typing import Dict, Any, Tuple, List, Mapping, MutableMapping, Callable, Optional
+
+from comparison_cache import ComparisonCache, FileFingerprints, hash_file
+from config_classifier import config_type_label
+from config_diff import SubtreeHasher, deep_diff, diff_to_markdown
+from config_keys import DAILY_TWEAKS_MAP, IMPORTANT_PARAMS_MAP, SUMMARY_KEYS
+from config_lineage import LINEAGE_AUTO, LINEAGE_FILENAME, LineageStore
+from config_overlay import ConfigOverlay, as_plain_dict, same_value
+from config_schema import default_schema
+from config_store import top_level_delta
+from config_summary import SummaryRenderer
+from edit_history import EditHistory, MISSING
+import json_codec
+from lazy_config import LazyConfig
+from save_pipeline import SaveWriter, atomic_write_json
+from tracing import trace_methods
+
+# Files at least this large are loaded lazily (SUMMARY_KEYS first, the rest on first access).
+LAZY_LOAD_THRESHOLD_BYTES = 1 << 20
+
+def detect_config_type(config: Mapping[str, Any]) -> str:
+    """Returns a display name for the config type, e.g. "SDXL LoRA", "Flux DoRA" or "Unknown"."""
+    return config_type_label(config)
+
+def coerce_tweak_value(original_val: Any, str_value: str) -> Any:
+    """Converts a tweak entered as text to the type of the value it replaces.
+
+    bool/int/float originals are converted accordingly; anything else (strings, None)
+    keeps the text. If conversion fails the text is stored as a fallback.
+    """
+    try:
+        if isinstance(original_val, bool):
+            return str_value.lower() in ('true', '1', 'yes', 'on', 'checked')
+        elif isinstance(original_val, int):
+            return int(str_value)
+        elif isinstance(original_val, float):
+            return float(str_value)
+        else: # Includes strings, None, or types not explicitly handled
+            return str_value
+    except ValueError:
+        # If conversion fails for int/float, store as string as a fallback
+        return str_value
+
+def coerce_param_text(schema, key: str, str_value: str, current: Any) -> Any:
+    """Types text for key with the schema (a ConfigSchema or None), or like current, the
+    value it replaces, for keys the schema does not know. Raises ValueError for text the
+    schema rejects."""
+    if schema is not None and key in schema:
+        return schema.coerce(key, str_value, current)
+    return coerce_tweak_value(current, str_value)
+
+def suggest_filename_for(config: Dict[str, Any]) -> str:
+    """Generates a filename suggestion from a config's output_name / training_comment."""
+    output_name = config.get('output_name', "")
+    training_comment = config.get('training_comment', "")
+
+    base_name_part = ""
+    if output_name:
+        base_name_part = str(output_name)
+    elif training_comment:
+        # Extract first two words from training_comment
+        words = str(training_comment).split()[:2]
+        # Sanitize each word: remove non-alphanumeric characters (allow underscore and hyphen)
+        # then join them
+        sanitized_words = [re.sub(r'[^\w-]', '', word) for word in words]
+        base_name_part = '_'.join(filter(None, sanitized_words)) # Filter out empty strings after sanitization
+
+    if not base_name_part: # If still empty after trying output_name and training_comment
+        base_name_part = "modified"
+
+    # Sanitize the derived base_name_part (again, to catch cases from output_name directly)
+    # Allow letters, numbers, underscore, hyphen. Replace others with underscore.
+    sanitized_base = re.sub(r'[^\w\-_]', '_', base_name_part)
+
+    return f"{sanitized_base}_config.json"
+
+@trace_methods(category="model")
 class TamingDragonsModel:
     def __init__(self):
         self.base_config: Dict[str, Any] = {}
         self.comparison_config: Dict[str, Any] = {}
-        self.working_config: Dict[str, Any] = {}
-
-        self.daily_tweaks_map: Dict[str, str] = {
-            'output_name': 'Output Name',
-            'training_comment': 'Training Comment (Trigger Words)',
-            'sample_prompts': 'Sample Prompts',
-            'learning_rate': 'Learning Rate',
-            'unet_lr': 'UNet Learning Rate',
-            'text_encoder_lr': 'Text Encoder Learning Rate',
-            'epoch': 'Epochs',
-            'max_train_steps': 'Max Train Steps',
-            'seed': 'Seed',
-            'train_batch_size': 'Batch Size'
-        }
-
-        self.important_params_map: Dict[str, str] = {
-            'optimizer': 'Optimizer',
-            'lr_scheduler': 'LR Scheduler',
-            'network_dim': 'Network Dimension',
-            'network_alpha': 'Network Alpha',
-            'noise_offset': 'Noise Offset',
-            'min_snr_gamma': 'Min SNR Gamma',
-            'save_every_n_epochs': 'Save Every N Epochs',
-            'save_every_n_steps': 'Save Every N Steps'
-        }
-
-    def load_config_file(self, file_path: str) -> Tuple[Dict[str, Any], str]:
-        """Loads a JSON configuration file and returns config dict + status message."""
+        self.working_config: MutableMapping[str, Any] = {} # ConfigOverlay over base_config once loaded
+        self.library = None # ConfigLibrary, set by open_library()
+        self.library_table = None # ConfigTable of the library's configs, filled by load_library_configs()
+        self._query_index = None # QueryIndex over the library, rebuilt after each scan
+        self._similarity_index = None # SimilarityIndex over the library, rebuilt after each scan
+        self._base_hasher = SubtreeHasher() # Subtree digests of base_config, reused across diffs
+        self._base_file_stat = None # (path, (mtime_ns, size)) of the file base_config was loaded from
+        self.fingerprints = FileFingerprints()
+        self.comparison_cache = ComparisonCache() # Reports keyed by (base hash, comparison hash)
+
+        self.daily_tweaks_map: Dict[str, str] = dict(DAILY_TWEAKS_MAP)
+        self.important_params_map: Dict[str, str] = dict(IMPORTANT_PARAMS_MAP)
+        self.lazy_load_threshold = LAZY_LOAD_THRESHOLD_BYTES # None disables lazy loading
+        self.history = EditHistory() # Undo/redo of working_config edits
+        self.save_writer = SaveWriter(after_write=self._record_saved_lineage) # Background writer for save_working_config_async
+        self.lineage_path = LINEAGE_AUTO # Lineage log of saved configs (see _lineage_file); None disables it
+        self._lineage = None # LineageStore of the last lineage file used, opened on first use
+        self._last_save_dir: Optional[Path] = None
+        self._pending_lineage: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {} # Queued save path -> (snapshot, origin)
+        self._lineage_lock = threading.Lock() # The writer thread records lineage too
+        self.store = None # ConfigStore; when set, save_working_config stores instead of writing files
+        self.schema = default_schema() # ConfigSchema of known Kohya parameters (None if unavailable)
+        self._summary = None # SummaryRenderer with cached summary rows, see _summary_renderer()
+        self._summary_layout = None
+
+    def load_config_file(self, file_path: str, lazy: bool = None) -> Tuple[Dict[str, Any], str]:
+        """Loads a JSON configuration file and returns config dict + status message.
+
+        With lazy=True (or, by default, for files over lazy_load_threshold) only SUMMARY_KEYS
+        are parsed up front and a LazyConfig is returned; the rest of the file is parsed on
+        first access, so errors there surface at that point instead.
+        """
         try:
             if not file_path or not os.path.exists(file_path):
                 return {}, "No file selected or file does not exist."
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            if lazy is None:
+                lazy = self.lazy_load_threshold is not None and os.path.getsize(file_path) >= self.lazy_load_threshold
 
-            config_type = "Unknown"
-            if config.get('LoRA_type') == 'Flux1':
-                config_type = "Flux1 LoRA"
-            elif config.get('sdxl', False):
-                config_type = "SDXL LoRA"
-            elif config.get('LoRA_type') == 'Standard':
-                config_type = "Standard LoRA"
+            if lazy:
+                config = LazyConfig.load(file_path, SUMMARY_KEYS)
+            else:
+                config = json_codec.load_file(file_path)
 
+            config_type = detect_config_type(config)
             optimizer = config.get('optimizer', 'Unknown')
 
             return config, f"✅ Loaded {config_type} config using {optimizer} optimizer"
@@ -58,25 +137,259 @@ class TamingDragonsModel:
         except Exception as e:
             return {}, f"❌ Error loading file: {str(e)}"
 
+    def open_library(self, root_dir: str) -> str:
+        """Opens (or incrementally refreshes) the config library index for a directory tree."""
+        from config_library import ConfigLibrary
+
+        try:
+            if not root_dir or not os.path.isdir(root_dir):
+                return "❌ Library directory does not exist."
+
+            if self.library is None or self.library.root != Path(root_dir).resolve():
+                self.library = ConfigLibrary(root_dir)
+            self._query_index = None
+            self._similarity_index = None
+            self._release_library_table() # Rows may predate the rescan; reload with load_library_configs()
+            return self.library.scan()
+
+        except Exception as e:
+            return f"❌ Error indexing library: {str(e)}"
+
+    def query_library(self, query: str) -> Tuple[List[str], str]:
+        """Finds library configs matching a field query, e.g.
+        ``optimizer=Prodigy network_dim>=64 training_comment~"woman"``.
+
+        Terms are ANDed; operators are = != > >= < <= and ~ (case-insensitive substring).
+        Returns (matching file paths, markdown summary); any path can be passed to set_base_config.
+        """
+        from config_query import QueryIndex, QueryError
+
+        if self.library is None:
+            return [], "❌ Open a config library first."
+        try:
+            start = time.perf_counter()
+            if self._query_index is None:
+                self._query_index = QueryIndex(self.library.valid_entries())
+            paths = self._query_index.search(query)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        except QueryError as e:
+            return [], f"❌ Invalid query: {str(e)}"
+
+        lines = [f"**{len(paths)} of {len(self._query_index)} configs match** ({elapsed_ms:.1f} ms)"]
+        for path in paths[:50]:
+            entry = self.library.get(path)
+            lines.append(f"- `{os.path.relpath(path, self.library.root)}` — {entry['config_type']}, {entry['optimizer']}")
+        if len(paths) > 50:
+            lines.append(f"- … and {len(paths) - 50} more")
+        return paths, "\n".join(lines)
+
+    def find_similar_configs(self, k: int = 10) -> Tuple[List[Tuple[str, float]], str]:
+        """Finds the k library configs most similar to working_config.
+
+        Uses normalized numeric parameters and one-hot categoricals from the library index
+        (no config file is read). The file base_config was loaded from is left out.
+        Returns ([(path, distance), ...] closest first, markdown table).
+        """
+        from config_similarity import SimilarityIndex, similar_to_markdown
+
+        if self.library is None:
+            return [], "❌ Open a config library first."
+        if not self.working_config:
+            return [], "❌ Load a base configuration first."
+
+        if self._similarity_index is None:
+            self._similarity_index = SimilarityIndex(self.library.valid_entries())
+        exclude = [self._base_file_stat[0]] if self._base_file_stat else []
+        results = self._similarity_index.nearest(self.working_config, k, exclude)
+        return results, similar_to_markdown(results, str(self.library.root), self.library.entries,
+                                            len(self._similarity_index))
+
+    def find_config_families(self, threshold: float = 0.7, workers: int = None) -> Tuple[Dict[str, Any], str]:
+        """Groups the library's configs into families of near-duplicates (MinHash + LSH over
+        key=value tokens), each with a representative base config.
+
+        Returns (JSON-serializable report, markdown summary).
+        """
+        from config_families import cluster_files, families_to_markdown
+
+        if self.library is None:
+            return {}, "❌ Open a config library first."
+        try:
+            report = cluster_files(sorted(path for path, _ in self.library.valid_entries()), threshold,
+                                   workers=workers)
+        except Exception as e:
+            return {}, f"❌ Error clustering library: {str(e)}"
+        return report, families_to_markdown(report, str(self.library.root))
+
+    def classify_library(self) -> Tuple[Dict[str, Any], str]:
+        """Model family / network type / trainer mode counts over the library.
+
+        Every index entry is classified when it is scanned, so no config file is read.
+        Returns (statistics, markdown tables).
+        """
+        from config_classifier import family_statistics, statistics_to_markdown
+
+        if self.library is None:
+            return {}, "❌ Open a config library first."
+        stats = family_statistics(entry for _, entry in self.library.valid_entries())
+        return stats, statistics_to_markdown(stats)
+
+    def enable_store(self, store_dir: str = "configs/.store") -> str:
+        """Switches saving to the content-addressed store (deduplicated, variants as deltas)."""
+        from config_store import ConfigStore
+
+        try:
+            self.store = ConfigStore(store_dir)
+            return f"✅ Store mode enabled: {len(self.store.refs)} stored configurations in {store_dir}"
+        except Exception as e:
+            return f"❌ Error opening store: {str(e)}"
+
+    def disable_store(self):
+        self.store = None
+
+    def export_stored_config(self, name: str, save_dir: str = "configs") -> str:
+        """Writes a config from the store out as a plain JSON file in save_dir."""
+        if self.store is None:
+            return "❌ Store mode is not enabled."
+        try:
+            name = self._store_name(name)
+            return self.store.export(name, str(self._resolve_save_path(name, save_dir)))
+        except Exception as e:
+            return f"❌ Error exporting configuration: {str(e)}"
+
     def set_base_config(self, file_path: str) -> Tuple[str, Dict[str, str]]:
         """Loads the base configuration, sets working_config, and returns status and daily tweak values."""
         if not file_path:
             return "Select a base configuration file", {}
 
+        try:
+            base_file_stat = (file_path, FileFingerprints.stat_key(file_path)) # Taken before reading
+        except OSError:
+            base_file_stat = None
         config, status = self.load_config_file(file_path)
 
         if not config:
             return status, {}
 
-        self.base_config = config
-        self.working_config = self.base_config.copy() # Important: make a copy
+        self._set_base(config, base_file_stat)
+        return status, self.get_daily_tweak_values()
 
+    def _set_base(self, config: Mapping, base_file_stat: Optional[Tuple[str, Tuple[int, int]]]):
+        self.base_config = config
+        self._base_file_stat = base_file_stat
+        self._base_hasher.clear()
+        self.working_config = ConfigOverlay(self.base_config) # Copy-on-write: base_config is never modified
+        self.history.clear()
+
+    def _release_library_table(self):
+        """Drops library_table, closing its snapshot mapping. A base config that is one of
+        its rows is first copied to a plain dict; the working config keeps its edits."""
+        from config_table import ConfigRow
+
+        table, self.library_table = self.library_table, None
+        if table is None:
+            return
+        if isinstance(self.base_config, ConfigRow):
+            plain = self.base_config.to_dict()
+            if isinstance(self.working_config, ConfigOverlay) and self.working_config.base is self.base_config:
+                self.working_config = self.working_config.rebased(plain)
+            self.base_config = plain
+            self._base_hasher.clear()
+        close = getattr(table, 'close', None) # Only a SnapshotTable holds a mapping
+        if close is not None:
+            close()
+
+    def load_library_configs(self, use_snapshot: bool = True) -> str:
+        """Loads every indexed library config into library_table, a compact columnar store
+        (shared key table, typed numeric columns, dictionary-encoded values) whose rows read
+        like dicts. Files changed since the last scan are skipped until the next open_library().
+
+        With use_snapshot, a binary snapshot next to the library index is memory-mapped
+        instead when it was built from exactly the currently indexed files; otherwise the
+        table is rebuilt from the JSON files and the snapshot rewritten.
+        """
+        from config_snapshot import SNAPSHOT_FILENAME, SnapshotError, SnapshotTable, source_stamp, write_snapshot
+        from config_table import ConfigTable
+
+        if self.library is None:
+            return "❌ Open a config library first."
+        start = time.perf_counter()
+        self._release_library_table() # Closes a mapped snapshot before it may be replaced below
+        snapshot_path = self.library.root / SNAPSHOT_FILENAME
+        if use_snapshot:
+            try:
+                stamp = source_stamp((path, entry['hash']) for path, entry in self.library.valid_entries())
+                self.library_table = SnapshotTable(str(snapshot_path), expected_stamp=stamp)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                return f"✅ Opened snapshot of {len(self.library_table)} library configs in {elapsed_ms:.1f} ms"
+            except SnapshotError:
+                pass # Missing, stale or damaged: rebuild below
+
+        table = ConfigTable()
+        loaded = []
+        stale = failed = 0
+        for path, entry in self.library.valid_entries():
+            try:
+                if FileFingerprints.stat_key(path) != (entry['mtime_ns'], entry['size']):
+                    stale += 1
+                    continue
+                config = json_codec.load_file(path)
+            except (OSError, ValueError):
+                failed += 1
+                continue
+            if isinstance(config, dict):
+                table.add(path, config)
+                loaded.append((path, entry['hash']))
+        self.library_table = table
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        status = f"✅ Loaded {len(table)} library configs in {elapsed_ms:.1f} ms"
+        if stale or failed:
+            status += f" ({stale} changed since the last scan, {failed} unreadable)"
+        if use_snapshot:
+            try:
+                write_snapshot(table, str(snapshot_path), source_stamp(loaded))
+            except OSError as e:
+                status += f"; snapshot not saved: {str(e)}"
+        return status
+
+    def use_library_config(self, file_path: str) -> Tuple[str, Dict[str, str]]:
+        """Like set_base_config, but takes the base from library_table without reading the file."""
+        path = str(Path(file_path).resolve())
+        row = self.library_table.get(path) if self.library_table is not None else None
+        if row is None:
+            return self.set_base_config(file_path)
+
+        entry = self.library.get(path) if self.library is not None else None
+        self._set_base(row, (path, (entry['mtime_ns'], entry['size'])) if entry else None)
+        status = f"✅ Loaded {detect_config_type(row)} config using {row.get('optimizer', 'Unknown')} optimizer"
+        return status, self.get_daily_tweak_values()
+
+    def get_daily_tweak_values(self) -> Dict[str, str]:
+        """Returns the working config's daily tweak values as text for the UI fields."""
         daily_tweak_values: Dict[str, str] = {}
         for param_key in self.daily_tweaks_map.keys():
             value = self.working_config.get(param_key)
             daily_tweak_values[param_key] = str(value) if value is not None else ""
-
-        return status, daily_tweak_values
+        return daily_tweak_values
+
+    def reset_working_config(self):
+        """Discards all tweaks (and their undo history) by starting a fresh overlay on base_config."""
+        self.working_config = ConfigOverlay(self.base_config)
+        self.history.clear()
+
+    def get_working_changes(self) -> Dict[str, Tuple[Any, Any]]:
+        """Returns {key: (base value, working value)} for every key changed since the base was loaded."""
+        if isinstance(self.working_config, ConfigOverlay) and self.working_config.base is self.base_config:
+            return self.working_config.changes()
+
+        changes = {}
+        for key in set(self.base_config) | set(self.working_config):
+            base_val = self.base_config.get(key)
+            work_val = self.working_config.get(key)
+            if key not in self.base_config or key not in self.working_config or not same_value(base_val, work_val):
+                changes[key] = (base_val, work_val)
+        return changes
 
     def compare_loaded_configs(self, comp_file_path: str) -> str:
         """Compares the current base_config with another config file."""
@@ -85,10 +398,19 @@ class TamingDragonsModel:
         if not comp_file_path:
             return "Please select a comparison configuration file."
 
+        cache_key = self._comparison_cache_key(comp_file_path)
+        if cache_key is not None:
+            cached = self.comparison_cache.get(cache_key)
+            if cached is not None:
+                self.comparison_config, report = cached
+                return report
+
         comparison_config, comp_status = self.load_config_file(comp_file_path)
 
         if not comparison_config:
             return f"Error loading comparison file:\n{comp_status}"
+        if cache_key is not None and self._comparison_cache_key(comp_file_path) != cache_key:
+            cache_key = None # Changed while loading; do not cache under the old hash
 
         self.comparison_config = comparison_config # Store for potential future use
 
@@ -98,10 +420,7 @@ class TamingDragonsModel:
         # We can re-generate it if needed, or store it. For now, let's assume it's known.
         # _, base_status = self.load_config_file(self.base_config_path) # if base_config_path is stored
 
-        base_status_type = "Unknown"
-        if self.base_config.get('LoRA_type') == 'Flux1': base_status_type = "Flux1 LoRA"
-        elif self.base_config.get('sdxl', False): base_status_type = "SDXL LoRA"
-        elif self.base_config.get('LoRA_type') == 'Standard': base_status_type = "Standard LoRA"
+        base_status_type = detect_config_type(self.base_config)
         base_optimizer = self.base_config.get('optimizer', 'Unknown')
         base_full_status = f"Base: {base_status_type} config using {base_optimizer} optimizer"
 
@@ -154,75 +473,398 @@ class TamingDragonsModel:
             else: # Optimizers were different but no other key diffs
                 comparison_parts.append("\n⚠️ **Optimizers differ, but other key parameters are similar.**")
 
+        # Everything outside the mapped keys, found by a full recursive diff
+        mapped_keys = set(self.daily_tweaks_map) | set(self.important_params_map) | {'optimizer_args'}
+        other_diffs = [c for c in self.get_comparison_diff() if c['path'][0] not in mapped_keys]
+        if other_diffs:
+            comparison_parts.append(f"\n### 🧩 Other Parameter Differences ({len(other_diffs)})")
+            comparison_parts.append(diff_to_markdown(other_diffs))
+
+        report = "\n\n".join(comparison_parts)
+        if cache_key is not None:
+            self.comparison_cache.put(cache_key, (self.comparison_config, report))
+        return report
+
+    def _comparison_cache_key(self, comp_file_path: str) -> Optional[Tuple[str, str]]:
+        """(base hash, comparison hash), or None if either cannot be identified by file content."""
+        if self._base_file_stat is None:
+            return None
+        try:
+            base_path, base_stat = self._base_file_stat
+            base_hash = self.fingerprints.content_hash(base_path, base_stat)
+            comp_hash = self.fingerprints.content_hash(comp_file_path)
+        except OSError:
+            return None
+        if base_hash is None or comp_hash is None:
+            return None
+        return base_hash, comp_hash
+
+    def compare_many_configs(self, file_paths: List[str], keys: List[str] = None) -> Tuple[Any, str]:
+        """Builds an N-way ComparisonMatrix over the given files. Returns (matrix, markdown report).
+
+        Defaults to the daily tweak and important parameter keys plus optimizer_args. When a
+        library is open, indexed files are read from the index instead of being re-parsed.
+        """
+        from config_compare import ComparisonMatrix
+        from config_library import INDEXED_KEYS
+
+        if not file_paths:
+            return None, "Please select configuration files to compare."
+
+        if keys is None:
+            keys = list(self.daily_tweaks_map) + list(self.important_params_map) + ['optimizer_args']
+        use_index = self.library is not None and set(keys) <= set(INDEXED_KEYS)
+
+        matrix = ComparisonMatrix(keys)
+        errors = []
+        for file_path in file_paths:
+            entry = self.library.get(file_path) if use_index else None
+            row = self.library_table.get(str(Path(file_path).resolve())) if self.library_table is not None else None
+            if entry and 'fields' in entry:
+                config = entry['fields']
+            elif row is not None:
+                config = row
+            else:
+                config, status = self.load_config_file(file_path)
+                if not config:
+                    errors.append(f"- `{Path(file_path).name}`: {status}")
+                    continue
+            matrix.add(str(file_path), config)
+
+        labels = {**self.daily_tweaks_map, **self.important_params_map, 'optimizer_args': 'Optimizer Args'}
+        report = matrix.to_markdown(labels)
+        if errors:
+            report += "\n\n### ❌ Files that could not be loaded\n" + "\n".join(errors)
+        return matrix, report
+
+    def get_comparison_diff(self) -> List[Dict[str, Any]]:
+        """Full recursive diff of base_config against the last loaded comparison_config.
+
+        Returns a list of {'op', 'path', 'old', 'new'} dicts (see config_diff.deep_diff).
+        """
+        if not self.base_config or not self.comparison_config:
+            return []
+        return deep_diff(as_plain_dict(self.base_config), as_plain_dict(self.comparison_config), self._base_hasher)
+
+    def _coerce_text(self, key: str, str_value: str) -> Any:
+        """Types text for key with the schema, or like the working value it replaces for unknown keys.
+
+        Raises ValueError for text the schema rejects.
+        """
+        return coerce_param_text(self.schema, key, str_value, self.working_config.get(key))
+
+    def _is_bool_param(self, key: str) -> bool:
+        current = self.working_config.get(key)
+        if self.schema is not None and key in self.schema:
+            types = self.schema.params[key].types
+            return types == ('bool',) or ('bool' in types and isinstance(current, bool))
+        return isinstance(current, bool)
+
+    def _typed_daily_tweaks(self, new_values: Dict[str, str], errors: List[str]) -> Dict[str, Any]:
+        """Types the non-empty daily tweak values; rejected values are appended to errors."""
+        typed_values: Dict[str, Any] = {}
+        for param_key, str_value in new_values.items():
+            if param_key not in self.daily_tweaks_map:
+                continue # Should not happen if new_values keys are from daily_tweaks_map
 
-        return "\n\n".join(comparison_parts)
+            if str_value.strip() or self._is_bool_param(param_key): # Update if not empty OR if bool (empty string might mean False)
+                try:
+                    typed_values[param_key] = self._coerce_text(param_key, str_value)
+                except ValueError as e:
+                    errors.append(str(e))
+        return typed_values
+
+    def _set_working_values(self, values: Dict[str, Any]):
+        """Writes values into working_config as one undoable edit."""
+        deltas = []
+        for key, value in values.items():
+            old_value = self.working_config.get(key, MISSING) if key in self.working_config else MISSING
+            if old_value is MISSING or not same_value(old_value, value):
+                deltas.append((key, old_value, value))
+            self.working_config[key] = value
+        self.history.record(deltas)
+        self._mark_summary_dirty(key for key, _, _ in deltas)
+
+    def _mark_summary_dirty(self, keys):
+        if self._summary is not None:
+            self._summary.mark_dirty(keys)
 
     def update_working_config_daily_tweaks(self, new_values: Dict[str, str]) -> str:
         """Updates the working configuration with new daily tweak values."""
         if not self.working_config:
             return "❌ Please load a base configuration first"
 
-        updated_params_count = 0
-        for param_key, str_value in new_values.items():
-            if param_key not in self.daily_tweaks_map:
-                continue # Should not happen if new_values keys are from daily_tweaks_map
-
-            if str_value.strip() or isinstance(self.working_config.get(param_key), bool): # Update if not empty OR if original is bool (empty string might mean False)
-                original_val = self.working_config.get(param_key)
-
-                try:
-                    if isinstance(original_val, bool):
-                        new_typed_value = str_value.lower() in ('true', '1', 'yes', 'on', 'checked')
-                    elif isinstance(original_val, int):
-                        new_typed_value = int(str_value)
-                    elif isinstance(original_val, float):
-                        new_typed_value = float(str_value)
-                    else: # Includes strings, None, or types not explicitly handled
-                        new_typed_value = str_value
-
-                    self.working_config[param_key] = new_typed_value
-                    updated_params_count +=1
-                except ValueError:
-                    # If conversion fails for int/float, store as string as a fallback
-                    self.working_config[param_key] = str_value
-                    updated_params_count +=1
+        errors: List[str] = []
+        typed_values = self._typed_daily_tweaks(new_values, errors)
+        if errors:
+            return f"❌ Invalid values, nothing changed: {'; '.join(errors)}"
+        self._set_working_values(typed_values)
+        updated_params_count = len(typed_values)
 
         if updated_params_count > 0:
             return f"✅ Daily tweaks updated successfully ({updated_params_count} parameters changed)."
         else:
             return "ℹ️ No changes applied to daily tweaks (values were empty or same)."
 
+    def apply_tweaks(self, new_values: Dict[str, Any]) -> str:
+        """Applies tweaks for any config key on top of the working configuration.
+
+        Daily tweak keys follow update_working_config_daily_tweaks; other keys follow the
+        same rules (empty text is skipped, text is typed like the value it replaces).
+        Non-text values (e.g. from JSON input) are stored as given. Keys in the schema are
+        typed and checked by it, and nothing is applied if any value is invalid. One undoable edit.
+        """
+        if not self.working_config:
+            return "❌ Please load a base configuration first"
+
+        daily_values = {}
+        other_values = {}
+        errors: List[str] = []
+        for key, value in new_values.items():
+            if key in self.daily_tweaks_map and isinstance(value, str):
+                daily_values[key] = value
+            elif not isinstance(value, str):
+                error = self.schema.check(key, value) if self.schema is not None else None
+                if error:
+                    errors.append(f"{key}: {error['message']}")
+                other_values[key] = value
+            elif value.strip():
+                try:
+                    other_values[key] = self._coerce_text(key, value)
+                except ValueError as e:
+                    errors.append(str(e))
+
+        typed_daily = self._typed_daily_tweaks(daily_values, errors)
+        if errors:
+            return f"❌ Invalid values, nothing changed: {'; '.join(errors)}"
+        self._set_working_values({**typed_daily, **other_values})
+
+        status = ""
+        if typed_daily:
+            status = f"✅ Daily tweaks updated successfully ({len(typed_daily)} parameters changed)."
+        if other_values:
+            status = (status + " " if status else "") + f"✅ {len(other_values)} other parameters changed."
+        return status or "ℹ️ No changes applied (values were empty)."
+
+    def validate_working_config(self) -> str:
+        """Checks the working configuration against the schema."""
+        if not self.working_config:
+            return "❌ Please load a base configuration first"
+        if self.schema is None:
+            return "❌ No parameter schema available."
+
+        errors = self.schema.validate(as_plain_dict(self.working_config))
+        if not errors:
+            return "✅ Configuration matches the parameter schema."
+        return "❌ " + "; ".join(f"{self._param_label(e['key'])}: {e['message']}" for e in errors)
+
+    def validate_config_directory(self, root_dir: str, report_path: str = None, workers: int = None) -> str:
+        """Validates every config below root_dir in parallel; optionally writes the JSON error report."""
+        from config_schema import validate_directory
+
+        if self.schema is None:
+            return "❌ No parameter schema available."
+        if not root_dir or not os.path.isdir(root_dir):
+            return "❌ Directory does not exist."
+
+        try:
+            report = validate_directory(self.schema, root_dir, workers)
+            if report_path:
+                atomic_write_json(Path(report_path), report)
+            status = "❌" if report['files_invalid'] else "✅"
+            return (f"{status} {report['files_invalid']} of {report['files_checked']} configs invalid "
+                    f"({len(report['errors'])} errors)")
+        except Exception as e:
+            return f"❌ Error validating configs: {str(e)}"
+
+    def undo_working_edit(self) -> str:
+        """Reverts the last tweak applied to the working configuration."""
+        keys = self.history.undo(self.working_config)
+        if keys is None:
+            return "ℹ️ Nothing to undo."
+        self._mark_summary_dirty(keys)
+        return f"↩️ Undid change to: {', '.join(self._param_label(key) for key in keys)}"
+
+    def redo_working_edit(self) -> str:
+        """Re-applies the last undone tweak."""
+        keys = self.history.redo(self.working_config)
+        if keys is None:
+            return "ℹ️ Nothing to redo."
+        self._mark_summary_dirty(keys)
+        return f"↪️ Redid change to: {', '.join(self._param_label(key) for key in keys)}"
+
+    def merge_configs(self, base_path: str, theirs_path: str, ours_path: str = None,
+                      prefer: str = 'ours') -> Tuple[str, List[Dict[str, Any]]]:
+        """Three-way merges theirs into the working configuration (ours), relative to base.
+
+        With ours_path, that file is loaded as the base configuration first. Changes only
+        theirs made are applied as one undoable edit; keys both sides changed differently
+        are conflicts, resolved with prefer ('ours' or 'theirs'). Returns (markdown report,
+        JSON-serializable conflicts).
+        """
+        from config_merge import merge3, merge_to_markdown, conflicts_to_report
+
+        if ours_path:
+            status, _ = self.set_base_config(ours_path)
+            if not self.base_config:
+                return status, []
+        if not self.working_config:
+            return "❌ Please load a base configuration first", []
+
+        base, base_status = self.load_config_file(base_path, lazy=False)
+        if not base:
+            return f"❌ Error loading merge base: {base_status}", []
+        theirs, theirs_status = self.load_config_file(theirs_path, lazy=False)
+        if not theirs:
+            return f"❌ Error loading their configuration: {theirs_status}", []
+
+        ours = as_plain_dict(self.working_config)
+        merged, applied, conflicts = merge3(base, ours, theirs, prefer)
+
+        deltas = []
+        for key in list(self.working_config):
+            if key not in merged:
+                deltas.append((key, self.working_config[key], MISSING))
+                del self.working_config[key]
+        for key, value in merged.items():
+            old_value = self.working_config[key] if key in self.working_config else MISSING
+            if old_value is MISSING or not same_value(old_value, value):
+                deltas.append((key, old_value, value))
+                self.working_config[key] = value
+        self.history.record(deltas)
+        self._mark_summary_dirty(key for key, _, _ in deltas)
+
+        return merge_to_markdown(applied, conflicts), conflicts_to_report(conflicts)
+
+    def merge_configs_batch(self, base_path: str, theirs_path: str, target_dir: str, out_dir: str = None,
+                            on_conflict: str = 'skip', workers: int = None) -> Tuple[List[Dict[str, Any]], str]:
+        """Propagates the base -> theirs change into every config below target_dir, in parallel.
+
+        Files with conflicts are left untouched unless on_conflict is 'ours' or 'theirs'.
+        Returns (per-file results, status message).
+        """
+        from config_library import iter_config_files
+        from config_merge import merge_batch, summarize_batch
+
+        if not target_dir or not os.path.isdir(target_dir):
+            return [], "❌ Target directory does not exist."
+        base, base_status = self.load_config_file(base_path, lazy=False)
+        theirs, theirs_status = self.load_config_file(theirs_path, lazy=False)
+        if not base or not theirs:
+            return [], f"❌ Error loading upstream configs:\n{base_status}\n{theirs_status}"
+
+        try:
+            targets = sorted(path for path, _ in iter_config_files(Path(target_dir)))
+            results = list(merge_batch(base, theirs, targets, out_dir, on_conflict, target_dir, workers))
+            return results, summarize_batch(results)
+        except Exception as e:
+            return [], f"❌ Error merging configs: {str(e)}"
+
+    def bulk_patch(self, root_dir: str, patch: Any, where: Dict[str, Any] = None, dry_run: bool = True,
+                   workers: int = None) -> Tuple[Dict[str, Any], str]:
+        """Applies a JSON Patch (list) or partial config (dict) to every config below root_dir.
+
+        Only configs whose top-level values match where are touched. Defaults to a dry run
+        whose report summarizes the changed paths; a real run can be undone with
+        rollback_bulk_patch(). Returns (report, status message).
+        """
+        from config_patch import patch_directory, summarize_report
+
+        if not root_dir or not os.path.isdir(root_dir):
+            return {}, "❌ Directory does not exist."
+        if not patch or not isinstance(patch, (dict, list)):
+            return {}, "❌ Patch must be a non-empty JSON Patch list or partial config dict."
+
+        try:
+            report = patch_directory(root_dir, patch, where, dry_run, workers)
+            return report, summarize_report(report)
+        except Exception as e:
+            return {}, f"❌ Error patching configs: {str(e)}"
+
+    def rollback_bulk_patch(self, root_dir: str, run_id: str = None) -> str:
+        """Restores the files changed by a bulk patch run (the latest one by default)."""
+        from config_patch import rollback_run
+
+        try:
+            outcome = rollback_run(root_dir, run_id)
+        except Exception as e:
+            return f"❌ Error rolling back: {str(e)}"
+        status = f"✅ Restored {outcome['restored']} configs from run {outcome['run_id']}"
+        if outcome['modified_since']:
+            status += f" ({len(outcome['modified_since'])} edited since the patch were left alone)"
+        return status
+
+    def _param_label(self, key: str) -> str:
+        return self.daily_tweaks_map.get(key) or self.important_params_map.get(key) or key
+
+    def generate_sweep(self, ranges: Dict[str, Any], mode: str = 'grid', count: int = None,
+                       seed: int = None, out_dir: str = "configs/sweeps", workers: int = None) -> str:
+        """Writes a grid/random/lhs hyperparameter sweep of the working configuration.
+
+        ranges maps config keys to a list of values or a {'min', 'max', 'steps', 'log'} dict
+        (see config_sweep). Values are typed and checked like daily tweaks; a sweep with
+        a value the schema rejects writes nothing. Returns a status message.
+        """
+        from config_sweep import run_sweep
+
+        if not self.working_config:
+            return "❌ Please load a base configuration first"
+        if not ranges:
+            return "❌ No sweep ranges given."
+
+        try:
+            _, status = run_sweep(self.working_config, ranges, out_dir, mode, count, seed, workers, self.schema)
+            return status
+        except Exception as e:
+            return f"❌ Error generating sweep: {str(e)}"
+
+    def _summary_renderer(self) -> SummaryRenderer:
+        layout = (tuple(self.daily_tweaks_map.items()), tuple(self.important_params_map.items()))
+        if self._summary is None or self._summary_layout != layout:
+            self._summary_layout = layout
+            self._summary = SummaryRenderer("## 🎯 Current Configuration Summary", [
+                ("\n### Daily Tweaks", list(self.daily_tweaks_map.items())),
+                ("\n### Key Settings (Important Parameters)",
+                 list(self.important_params_map.items()) + [('optimizer_args', "Optimizer Args")]),
+            ], none_as_missing=['optimizer_args'])
+        return self._summary
 
     def get_working_config_summary_markdown(self) -> str:
-        """Returns a markdown formatted string summary of the current working configuration."""
+        """Returns a markdown formatted string summary of the current working configuration.
+
+        Rows are cached; only keys edited through the model since the last call are re-rendered.
+        """
         if not self.working_config:
             return "No configuration loaded. Please load a base config first."
+        return self._summary_renderer().render(self.working_config)
 
-        summary_parts = []
-        summary_parts.append("## 🎯 Current Configuration Summary")
+    def get_working_config_summary_update(self) -> Tuple[Optional[str], List[Tuple[int, str, str]]]:
+        """Incremental form of get_working_config_summary_markdown for views that keep the
+        rendered document: (markdown, []) when the whole summary must be shown (first call,
+        new base config, nothing loaded), otherwise (None, [(row, label, value text)]) for
+        just the rows that changed since the previous call."""
+        if not self.working_config:
+            if self._summary is not None:
+                self._summary.invalidate()
+            return self.get_working_config_summary_markdown(), []
+        return self._summary_renderer().update(self.working_config)
 
-        summary_parts.append("\n### Daily Tweaks")
-        for param, label in self.daily_tweaks_map.items():
-            value = self.working_config.get(param, "Not set")
-            summary_parts.append(f"- **{label}:** `{value}`")
+    def _resolve_save_path(self, filename: str, save_dir: str) -> Path:
+        # Ensure .json extension
+        if not filename.lower().endswith('.json'):
+            filename += '.json'
 
-        summary_parts.append("\n### Key Settings (Important Parameters)")
-        for param, label in self.important_params_map.items():
-            value = self.working_config.get(param, "Not set")
-            summary_parts.append(f"- **{label}:** `{value}`")
-
-        # Optionally, add other specific sections if needed, e.g., optimizer_args if not in important_params
-        opt_args = self.working_config.get('optimizer_args')
-        if opt_args is not None: # Check for None explicitly
-             summary_parts.append(f"- **Optimizer Args:** `{opt_args}`")
-        else:
-             summary_parts.append(f"- **Optimizer Args:** `Not set`")
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True) # Ensure directory exists
 
+        return save_dir / filename
 
-        return "\n".join(summary_parts)
+    @staticmethod
+    def _store_name(filename: str) -> str:
+        return filename if filename.lower().endswith('.json') else filename + '.json'
 
-    def save_working_config(self, filename: str) -> str:
-        """Saves the working configuration to a JSON file."""
+    def save_working_config(self, filename: str, save_dir: str = "configs") -> str:
+        """Saves the working configuration to a JSON file in save_dir (atomically)."""
         if not self.working_config:
             return "❌ No configuration to save."
 
@@ -230,50 +872,183 @@ class TamingDragonsModel:
             if not filename.strip():
                 return "❌ Filename cannot be empty."
 
-            # Ensure .json extension
-            if not filename.lower().endswith('.json'):
-                filename += '.json'
-
-            save_dir = Path("configs")
-            save_dir.mkdir(parents=True, exist_ok=True) # Ensure directory exists
+            if self.store is not None:
+                base = as_plain_dict(self.base_config) if self.base_config else None
+                return self.store.put(self._store_name(filename), dict(as_plain_dict(self.working_config)), base)
 
-            save_path = save_dir / filename
-
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(self.working_config, f, indent=2, ensure_ascii=False)
+            save_path = self._resolve_save_path(filename, save_dir)
+            origin = self._lineage_origin()
+            atomic_write_json(save_path, as_plain_dict(self.working_config))
+            self._record_lineage(str(save_path), origin)
 
             return f"✅ Configuration saved successfully as: {save_path.resolve()}"
 
         except Exception as e:
             return f"❌ Error saving configuration: {str(e)}"
 
-    def suggest_filename(self) -> str:
-        """Generates a filename suggestion based on current working_config."""
+    def save_working_config_async(self, filename: str, save_dir: str = "configs",
+                                  callback: Callable[[str, bool, str], None] = None) -> str:
+        """Queues a save of the working configuration on the background writer.
+
+        Only a shallow snapshot is taken here; serialization and the atomic write happen on
+        the writer thread, and repeated saves to a still-pending path are coalesced.
+        callback(path, ok, status) runs on the writer thread when the file is written.
+        In store mode the config is stored right away, as save_working_config does, and
+        callback gets the stored name.
+        """
         if not self.working_config:
-            return "modified_config.json"
+            return "❌ No configuration to save."
 
-        output_name = self.working_config.get('output_name', "")
-        training_comment = self.working_config.get('training_comment', "")
+        try:
+            if not filename.strip():
+                return "❌ Filename cannot be empty."
 
-        base_name_part = ""
-        if output_name:
-            base_name_part = str(output_name)
-        elif training_comment:
-            # Extract first two words from training_comment
-            words = str(training_comment).split()[:2]
-            # Sanitize each word: remove non-alphanumeric characters (allow underscore and hyphen)
-            # then join them
-            sanitized_words = [re.sub(r'[^\w-]', '', word) for word in words]
-            base_name_part = '_'.join(filter(None, sanitized_words)) # Filter out empty strings after sanitization
+            if self.store is not None:
+                status = self.save_working_config(filename, save_dir)
+                if callback is not None:
+                    callback(self._store_name(filename), not status.startswith("❌"), status)
+                return status
 
-        if not base_name_part: # If still empty after trying output_name and training_comment
-            base_name_part = "modified"
+            save_path = self._resolve_save_path(filename, save_dir)
+            snapshot = dict(as_plain_dict(self.working_config))
+            if self.lineage_path:
+                origin = self._lineage_origin()
+                with self._lineage_lock:
+                    self._pending_lineage[str(save_path)] = (snapshot, origin)
+            coalesced = self.save_writer.submit(save_path, snapshot, callback)
 
-        # Sanitize the derived base_name_part (again, to catch cases from output_name directly)
-        # Allow letters, numbers, underscore, hyphen. Replace others with underscore.
-        sanitized_base = re.sub(r'[^\w\-_]', '_', base_name_part)
+            if coalesced:
+                return f"⏳ Save of {save_path.name} already queued; it will write the latest changes."
+            return f"⏳ Saving {save_path.name}..."
 
-        return f"{sanitized_base}_config.json"
+        except Exception as e:
+            return f"❌ Error saving configuration: {str(e)}"
+
+    def _lineage_origin(self) -> Dict[str, Any]:
+        """Parent hash/path and top-level delta of working_config, captured at save time."""
+        parent = parent_path = None
+        if self._base_file_stat:
+            path, stat = self._base_file_stat
+            try:
+                parent = self.fingerprints.content_hash(path, expected=stat) # None if the file changed since
+                parent_path = str(Path(path).resolve())
+            except OSError:
+                pass
+
+        if isinstance(self.working_config, ConfigOverlay) and self.working_config.base is self.base_config:
+            removed = set(self.working_config.removed_keys())
+            delta = {'set': {key: new for key, (_, new) in self.working_config.changes().items() if key not in removed},
+                     'removed': sorted(removed)}
+        else:
+            delta = top_level_delta(as_plain_dict(self.base_config), as_plain_dict(self.working_config))
+        return {'parent': parent, 'parent_path': parent_path, 'delta': delta}
+
+    def _lineage_file(self, near: Optional[str] = None) -> Optional[Path]:
+        """Lineage log for configs next to the file near: lineage_path if set explicitly,
+        otherwise the open library's root when near lies inside it, else near's directory.
+        Without near, the library root or the directory of the last save is used."""
+        if not self.lineage_path:
+            return None
+        if self.lineage_path != LINEAGE_AUTO:
+            return Path(self.lineage_path)
+        directory = Path(near).resolve().parent if near else self._last_save_dir
+        if self.library is not None:
+            root = self.library.root
+            if directory is None or directory == root or root in directory.parents:
+                return root / LINEAGE_FILENAME
+        return (directory or Path("configs").resolve()) / LINEAGE_FILENAME
+
+    def _lineage_store(self, path: Path) -> LineageStore:
+        if self._lineage is None or self._lineage.path != path:
+            self._lineage = LineageStore(path)
+        return self._lineage
+
+    def _record_lineage(self, save_path: str, origin: Dict[str, Any]):
+        lineage_file = self._lineage_file(save_path)
+        if lineage_file is None:
+            return
+        try:
+            with self._lineage_lock:
+                self._last_save_dir = Path(save_path).resolve().parent
+                self._lineage_store(lineage_file).record(hash_file(save_path), str(Path(save_path).resolve()),
+                                                         origin['parent'], origin['parent_path'], origin['delta'])
+        except OSError:
+            pass # The config itself is saved; only its lineage record is lost
+
+    def _record_saved_lineage(self, save_path: str, snapshot: Dict[str, Any]):
+        """SaveWriter hook: records lineage for the snapshot just written, unless a newer
+        save of the same path has been queued since (that one is recorded when written)."""
+        with self._lineage_lock:
+            pending = self._pending_lineage.get(save_path)
+            if pending is None or pending[0] is not snapshot:
+                return
+            del self._pending_lineage[save_path]
+        self._record_lineage(save_path, pending[1])
+
+    def lineage_graph(self, near: Optional[str] = None):
+        """The LineageGraph of saved configs in the lineage log for near (see _lineage_file),
+        or None when lineage is disabled."""
+        lineage_file = self._lineage_file(near)
+        if lineage_file is None:
+            return None
+        with self._lineage_lock:
+            return self._lineage_store(lineage_file).graph()
+
+    def describe_lineage(self, ref: str) -> str:
+        """Markdown lineage of a config (file path or hash): its ancestry with the deltas
+        applied at each step, and every config derived from it."""
+        graph = self.lineage_graph(ref if os.path.isfile(ref) else None)
+        if graph is None:
+            return "❌ Lineage tracking is disabled."
+        digest = graph.resolve(ref)
+        if digest is None or digest not in graph:
+            return f"ℹ️ No lineage recorded for {ref}."
+
+        lines = [f"## 🧬 Lineage of `{graph.path_of(digest)}`"]
+        ancestors = graph.ancestors(digest)
+        chain = graph.path(ancestors[-1], digest) if ancestors else [digest]
+        lines.append(f"### Derived from ({len(ancestors)} ancestors)")
+        for parent, child in zip(chain, chain[1:]):
+            for edge in graph.deltas(child)[-1:]:
+                changes = [f"{key}={value}" for key, value in edge['delta'].get('set', {}).items()]
+                changes += [f"-{key}" for key in edge['delta'].get('removed', [])]
+                lines.append(f"- `{graph.path_of(parent)}` → `{graph.path_of(child)}`: {', '.join(changes) or 'no changes'}")
+        descendants = graph.descendants(digest)
+        lines.append(f"### Descendants ({len(descendants)})")
+        lines.extend(f"- `{graph.path_of(node)}`" for node in descendants[:50])
+        if len(descendants) > 50:
+            lines.append(f"- … and {len(descendants) - 50} more")
+        return "\n".join(lines)
+
+    def find_config_inheritors(self, key: str, value: Any, source: str = None) -> Tuple[List[str], str]:
+        """Saved configs that carry key=value, set on them or inherited from an ancestor
+        (e.g. every config descended from a bad learning rate). source names a config
+        (path or hash) known to have the value although no save recorded it.
+
+        Returns (paths, markdown).
+        """
+        graph = self.lineage_graph(source if source and os.path.isfile(source) else None)
+        if graph is None:
+            return [], "❌ Lineage tracking is disabled."
+        sources = []
+        if source:
+            digest = graph.resolve(source)
+            if digest is None:
+                return [], f"❌ Unknown config: {source}"
+            sources.append(digest)
+
+        paths = [graph.path_of(node) for node in graph.inheritors(key, value, sources)]
+        lines = [f"**{len(paths)} configs carry {key}={value}**"]
+        lines.extend(f"- `{path}`" for path in paths[:50])
+        if len(paths) > 50:
+            lines.append(f"- … and {len(paths) - 50} more")
+        return paths, "\n".join(lines)
+
+    def suggest_filename(self) -> str:
+        """Generates a filename suggestion based on current working_config."""
+        if not self.working_config:
+            return "modified_config.json"
+        return suggest_filename_for(self.working_config)
 
 # Example of how to use the model (for testing or direct script use)
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+import atexit
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import json_codec
+
+# Called on the writer thread as callback(path, ok, status message).
+SaveCallback = Callable[[str, bool, str], None]
+# Called on the writer thread as after_write(path, snapshot) once a snapshot is on disk.
+AfterWriteHook = Callable[[str, Dict[str, Any]], None]
+
+def atomic_write_json(path: Path, config: Dict[str, Any]):
+    """Writes config as pretty JSON via temp file + fsync + rename, so readers never see a partial file."""
+    atomic_write_text(path, json_codec.dumps_pretty(config))
+
+def atomic_write_text(path: Path, text: str, sync_dir: bool = True):
+    """atomic_write_json for already serialized text. Bulk writers may pass sync_dir=False
+    and call fsync_dir() once per directory at the end."""
+    _atomic_write(path, text, 'w', sync_dir)
+
+def atomic_write_bytes(path: Path, data: bytes, sync_dir: bool = True):
+    """atomic_write_text for binary files."""
+    _atomic_write(path, data, 'wb', sync_dir)
+
+def _atomic_write(path: Path, content: Any, mode: str, sync_dir: bool):
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            f.write(content)
+            f.flush()
+            _set_file_mode(f.fileno(), tmp_name, path)
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    if sync_dir:
+        fsync_dir(path.parent)
+
+def _read_default_file_mode() -> int:
+    """Mode open(path, 'w') creates a new file with: 0o666 minus the umask."""
+    umask = os.umask(0o022) # The umask can only be read by setting it
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# Read once at import, before any writer thread exists: setting the umask briefly, even to
+# read it, would affect files other threads create meanwhile. Later umask changes are not seen.
+DEFAULT_FILE_MODE = _read_default_file_mode()
+
+def _set_file_mode(fd: int, tmp_name: str, path: Path):
+    """Gives the temp file the mode of the file it replaces (or of a newly created one);
+    mkstemp creates it owner-only."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = DEFAULT_FILE_MODE
+    if hasattr(os, 'fchmod'):
+        os.fchmod(fd, mode)
+    else:
+        os.chmod(tmp_name, mode)
+
+def fsync_dir(directory: Path):
+    """Persists renames within directory (POSIX only; a no-op elsewhere)."""
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class SaveWriter:
+    """Background writer that saves configs off the calling thread.
+
+    Saves queued for a path that is still pending are coalesced: only the newest
+    snapshot is written, and every distinct callback receives that write's result.
+    """
+
+    def __init__(self, after_write: Optional[AfterWriteHook] = None):
+        self.after_write = after_write
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Tuple[Dict[str, Any], List[SaveCallback]]] = {}
+        self._order: List[str] = []
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, path: Path, snapshot: Dict[str, Any], callback: Optional[SaveCallback] = None) -> bool:
+        """Queues a save. Returns True if it was coalesced into an already pending save of the same path."""
+        key = str(path)
+        with self._cond:
+            coalesced = key in self._pending
+            callbacks = self._pending[key][1] if coalesced else []
+            if callback is not None and callback not in callbacks:
+                callbacks.append(callback) # The same listener is told once per write
+            self._pending[key] = (snapshot, callbacks)
+            if not coalesced:
+                self._order.append(key)
+            self._ensure_thread()
+            self._cond.notify_all()
+        return coalesced
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="config-save-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._order:
+                    self._busy = False
+                    self._cond.notify_all()
+                    self._cond.wait()
+                key = self._order.pop(0)
+                snapshot, callbacks = self._pending.pop(key)
+                self._busy = True
+
+            try:
+                atomic_write_json(Path(key), snapshot)
+                ok, status = True, f"✅ Configuration saved successfully as: {Path(key).resolve()}"
+            except Exception as e:
+                ok, status = False, f"❌ Error saving configuration: {str(e)}"
+
+            if ok and self.after_write is not None:
+                try:
+                    self.after_write(key, snapshot)
+                except Exception:
+                    pass # Bookkeeping must not turn a successful save into a failure
+
+            for callback in callbacks:
+                try:
+                    callback(key, ok, status)
+                except Exception:
+                    pass # A failing listener must not stop the writer
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every queued save is written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._order and not self._busy, timeout)
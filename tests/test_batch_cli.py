@@ -0,0 +1,33 @@
+import json
+from pathlib import Path
+
+from batch_cli import number_duplicate_filenames, run_batch
+
+BASE = str(Path(__file__).parent / "data" / "kohya_lora_2024.json")
+
+def _run(rows, out_dir):
+    return {index: (ok, message) for index, ok, message in run_batch(BASE, rows, str(out_dir))}
+
+def test_names_with_dots_stay_inside_the_output_directory(tmp_path):
+    results = _run([{'filename': "v1..final", 'epoch': "3"}, {'filename': "sub/run.json", 'epoch': "4"}], tmp_path)
+    assert all(ok for ok, _ in results.values()), results
+    assert json.loads((tmp_path / "v1..final.json").read_text(encoding='utf-8'))['epoch'] == 3
+    assert json.loads((tmp_path / "sub" / "run.json").read_text(encoding='utf-8'))['epoch'] == 4
+
+def test_names_outside_the_output_directory_fail(tmp_path):
+    out_dir = tmp_path / "out"
+    results = _run([{'filename': "../escape.json"}, {'filename': str(tmp_path / "abs.json")}], out_dir)
+    assert not any(ok for ok, _ in results.values())
+    assert not (tmp_path / "escape.json").exists() and not (tmp_path / "abs.json").exists()
+
+def test_duplicate_names_are_numbered(tmp_path):
+    rows = [{'filename': "run", 'epoch': "1"}, {'filename': "run.json", 'epoch': "2"},
+            {'filename': "other", 'epoch': "3"}, {'filename': "run", 'epoch': "4"}]
+    assert [row['filename'] for row in number_duplicate_filenames(rows)] == [
+        "run", "run_0001.json", "other", "run_0003.json"]
+    assert rows[1]['filename'] == "run.json" # The caller's rows are not modified
+
+    results = _run(rows, tmp_path)
+    assert all(ok for ok, _ in results.values()), results
+    epochs = {path.name: json.loads(path.read_text(encoding='utf-8'))['epoch'] for path in tmp_path.glob("*.json")}
+    assert epochs == {"run.json": 1, "run_0001.json": 2, "other.json": 3, "run_0003.json": 4}
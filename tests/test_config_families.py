@@ -0,0 +1,54 @@
+import json
+from array import array
+
+from config_families import NUM_PERM, cluster_files, cluster_signatures, estimate_jaccard, lsh_bands
+
+def _signature(values):
+    return array('Q', values)
+
+def test_first_bucket_member_as_outlier_does_not_split_a_family():
+    bands, rows_per_band = lsh_bands(0.7, NUM_PERM)
+    shared = list(range(rows_per_band)) # Band 0, the only band all three have in common
+    outlier = _signature(shared + [10_000 + i for i in range(rows_per_band, NUM_PERM)])
+    # a and b differ in one slot of every other band, so band 0 is their only common bucket
+    a_values = shared + [20_000 + i for i in range(rows_per_band, NUM_PERM)]
+    b_values = list(a_values)
+    for band in range(1, bands):
+        b_values[band * rows_per_band] += 1
+    b_values[-1] += 1
+    a, b = _signature(a_values), _signature(b_values)
+    assert estimate_jaccard(a, b) >= 0.7 > estimate_jaccard(outlier, a)
+
+    families = cluster_signatures(["outlier", "a", "b"], [outlier, a, b], 0.7)
+    assert [family['members'] for family in families] == [["a", "b"], ["outlier"]]
+
+def _write_configs(tmp_path):
+    base = {'optimizer': "AdamW8bit", 'lr_scheduler': "cosine", 'network_dim': 32, 'network_alpha': 16,
+            'mixed_precision': "bf16", 'sdxl': True, 'cache_latents': True, 'xformers': "xformers",
+            'train_batch_size': 2, 'max_resolution': "1024,1024", 'LoRA_type': "Standard", 'epoch': 10}
+    other = {'optimizer': "Prodigy", 'lr_scheduler': "constant", 'network_dim': 4, 'network_alpha': 1,
+             'mixed_precision': "fp16", 'sdxl': False, 'cache_latents': False, 'xformers': True,
+             'train_batch_size': 1, 'max_resolution': "512,512", 'LoRA_type': "LyCORIS/LoHa", 'epoch': 3}
+    configs = {f"sdxl_{i}.json": {**base, 'output_name': f"run{i}", 'seed': i} for i in range(4)}
+    configs["sdxl_4.json"] = {**base, 'epoch': 12}
+    configs["sd15.json"] = other
+    paths = []
+    for name, config in configs.items():
+        path = tmp_path / name
+        path.write_text(json.dumps(config), encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+def test_near_duplicates_form_one_family(tmp_path):
+    paths = _write_configs(tmp_path)
+    report = cluster_files(paths)
+    assert report['configs'] == len(paths)
+    assert len(report['families']) == 1
+    assert sorted(report['families'][0]['members']) == sorted(p for p in paths if "sdxl_" in p)
+    assert report['singletons'] == [p for p in paths if p.endswith("sd15.json")]
+
+def test_families_do_not_depend_on_input_order(tmp_path):
+    paths = _write_configs(tmp_path)
+    forward = cluster_files(paths)['families']
+    backward = cluster_files(paths[::-1])['families']
+    assert [sorted(f['members']) for f in forward] == [sorted(f['members']) for f in backward]
@@ -0,0 +1,59 @@
+import json
+
+from comparison_cache import hash_file
+from config_lineage import LineageStore
+from model import TamingDragonsModel
+
+def _chain(tmp_path):
+    """root -> a -> b, root -> c; b overrides the optimizer that a set."""
+    store = LineageStore(str(tmp_path / "lineage.jsonl"))
+    store.record("root", "/r.json", None, None, {'set': {}, 'removed': []})
+    store.record("a", "/a.json", "root", "/r.json", {'set': {'optimizer': "Prodigy", 'epoch': 4}, 'removed': []})
+    store.record("b", "/b.json", "a", "/a.json", {'set': {'optimizer': "Lion"}, 'removed': []})
+    store.record("c", "/c.json", "root", "/r.json", {'set': {'epoch': 4.0}, 'removed': ['seed']})
+    return store
+
+def test_ancestry_queries(tmp_path):
+    graph = _chain(tmp_path).graph()
+    assert graph.ancestors("b") == ["a", "root"]
+    assert set(graph.descendants("root")) == {"a", "b", "c"}
+    assert graph.path("root", "b") == ["root", "a", "b"]
+    assert graph.path("c", "b") is None
+    assert graph.deltas("b")[0]['delta']['set'] == {'optimizer': "Lion"}
+    assert graph.resolve("/b.json") == "b"
+
+def test_inheritors_stop_at_overrides(tmp_path):
+    graph = _chain(tmp_path).graph()
+    assert graph.inheritors('optimizer', "Prodigy") == ["a"]
+    assert graph.inheritors('epoch', 4) == ["a", "c", "b"] # 4.0 is the same query value as 4
+
+def test_graph_reads_only_new_complete_lines(tmp_path):
+    store = _chain(tmp_path)
+    assert len(store.graph()) == 4
+    with open(store.path, 'a', encoding='utf-8') as f:
+        f.write('{"hash": "d", "parent": "b"}\n{"hash": "e", "par')
+    graph = store.graph()
+    assert graph.ancestors("d") == ["b", "a", "root"]
+    assert "e" not in graph
+    with open(store.path, 'a', encoding='utf-8') as f:
+        f.write('ent": "d"}\n')
+    assert store.graph().ancestors("e")[0] == "d"
+
+def test_saves_record_ancestry(tmp_path):
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps({'epoch': 10, 'seed': 1, 'optimizer': "AdamW8bit"}), encoding='utf-8')
+    model = TamingDragonsModel()
+    model.set_base_config(str(base))
+    model.update_working_config_daily_tweaks({'epoch': "4"})
+    assert model.save_working_config("child.json", str(tmp_path)).startswith("✅")
+
+    model.set_base_config(str(tmp_path / "child.json"))
+    model.update_working_config_daily_tweaks({'seed': "7"})
+    model.save_working_config_async("grandchild.json", str(tmp_path))
+    assert model.save_writer.flush(5)
+
+    graph = model.lineage_graph(str(tmp_path / "grandchild.json"))
+    grandchild = graph.resolve(str(tmp_path / "grandchild.json"))
+    assert graph.ancestors(grandchild) == [hash_file(str(tmp_path / "child.json")), hash_file(str(base))]
+    assert graph.deltas(grandchild)[0]['delta'] == {'set': {'seed': 7}, 'removed': []}
+    assert (tmp_path / ".taming_dragons_lineage.jsonl").exists()
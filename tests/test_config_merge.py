@@ -0,0 +1,51 @@
+import json
+
+from config_merge import MISSING, THEIRS, conflicts_to_report, merge3, merge_batch
+
+BASE = {'epoch': 10, 'learning_rate': 0.0001, 'optimizer': "AdamW8bit", 'network_args': ["algo=locon"],
+        'sample': {'steps': 20, 'sampler': "euler"}}
+
+def test_one_sided_changes_are_applied():
+    ours = {**BASE, 'epoch': 4}
+    theirs = {**BASE, 'optimizer': "Prodigy", 'sample': {'steps': 30, 'sampler': "euler"}}
+    merged, applied, conflicts = merge3(BASE, ours, theirs)
+    assert merged == {**BASE, 'epoch': 4, 'optimizer': "Prodigy", 'sample': {'steps': 30, 'sampler': "euler"}}
+    assert sorted(c['path'] for c in applied) == [['optimizer'], ['sample']]
+    assert conflicts == []
+
+def test_changes_to_the_same_key_conflict():
+    ours = {**BASE, 'epoch': 4, 'sample': {'steps': 20, 'sampler': "ddim"}}
+    theirs = {**BASE, 'epoch': 6, 'sample': {'steps': 20, 'sampler': "dpm"}}
+    merged, _, conflicts = merge3(BASE, ours, theirs)
+    assert [c['path'] for c in conflicts] == [['epoch'], ['sample', 'sampler']]
+    assert merged['epoch'] == 4 and merged['sample']['sampler'] == "ddim"
+    merged, _, _ = merge3(BASE, ours, theirs, prefer=THEIRS)
+    assert merged['epoch'] == 6 and merged['sample']['sampler'] == "dpm"
+
+def test_the_same_change_on_both_sides_is_not_a_conflict():
+    ours = {**BASE, 'network_args': ["algo=loha"]}
+    _, applied, conflicts = merge3(BASE, ours, dict(ours))
+    assert applied == [] and conflicts == []
+
+def test_int_and_float_edits_conflict():
+    _, _, conflicts = merge3(BASE, {**BASE, 'epoch': 4}, {**BASE, 'epoch': 4.0})
+    assert [c['path'] for c in conflicts] == [['epoch']]
+
+def test_edit_against_removal_conflicts():
+    theirs = {key: value for key, value in BASE.items() if key != 'optimizer'}
+    _, _, conflicts = merge3(BASE, {**BASE, 'optimizer': "Lion"}, theirs)
+    assert conflicts[0]['theirs'] is MISSING
+    assert conflicts_to_report(conflicts) == [{'path': "optimizer", 'base': "AdamW8bit", 'ours': "Lion",
+                                               'theirs': None, 'missing': ["theirs"]}]
+
+def test_batch_skips_conflicted_files(tmp_path):
+    clean, conflicted = tmp_path / "clean.json", tmp_path / "conflicted.json"
+    clean.write_text(json.dumps({**BASE, 'seed': 1}), encoding='utf-8')
+    conflicted.write_text(json.dumps({**BASE, 'optimizer': "Lion"}), encoding='utf-8')
+    before = conflicted.read_bytes()
+    theirs = {**BASE, 'optimizer': "Prodigy"}
+    results = {r['file']: r for r in merge_batch(BASE, theirs, [str(clean), str(conflicted)])}
+    assert results[str(clean)]['status'] == 'merged'
+    assert results[str(conflicted)]['status'] == 'conflict'
+    assert json.loads(clean.read_text(encoding='utf-8'))['optimizer'] == "Prodigy"
+    assert conflicted.read_bytes() == before
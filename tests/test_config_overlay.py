@@ -0,0 +1,32 @@
+from config_overlay import ConfigOverlay
+
+BASE = {'epoch': 10, 'learning_rate': 0.0001, 'network_args': ["algo=locon"], 'seed': 1}
+
+def test_edits_never_reach_the_base():
+    base = {key: (list(value) if isinstance(value, list) else value) for key, value in BASE.items()}
+    overlay = ConfigOverlay(base)
+    overlay['epoch'] = 4
+    overlay['network_args'].append("conv_dim=8") # In-place edit of a nested value
+    del overlay['seed']
+    overlay['new_key'] = "x"
+    assert base == BASE
+    assert overlay.to_dict() == {'epoch': 4, 'learning_rate': 0.0001, 'network_args': ["algo=locon", "conv_dim=8"],
+                                 'new_key': "x"}
+    assert 'seed' not in overlay and list(overlay) == ['epoch', 'learning_rate', 'network_args', 'new_key']
+
+def test_changes_keep_numbers_and_booleans_apart():
+    overlay = ConfigOverlay({'epoch': 1, 'sdxl': True, 'seed': 7})
+    overlay['epoch'] = 1.0
+    overlay['sdxl'] = 1
+    overlay['seed'] = 7 # Same value as the base: not a change
+    del overlay['sdxl']
+    overlay['sdxl'] = True
+    assert overlay.changes() == {'epoch': (1, 1.0)}
+
+def test_siblings_are_independent():
+    overlay = ConfigOverlay(dict(BASE))
+    overlay['epoch'] = 4
+    sibling = overlay.copy()
+    sibling['epoch'] = 5
+    sibling['network_args'].clear()
+    assert overlay['epoch'] == 4 and overlay['network_args'] == ["algo=locon"]
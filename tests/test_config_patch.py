@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from config_patch import PatchTestFailed, apply_json_patch, json_equal, matches, patch_directory, rollback_run
+
+def test_test_op_compares_numbers_by_value():
+    config = {'learning_rate': 1, 'network_args': [1.0, {'dim': 4}]}
+    ops = [{'op': "test", 'path': "/learning_rate", 'value': 1.0},
+           {'op': "test", 'path': "/network_args", 'value': [1, {'dim': 4.0}]},
+           {'op': "replace", 'path': "/learning_rate", 'value': 2}]
+    assert apply_json_patch(config, ops)['learning_rate'] == 2
+
+def test_test_op_keeps_booleans_apart_from_numbers():
+    with pytest.raises(PatchTestFailed):
+        apply_json_patch({'xformers': True}, [{'op': "test", 'path': "/xformers", 'value': 1}])
+    assert not json_equal(0, False)
+    assert not json_equal("1", 1)
+
+def test_where_uses_the_same_equality():
+    assert matches({'epoch': 10.0, 'sdxl': True}, {'epoch': 10, 'sdxl': True})
+    assert not matches({'epoch': 1}, {'epoch': True})
+    assert not matches({'epoch': 1}, {'seed': 1})
+
+def _write_library(root):
+    configs = {"a.json": {'optimizer': "Prodigy", 'epoch': 10}, "b.json": {'optimizer': "AdamW8bit", 'epoch': 10},
+               "sub/c.json": {'optimizer': "Prodigy", 'epoch': 4}}
+    originals = {}
+    for name, config in configs.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(config, indent=4), encoding='utf-8')
+        originals[name] = path.read_bytes()
+    return originals
+
+def test_dry_run_writes_nothing(tmp_path):
+    originals = _write_library(tmp_path)
+    report = patch_directory(str(tmp_path), {'epoch': 2}, where={'optimizer': "Prodigy"}, dry_run=True)
+    assert report['counts'] == {'patched': 2, 'skipped': 1}
+    assert report['run_id'] is None
+    assert all((tmp_path / name).read_bytes() == data for name, data in originals.items())
+
+def test_rollback_restores_the_original_bytes(tmp_path):
+    originals = _write_library(tmp_path)
+    report = patch_directory(str(tmp_path), {'epoch': 2}, where={'optimizer': "Prodigy"})
+    assert report['counts'] == {'patched': 2, 'skipped': 1}
+    assert json.loads((tmp_path / "sub" / "c.json").read_text(encoding='utf-8'))['epoch'] == 2
+
+    result = rollback_run(str(tmp_path))
+    assert result == {'run_id': report['run_id'], 'restored': 2, 'modified_since': [], 'missing_backups': []}
+    assert all((tmp_path / name).read_bytes() == data for name, data in originals.items())
+    with pytest.raises(ValueError):
+        rollback_run(str(tmp_path)) # The run's backups are gone
+
+def test_rollback_leaves_files_edited_since_the_run(tmp_path):
+    _write_library(tmp_path)
+    patch_directory(str(tmp_path), {'epoch': 2}, where={'optimizer': "Prodigy"})
+    edited = tmp_path / "a.json"
+    edited.write_text(json.dumps({'optimizer': "Prodigy", 'epoch': 7}), encoding='utf-8')
+    result = rollback_run(str(tmp_path))
+    assert result['restored'] == 1 and result['modified_since'] == ["a.json"]
+    assert json.loads(edited.read_text(encoding='utf-8'))['epoch'] == 7
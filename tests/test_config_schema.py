@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from config_schema import default_schema
+from model import TamingDragonsModel
+
+SAMPLES = sorted((Path(__file__).parent / "data").glob("kohya_*.json"))
+
+@pytest.mark.parametrize("path", SAMPLES, ids=[path.stem for path in SAMPLES])
+def test_sample_configs_validate(path):
+    with open(path, encoding='utf-8') as f:
+        assert default_schema().validate(json.load(f)) == []
+
+def test_samples_cover_the_schema():
+    seen = set()
+    for path in SAMPLES:
+        with open(path, encoding='utf-8') as f:
+            seen.update(json.load(f))
+    assert set(default_schema().params) <= seen
+
+def test_coerce_keeps_the_type_of_the_replaced_value():
+    schema = default_schema()
+    assert schema.coerce('keep_tokens', "2", 0) == 2
+    assert schema.coerce('keep_tokens', "2", "0") == "2"
+    assert schema.coerce('keep_tokens', "2") == 2
+    assert schema.coerce('xformers', "false", True) is False
+    assert schema.coerce('xformers', "sdpa", "xformers") == "sdpa"
+    with pytest.raises(ValueError):
+        schema.coerce('keep_tokens', "-1", 0)
+
+def test_daily_tweaks_on_an_older_config(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text((Path(__file__).parent / "data" / "kohya_lora_2023.json").read_text(encoding='utf-8'),
+                    encoding='utf-8')
+    model = TamingDragonsModel()
+    model.set_base_config(str(path))
+    status = model.update_working_config_daily_tweaks({'epoch': "4", 'seed': "7", 'max_train_steps': ""})
+    assert not status.startswith("❌"), status
+    assert model.working_config['epoch'] == 4
+    assert model.working_config['seed'] == 7
+    assert "✅" in model.validate_working_config()
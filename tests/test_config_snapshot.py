@@ -0,0 +1,59 @@
+import pytest
+
+from config_snapshot import SnapshotError, SnapshotTable, source_stamp, write_snapshot
+from config_table import ConfigTable
+
+CONFIGS = [
+    ("b.json", {'epoch': 10, 'learning_rate': 0.0001, 'optimizer': "AdamW8bit", 'sdxl': True}),
+    ("a.json", {'epoch': 4, 'learning_rate': 5e-05, 'optimizer': "Prodigy", 'network_args': ["algo=locon"]}),
+    ("c.json", {'output_name': "ünïcode", 'optimizer_args': None}),
+]
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    table = ConfigTable()
+    for name, config in CONFIGS:
+        table.add(name, config)
+    path = tmp_path / "snapshot.bin"
+    write_snapshot(table, str(path), "stamp")
+    return path
+
+def test_round_trip(snapshot_path):
+    snapshot = SnapshotTable(str(snapshot_path), expected_stamp="stamp")
+    try:
+        assert len(snapshot) == len(CONFIGS)
+        for name, config in CONFIGS:
+            assert snapshot.get(name).to_dict() == config
+        assert snapshot.get("missing.json") is None
+        assert [row.name for row in snapshot] == ["a.json", "b.json", "c.json"]
+    finally:
+        snapshot.close()
+
+def test_stale_stamp_is_rejected(snapshot_path):
+    with pytest.raises(SnapshotError):
+        SnapshotTable(str(snapshot_path), expected_stamp="other")
+
+def test_damaged_snapshot_is_rejected(snapshot_path):
+    with open(snapshot_path, 'r+b') as f:
+        f.truncate(64)
+    with pytest.raises(SnapshotError):
+        SnapshotTable(str(snapshot_path))
+
+def test_close_unmaps_the_file(snapshot_path):
+    snapshot = SnapshotTable(str(snapshot_path))
+    assert snapshot.get("a.json")['network_args'] == ["algo=locon"] # Touch the mapped columns
+    snapshot.close()
+    assert snapshot._mmap.closed
+    assert snapshot._file.closed
+
+def test_snapshot_can_be_replaced_after_close(snapshot_path):
+    snapshot = SnapshotTable(str(snapshot_path))
+    snapshot.close()
+    table = ConfigTable()
+    table.add("d.json", {'epoch': 1})
+    write_snapshot(table, str(snapshot_path), source_stamp([("d.json", "hash")]))
+    reopened = SnapshotTable(str(snapshot_path))
+    try:
+        assert reopened.get("d.json").to_dict() == {'epoch': 1}
+    finally:
+        reopened.close()
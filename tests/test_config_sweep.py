@@ -0,0 +1,30 @@
+import pytest
+
+from config_schema import default_schema
+from config_sweep import InvalidSweepValue, apply_overrides, run_sweep
+
+BASE = {'epoch': 10, 'learning_rate': 0.0001, 'keep_tokens': "0", 'xformers': True, 'output_name': "base"}
+
+def test_overrides_are_typed_like_daily_tweaks():
+    variant = apply_overrides(BASE, {'epoch': 4, 'learning_rate': 1, 'keep_tokens': 2, 'xformers': False},
+                              default_schema())
+    assert variant['epoch'] == 4
+    assert type(variant['learning_rate']) is float
+    assert variant['keep_tokens'] == "2" # Keeps the text form the base config uses
+    assert variant['xformers'] is False
+
+def test_rejected_values_are_all_reported():
+    with pytest.raises(InvalidSweepValue) as info:
+        apply_overrides(BASE, {'epoch': 0, 'mixed_precision': "fp8"}, default_schema())
+    assert "epoch" in str(info.value) and "mixed_precision" in str(info.value)
+
+def test_invalid_sweep_writes_nothing(tmp_path):
+    out_dir = tmp_path / "sweep"
+    written, status = run_sweep(BASE, {'epoch': [5, 0]}, str(out_dir), schema=default_schema())
+    assert written == [] and status.startswith("❌")
+    assert not out_dir.exists()
+
+def test_valid_sweep_writes_every_point(tmp_path):
+    written, status = run_sweep(BASE, {'epoch': [5, 6], 'xformers': [True, False]}, str(tmp_path),
+                                schema=default_schema())
+    assert status.startswith("✅") and len(written) == 4
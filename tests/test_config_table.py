@@ -0,0 +1,20 @@
+from config_table import ConfigTable
+
+def test_rows_read_back_like_the_original_dicts():
+    configs = [("a", {'x': 1, 'flag': True, 'rate': 1e-4}), ("b", {'y': [1, 2], 'flag': False}),
+               ("c", {'x': 2**70, 'rate': 2, 'name': "ü"})]
+    table = ConfigTable.from_configs(configs)
+    assert [row.to_dict() for row in table] == [config for _, config in configs]
+    assert list(table.get("c")) == ['x', 'rate', 'name']
+    assert 'y' not in table.get("a")
+
+def test_reencoding_skips_rows_without_the_key():
+    table = ConfigTable.from_configs([("a", {'x': 1}), ("b", {'y': 2}), ("c", {'x': 2}), ("d", {'x': "s"})])
+    assert table.column_values('x') == [1, 2, "s"]
+    assert [row.get('x') for row in table] == [1, None, 2, "s"]
+
+def test_reencoding_skips_the_value_being_replaced():
+    table = ConfigTable.from_configs([("a", {'x': 1}), ("b", {'x': 3})])
+    table.add("a", {'x': "s"})
+    assert table.column_values('x') == [3, "s"]
+    assert table.get("a")['x'] == "s"
@@ -0,0 +1,70 @@
+from config_overlay import ConfigOverlay
+from edit_history import MISSING, EditHistory
+from model import TamingDragonsModel
+
+def _edit(config, history, **values):
+    deltas = [(key, config.get(key, MISSING), value) for key, value in values.items()]
+    for key, value in values.items():
+        config[key] = value
+    history.record(deltas)
+
+def test_undo_and_redo_on_an_overlay():
+    base = {'epoch': 10, 'network_args': ["algo=locon"]}
+    config, history = ConfigOverlay(base), EditHistory()
+    _edit(config, history, epoch=4, seed=7)
+    _edit(config, history, network_args=["algo=loha"])
+
+    assert history.undo(config) == ['network_args']
+    assert config['network_args'] == ["algo=locon"]
+    assert history.undo(config) == ['seed', 'epoch']
+    assert config.to_dict() == base and 'seed' not in config
+    assert history.undo(config) is None
+
+    assert history.redo(config) == ['epoch', 'seed']
+    assert history.redo(config) == ['network_args']
+    assert config.to_dict() == {'epoch': 4, 'network_args': ["algo=loha"], 'seed': 7}
+    assert history.redo(config) is None
+    assert base == {'epoch': 10, 'network_args': ["algo=locon"]}
+
+def test_a_new_edit_clears_redo():
+    config, history = {'epoch': 1}, EditHistory()
+    _edit(config, history, epoch=2)
+    history.undo(config)
+    _edit(config, history, epoch=3)
+    assert not history.can_redo()
+    history.undo(config)
+    assert config == {'epoch': 1}
+
+def test_recorded_values_are_detached_from_later_in_place_edits():
+    config, history = {'network_args': ["a"]}, EditHistory()
+    new = ["b"]
+    _edit(config, history, network_args=new)
+    new.append("c")
+    history.undo(config)
+    history.redo(config)
+    assert config['network_args'] == ["b"]
+
+def test_oldest_entries_are_evicted_at_the_cap():
+    config, history = {}, EditHistory(max_bytes=2000)
+    for i in range(50):
+        _edit(config, history, comment="x" * 100 + str(i))
+    assert history.total_bytes <= 2000
+    undone = 0
+    while history.undo(config) is not None:
+        undone += 1
+    assert 0 < undone < 50
+    assert config['comment'].endswith(str(50 - undone - 1))
+
+def test_model_undo_redo_of_daily_tweaks(tmp_path):
+    path = tmp_path / "base.json"
+    path.write_text('{"epoch": 10, "seed": 1}', encoding='utf-8')
+    model = TamingDragonsModel()
+    model.set_base_config(str(path))
+    model.update_working_config_daily_tweaks({'epoch': "4"})
+    model.update_working_config_daily_tweaks({'seed': "9"})
+    assert "Seed" in model.undo_working_edit()
+    assert dict(model.working_config) == {'epoch': 4, 'seed': 1}
+    model.undo_working_edit()
+    assert dict(model.working_config) == {'epoch': 10, 'seed': 1}
+    model.redo_working_edit()
+    assert dict(model.working_config) == {'epoch': 4, 'seed': 1}
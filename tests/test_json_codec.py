@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import json_codec
+
+SAMPLES = sorted((Path(__file__).parent / "data").glob("kohya_*.json"))
+
+DOCUMENTS = [
+    {'learning_rate': 1e-05, 'unet_lr': 0.0001, 'tiny': 1e-07, 'large': 1e16, 'list': [1e-05, 0.00005, 2e-06]},
+    {'text': "1e-05", 'looks_like_number': "0.00001", 'comment': "lr 1e-05\nnext line 0.00001",
+     'nested': [[1e-05], {'lr': 1e-05}], '1e-05': 0.00001},
+    {'nan': float('nan'), 'inf': float('inf'), 'ninf': float('-inf')},
+    {'big': 2 ** 70, 'negative_big': -(2 ** 65), 'max_u64': 2 ** 64 - 1},
+    {'unicode': "ünïcode 漢字   ퟿", 'control': "\x00\x1f\x7f", 'slash': "a/b\\c"},
+    [], {}, [{}], "text", 3.0, None,
+]
+
+@pytest.fixture(params=sorted(json_codec.CODECS))
+def codec(request):
+    return json_codec.CODECS[request.param]
+
+def _stdlib(obj):
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+@pytest.mark.parametrize("doc", DOCUMENTS, ids=range(len(DOCUMENTS)))
+def test_pretty_output_is_byte_identical_to_stdlib(codec, doc):
+    assert codec.dumps_pretty(doc) == _stdlib(doc)
+
+@pytest.mark.parametrize("path", SAMPLES, ids=[path.stem for path in SAMPLES])
+def test_sample_configs_round_trip_byte_identical(codec, path):
+    config = codec.loads(path.read_bytes())
+    assert config == json.loads(path.read_text(encoding='utf-8'))
+    assert codec.dumps_pretty(config) == _stdlib(config)
+
+def test_invalid_json_raises_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"epoch": }')
+
+def test_dump_file_matches_json_dump(tmp_path):
+    config = json.loads(SAMPLES[0].read_text(encoding='utf-8'))
+    with open(tmp_path / "fast.json", 'w', encoding='utf-8') as f:
+        json_codec.dump_file(config, f)
+    with open(tmp_path / "stdlib.json", 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    assert (tmp_path / "fast.json").read_bytes() == (tmp_path / "stdlib.json").read_bytes()
+
+def test_unknown_codec_is_refused():
+    active = json_codec.get_codec()
+    assert json_codec.set_codec("no-such-codec").startswith("❌")
+    assert json_codec.get_codec() is active
@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+
+from save_pipeline import DEFAULT_FILE_MODE, SaveWriter, atomic_write_json
+
+def _read(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+def _blocked_writer(release):
+    """A writer whose first write waits in after_write until release is set."""
+    started = threading.Event()
+    def after_write(path, snapshot):
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+    return SaveWriter(after_write), started
+
+def test_pending_saves_of_one_path_are_coalesced(tmp_path):
+    release = threading.Event()
+    writer, started = _blocked_writer(release)
+    first, target = tmp_path / "first.json", tmp_path / "target.json"
+    results = []
+    def callback(path, ok, status):
+        results.append((path, ok))
+    other_results = []
+
+    assert writer.submit(first, {'epoch': 1}) is False
+    assert started.wait(5) # The writer is now busy with first.json
+    assert writer.submit(target, {'epoch': 2}, callback) is False
+    assert writer.submit(target, {'epoch': 3}, callback) is True
+    assert writer.submit(target, {'epoch': 4}, lambda *args: other_results.append(args[1])) is True
+    release.set()
+    assert writer.flush(5)
+
+    assert _read(target) == {'epoch': 4} # Only the newest snapshot is written
+    assert results == [(str(target), True)] # Once per write, not once per submit
+    assert other_results == [True]
+
+def test_a_save_queued_during_its_own_write_is_written_again(tmp_path):
+    release = threading.Event()
+    writer, started = _blocked_writer(release)
+    target = tmp_path / "target.json"
+    writer.submit(target, {'epoch': 1})
+    assert started.wait(5)
+    assert writer.submit(target, {'epoch': 2}) is False # The first write is no longer pending
+    release.set()
+    assert writer.flush(5)
+    assert _read(target) == {'epoch': 2}
+
+def test_failed_writes_are_reported(tmp_path):
+    writer = SaveWriter()
+    results = []
+    writer.submit(tmp_path / "missing_dir" / "x.json", {'epoch': 1}, lambda path, ok, status: results.append((ok, status)))
+    assert writer.flush(5)
+    assert results[0][0] is False and results[0][1].startswith("❌")
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "config.json"
+    atomic_write_json(path, {'output_name': "ü"})
+    atomic_write_json(path, {'output_name': "v2"})
+    assert os.listdir(tmp_path) == ["config.json"]
+    assert _read(path) == {'output_name': "v2"}
+    if os.name == 'posix':
+        assert os.stat(path).st_mode & 0o777 == DEFAULT_FILE_MODE
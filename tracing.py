@@ -0,0 +1,205 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Callable, Deque, List, Optional
+
+# Set to 1 (trace written to DEFAULT_TRACE_PATH at exit) or to the trace file path; unset, empty or 0 is off.
+TRACE_ENV_VAR = "TAMING_DRAGONS_TRACE"
+DEFAULT_TRACE_PATH = "taming_dragons_trace.json"
+MAX_EVENTS = 1_000_000 # Oldest spans are dropped beyond this
+MAX_ARG_CHARS = 200
+
+class Span:
+    """One timed region; duration_ms is set when it closes."""
+    __slots__ = ('name', 'category', 'args', 'start_ns', 'duration_ms')
+
+    def __init__(self, name: str, category: str, args: Optional[Dict[str, Any]]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+        self.duration_ms = 0.0
+
+class _NullSpan:
+    """What span() returns while tracing is off: a shared no-op context manager."""
+    __slots__ = ()
+    name = category = ""
+    duration_ms = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """Collects spans as Chrome trace "complete" events (ph "X", microseconds).
+
+    Spans nest by time per thread, so the trace viewer (chrome://tracing or Perfetto)
+    shows callers above callees. busy_ms(category) is the time the calling thread has
+    spent in spans of a category, counting nested spans of the same category once.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._local = threading.local()
+
+    def _state(self) -> threading.local:
+        local = self._local
+        if not hasattr(local, 'open'):
+            local.open = {} # category -> spans currently open on this thread
+            local.busy = {} # category -> total ms of outermost spans
+            self._threads[threading.get_ident()] = threading.current_thread().name
+        return local
+
+    def begin(self, span: Span):
+        local = self._state()
+        local.open[span.category] = local.open.get(span.category, 0) + 1
+        span.start_ns = time.perf_counter_ns()
+
+    def end(self, span: Span):
+        end_ns = time.perf_counter_ns()
+        span.duration_ms = (end_ns - span.start_ns) / 1e6
+        event = {'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': self._pid,
+                 'tid': threading.get_ident(), 'ts': (span.start_ns - self._origin_ns) / 1000,
+                 'dur': (end_ns - span.start_ns) / 1000}
+        if span.args:
+            event['args'] = span.args
+        self.events.append(event)
+        local = self._state()
+        local.open[span.category] -= 1
+        if not local.open[span.category]:
+            local.busy[span.category] = local.busy.get(span.category, 0.0) + span.duration_ms
+
+    def busy_ms(self, category: str) -> float:
+        return getattr(self._local, 'busy', {}).get(category, 0.0)
+
+    def clear(self):
+        self.events.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in list(self._threads.items())]
+        return {'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: str) -> str:
+        """Writes the spans collected so far as Chrome trace JSON. Returns a status message."""
+        from save_pipeline import atomic_write_text
+
+        trace = self.chrome_trace()
+        spans = sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
+        try:
+            atomic_write_text(Path(path), json.dumps(trace))
+        except OSError as e:
+            return f"❌ Error writing trace: {str(e)}"
+        return f"✅ Wrote {spans} spans to {path}"
+
+class _ActiveSpan(Span):
+    __slots__ = ('_tracer',)
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: Optional[Dict[str, Any]]):
+        super().__init__(name, category, args)
+        self._tracer = tracer
+
+    def __enter__(self):
+        self._tracer.begin(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._tracer.end(self)
+        return False
+
+def _trace_path_from_env() -> Optional[str]:
+    requested = os.environ.get(TRACE_ENV_VAR, "").strip()
+    if requested.lower() in ("", "0", "false", "off", "no"):
+        return None
+    if requested.lower() in ("1", "true", "on", "yes"):
+        return DEFAULT_TRACE_PATH
+    return requested
+
+TRACE_PATH = _trace_path_from_env()
+tracer = Tracer(enabled=TRACE_PATH is not None)
+
+def _export_at_exit():
+    import multiprocessing
+
+    if multiprocessing.parent_process() is None: # Pool workers inherit the variable but must not overwrite the trace
+        print(tracer.export_chrome_trace(TRACE_PATH))
+
+if tracer.enabled:
+    atexit.register(_export_at_exit)
+
+def span(name: str, category: str = "app", **args: Any):
+    """Context manager timing a block; a shared no-op while tracing is off."""
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _ActiveSpan(tracer, name, category, args or None)
+
+def _call_args(args: tuple) -> Optional[Dict[str, Any]]:
+    """Positional string arguments (file paths, names, queries), shortened, for the trace viewer."""
+    shown = {f"arg{i}": value[:MAX_ARG_CHARS] for i, value in enumerate(args) if isinstance(value, str)}
+    return shown or None
+
+def traced(func: Optional[Callable] = None, *, category: str = "app", name: Optional[str] = None) -> Callable:
+    """Decorator wrapping each call in a span. With tracing off the function is returned
+    unchanged, so disabled tracing costs nothing per call."""
+    if func is None:
+        return functools.partial(traced, category=category, name=name)
+    if not tracer.enabled:
+        return func
+    span_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _ActiveSpan(tracer, span_name, category, _call_args(args)):
+            return func(*args, **kwargs)
+    return wrapper
+
+def trace_methods(cls: type = None, *, category: str = "app", exclude: List[str] = ()) -> type:
+    """Class decorator applying traced() to every method defined on the class (static and
+    class methods included, other dunders than __init__ skipped)."""
+    if cls is None:
+        return functools.partial(trace_methods, category=category, exclude=exclude)
+    if not tracer.enabled:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if attr in exclude or (attr.startswith('__') and attr != '__init__'):
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, attr, type(value)(traced(value.__func__, category=category)))
+        elif callable(value) and not isinstance(value, type):
+            setattr(cls, attr, traced(value, category=category))
+    return cls
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Summarize a Chrome trace written with "
+                                                 f"{TRACE_ENV_VAR} set: total and mean time per span name.")
+    parser.add_argument("trace")
+    parser.add_argument("--top", type=int, default=25)
+    cli_args = parser.parse_args()
+
+    with open(cli_args.trace, encoding='utf-8') as f:
+        trace_events = [event for event in json.load(f)['traceEvents'] if event.get('ph') == 'X']
+    totals: Dict[str, List[float]] = {}
+    for trace_event in trace_events:
+        totals.setdefault(trace_event['name'], []).append(trace_event['dur'] / 1000)
+    print("| Span | Calls | Total (ms) | Mean (ms) | Max (ms) |")
+    print("|---|---|---|---|---|")
+    for span_name, durations in sorted(totals.items(), key=lambda item: -sum(item[1]))[:cli_args.top]:
+        print(f"| {span_name} | {len(durations)} | {sum(durations):.3f} | "
+              f"{sum(durations) / len(durations):.3f} | {max(durations):.3f} |")
+    sys.exit(0)